@@ -0,0 +1,393 @@
+#!/usr/bin/python3
+
+# ------------------------------------------------------------------
+# Name  : Class_ClockFanout.py
+# Source: https://raw.githubusercontent.com/walter-rothlin/RaspberryPi4PiPlates/refs/heads/main/My_Packages/Class_ClockFanout.py
+#
+# Description: Fan-out of one master clock (e.g. Bahnhof_MutterUhr.py) to many slave clocks on separate relais lines
+#              Every line has its own polarity, the minute its dial shows and an optional PulseJournal. The driver
+#              knows the minute all dials should show (target); a line whose dial shows less is lagging:
+#
+#                  fanout = FanoutDriver(GPIO, target_minute=(now.hour % 12) * 60 + now.minute)
+#                  fanout.add_line('Halle', 26, journal_path='/home/pi/logs/halle.journal')
+#                  fanout.add_line('Perron 1', 20)
+#                  fanout.tick()                     # every minute: target + 1, one pulse on every line
+#                  fanout.set_displayed(555, ['Perron 1'])
+#                  while fanout.step(): ...          # catch-up: one pulse on the lagging lines only
+#                  print(fanout.status)
+#
+#              All pulses of a tick or step are one GPIO.output(list of pins, list of levels) call, not one call
+#              per line: the relais of all dials switch together, and N lines cost about one GPIO call.
+#              step() does nothing if no line is lagging, so it can be the pulse_func of a TickScheduler which is
+#              asked for as many catch-up pulses as the most lagging line needs (pending).
+#              A dial can not go back: with max_ahead a line whose dial is up to max_ahead minutes ahead of the target
+#              holds (no pulses) until the target has reached it.
+#
+# Autor: Walter Rothlin
+#
+# History:
+# 18-Oct-2026   Walter Rothlin      Initial Version
+# 18-Oct-2026   Walter Rothlin      max_ahead: a dial which is ahead holds instead of getting almost 12 hours of pulses
+# ------------------------------------------------------------------
+
+import threading
+import time
+from Class_PulseJournal import PulseJournal, MINUTES_PER_DIAL
+
+NS_PER_SECOND = 1_000_000_000
+
+
+def format_minute(minute):
+    return 'N/A' if minute is None else f'{minute // 60:02d}:{minute % 60:02d}'
+
+
+class ClockLine:
+    '''
+    One relais line with a slave clock. Changed only by the FanoutDriver (under its lock).
+    '''
+
+    # Initializer and setter/Getter and Properties
+    # ============================================
+    def __init__(self, name, pin, displayed_minute, polarity=False, journal=None):
+        '''
+        Constructor
+        :param displayed_minute: minute (0..719) the dial shows
+        :param polarity: polarity of the last pulse (True: relais on)
+        :param journal: PulseJournal of this line or None, a pulse is appended after every pulse
+        '''
+        self.__name = name
+        self.__pin = pin
+        self.__displayed_minute = displayed_minute % MINUTES_PER_DIAL
+        self.__polarity = polarity
+        self.__journal = journal
+        self.__pulses = 0
+        self.__last_pulse_ns = None
+
+    def get_name(self):
+        return self.__name
+
+    name = property(get_name)
+
+    def get_pin(self):
+        return self.__pin
+
+    pin = property(get_pin)
+
+    def get_polarity(self):
+        return self.__polarity
+
+    polarity = property(get_polarity)
+
+    def get_displayed_minute(self):
+        return self.__displayed_minute
+
+    def set_displayed_minute(self, minute):
+        self.__displayed_minute = minute % MINUTES_PER_DIAL
+
+    displayed_minute = property(get_displayed_minute, set_displayed_minute)
+
+    def get_journal(self):
+        return self.__journal
+
+    journal = property(get_journal)
+
+    def get_pulses(self):
+        return self.__pulses
+
+    pulses = property(get_pulses)
+
+    def get_last_pulse_ns(self):
+        return self.__last_pulse_ns
+
+    last_pulse_ns = property(get_last_pulse_ns)
+
+    # Business Methods
+    # ================
+    def lag(self, target_minute):
+        '''
+        :return: number of pulses (0..719) the dial needs to show target_minute
+        '''
+        return (target_minute - self.__displayed_minute) % MINUTES_PER_DIAL
+
+    def pulsed(self, timestamp_ns):
+        '''
+        The relais of this line was switched to the other polarity: the dial moved one minute.
+        '''
+        self.__polarity = not self.__polarity
+        self.__displayed_minute = (self.__displayed_minute + 1) % MINUTES_PER_DIAL
+        self.__pulses += 1
+        self.__last_pulse_ns = timestamp_ns
+        if self.__journal is not None:
+            self.__journal.append(self.__polarity, self.__displayed_minute, timestamp_ns)
+
+
+class FanoutDriver:
+    '''
+    Drives the lines of many slave clocks with one batched GPIO call per pulse.
+    '''
+
+    # Initializer and setter/Getter and Properties
+    # ============================================
+    def __init__(self, gpio, target_minute=0, clock=None, active_low=True, max_ahead=0):
+        '''
+        Constructor
+        :param gpio: RPi.GPIO or FakeGPIO, output() must accept lists of channels and values
+        :param target_minute: minute (0..719) all dials should show now
+        :param clock: SystemClock or VirtualClock (time_ns() for the journals), default time.time_ns
+        :param active_low: polarity True is output LOW (the relais boards switch on LOW)
+        :param max_ahead: a dial up to max_ahead minutes ahead of the target holds, 0: every difference is a lag
+        '''
+        self.__gpio = gpio
+        self.__target_minute = target_minute % MINUTES_PER_DIAL
+        self.__clock = clock
+        self.__active_low = active_low
+        self.__max_ahead = max_ahead
+        self.__lines = {}
+        self.__lock = threading.Lock()
+        self.__ticks = 0
+        self.__steps = 0
+        self.__output_calls = 0
+
+    def add_line(self, name, pin, journal_path=None, displayed_minute=None, polarity=False):
+        '''
+        Adds a line and sets its pin up as output with the level of its polarity.
+        With a journal the polarity and the dial of the last pulse are read from it.
+        :param displayed_minute: minute the dial shows, None: the target (without journal) or from the journal
+        :return: ClockLine
+        '''
+        journal = None
+        if journal_path is not None:
+            journal = PulseJournal(journal_path)
+            if journal.last is not None:
+                polarity = journal.last.polarity
+                if displayed_minute is None:
+                    displayed_minute = journal.last.displayed_minute
+        with self.__lock:
+            if name in self.__lines:
+                raise ValueError(f'Line {name} exists already')
+            line = ClockLine(name, pin, self.__target_minute if displayed_minute is None else displayed_minute, polarity, journal)
+            self.__gpio.setup(pin, self.__gpio.OUT, initial=self.__level(polarity))
+            self.__lines[name] = line
+        return line
+
+    def get_lines(self):
+        with self.__lock:
+            return list(self.__lines.values())
+
+    lines = property(get_lines)
+
+    def line(self, name):
+        '''
+        :return: ClockLine, KeyError if there is no line with this name
+        '''
+        return self.__lines[name]
+
+    def get_target_minute(self):
+        return self.__target_minute
+
+    def set_target_minute(self, minute):
+        with self.__lock:
+            self.__target_minute = minute % MINUTES_PER_DIAL
+
+    target_minute = property(get_target_minute, set_target_minute)
+
+    def get_pending(self):
+        '''
+        :return: pulses the most lagging line needs (the catch-up pulses a TickScheduler has to send)
+        '''
+        with self.__lock:
+            return max((self.__lag(line) for line in self.__lines.values()), default=0)
+
+    pending = property(get_pending)
+
+    def get_lagging(self):
+        '''
+        :return: names of the lines whose dial does not show the target
+        '''
+        with self.__lock:
+            return [line.name for line in self.__lines.values() if self.__lag(line) > 0]
+
+    lagging = property(get_lagging)
+
+    def get_status(self):
+        '''
+        :return: list with a dict per line (for a REST service)
+        '''
+        with self.__lock:
+            return [{'name': line.name,
+                     'pin': line.pin,
+                     'polarity': line.polarity,
+                     'displayed_time': format_minute(line.displayed_minute),
+                     'lag_minutes': self.__lag(line),
+                     'lagging': self.__lag(line) > 0,
+                     'ahead_minutes': self.__ahead(line),
+                     'pulses': line.pulses,
+                     'last_pulse': None if line.last_pulse_ns is None else
+                     time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(line.last_pulse_ns / NS_PER_SECOND))}
+                    for line in self.__lines.values()]
+
+    status = property(get_status)
+
+    def get_statistics(self):
+        with self.__lock:
+            return {'lines': len(self.__lines),
+                    'ticks': self.__ticks,
+                    'steps': self.__steps,
+                    'output_calls': self.__output_calls,
+                    'pulses': sum(line.pulses for line in self.__lines.values())}
+
+    statistics = property(get_statistics)
+
+    # Business Methods
+    # ================
+    def tick(self):
+        '''
+        A minute has passed: the target moves one minute, every line gets a pulse (lagging lines as well, they
+        keep their lag), except the lines which are ahead. One GPIO call.
+        :return: number of pulsed lines
+        '''
+        with self.__lock:
+            self.__ticks += 1
+            self.__target_minute = (self.__target_minute + 1) % MINUTES_PER_DIAL
+            return self.__pulse([line for line in self.__lines.values() if self.__lag(line) > 0])
+
+    def step(self):
+        '''
+        One catch-up pulse on the lagging lines only. One GPIO call, none if no line is lagging.
+        :return: number of pulsed lines
+        '''
+        with self.__lock:
+            self.__steps += 1
+            return self.__pulse([line for line in self.__lines.values() if self.__lag(line) > 0])
+
+    def advance(self, minutes):
+        '''
+        Moves the target (e.g. 60 at the change to summer time), the lines follow with step().
+        '''
+        with self.__lock:
+            self.__target_minute = (self.__target_minute + minutes) % MINUTES_PER_DIAL
+
+    def set_displayed(self, minute, names=None):
+        '''
+        What the dials show (Uhr richten), the lines catch up with step().
+        :param names: list of line names, None: all lines
+        '''
+        with self.__lock:
+            for name in self.__lines if names is None else names:
+                self.__lines[name].displayed_minute = minute
+
+    def close(self):
+        with self.__lock:
+            for line in self.__lines.values():
+                if line.journal is not None:
+                    line.journal.close()
+
+    # Internals (called with the lock)
+    # ================================
+    def __ahead(self, line):
+        '''
+        :return: minutes the dial is ahead of the target (holds), 0: not ahead or more than max_ahead (lagging)
+        '''
+        ahead = (line.displayed_minute - self.__target_minute) % MINUTES_PER_DIAL
+        return ahead if ahead <= self.__max_ahead else 0
+
+    def __lag(self, line):
+        return 0 if self.__ahead(line) else line.lag(self.__target_minute)
+
+    def __level(self, polarity):
+        return self.__gpio.LOW if polarity == self.__active_low else self.__gpio.HIGH
+
+    def __pulse(self, lines):
+        if not lines:
+            return 0
+        self.__gpio.output([line.pin for line in lines], [self.__level(not line.polarity) for line in lines])
+        self.__output_calls += 1
+        timestamp_ns = self.__clock.time_ns() if self.__clock is not None else time.time_ns()
+        for line in lines:
+            line.pulsed(timestamp_ns)
+        return len(lines)
+
+
+# Tests and Benchmark
+# ===================
+def Test_FanoutDriver(do_test=True):
+    if do_test:
+        print('Test_FanoutDriver()....', end='')
+        import os
+        import tempfile
+        from Class_VirtualClock import FakeGPIO
+        directory = tempfile.mkdtemp(prefix='clock_fanout_')
+        path = os.path.join(directory, 'halle.journal')
+
+        gpio = FakeGPIO()
+        fanout = FanoutDriver(gpio, target_minute=600)
+        fanout.add_line('Halle', 26, journal_path=path)
+        fanout.add_line('Perron 1', 20)
+        fanout.add_line('Perron 2', 21)
+        calls = gpio.output_calls
+        for _ in range(5):
+            assert fanout.tick() == 3
+        assert gpio.output_calls - calls == 5 and fanout.lagging == [] and fanout.pending == 0
+        assert [line.displayed_minute for line in fanout.lines] == [605, 605, 605]
+
+        fanout.set_displayed(600, ['Perron 1'])
+        fanout.set_displayed(603, ['Perron 2'])
+        assert fanout.lagging == ['Perron 1', 'Perron 2'] and fanout.pending == 5
+        assert fanout.tick() == 3 and fanout.pending == 5  # lagging lines keep their lag
+        pulsed = [fanout.step() for _ in range(6)]
+        assert pulsed == [2, 2, 1, 1, 1, 0] and fanout.lagging == [], pulsed
+        assert gpio.output_calls - calls == 6 + 5  # the last step() does not call the GPIO
+        status = {line['name']: line for line in fanout.status}
+        assert status['Perron 1']['displayed_time'] == '10:06' and status['Perron 1']['pulses'] == 11
+
+        level = gpio.input(26)
+        assert all(edge.value != previous.value for previous, edge in
+                   zip(gpio.edges_of(20), gpio.edges_of(20)[1:]))  # alternating polarity on every line
+        fanout.advance(60)
+        assert fanout.pending == 60
+        fanout.close()
+
+        # max_ahead: a dial 3 minutes ahead holds for 3 ticks, one 30 minutes ahead is lagging 690 minutes
+        held = FanoutDriver(FakeGPIO(), target_minute=480, max_ahead=10)
+        held.add_line('Halle', 26)
+        held.add_line('Perron 1', 20, displayed_minute=483)
+        held.add_line('Perron 2', 21, displayed_minute=510)
+        assert held.lagging == ['Perron 2'] and held.pending == 690 and held.status[1]['ahead_minutes'] == 3
+        assert [held.tick() for _ in range(4)] == [2, 2, 2, 3] and held.step() == 1
+        assert [line.displayed_minute for line in held.lines] == [484, 484, 515]
+
+        restarted = FanoutDriver(FakeGPIO(), target_minute=700)
+        line = restarted.add_line('Halle', 26, journal_path=path)
+        assert line.displayed_minute == 606 and line.polarity == fanout.line('Halle').polarity and restarted.pending == 94
+        assert (gpio.LOW if line.polarity else gpio.HIGH) == level
+        restarted.close()
+        os.remove(path)
+        os.rmdir(directory)
+        print('... done')
+
+
+def Benchmark_FanoutDriver(do_test=True, lines=(1, 8, 64), ticks=10000):
+    '''
+    Ticks per second with N lines: one batched output() per tick.
+    '''
+    if do_test:
+        print(f'Benchmark_FanoutDriver(ticks={ticks})....')
+        from Class_VirtualClock import FakeGPIO
+        for count in lines:
+            gpio = FakeGPIO()
+            fanout = FanoutDriver(gpio)
+            for index in range(count):
+                fanout.add_line(f'Linie {index}', index)
+            calls = gpio.output_calls
+            start = time.perf_counter()
+            for _ in range(ticks):
+                fanout.tick()
+            duration = time.perf_counter() - start
+            print(f'     lines={count:<3d} {ticks / duration:10.0f} ticks/s  {count * ticks / duration:10.0f} pulses/s  '
+                  f'output calls per tick: {(gpio.output_calls - calls) / ticks:.0f}')
+        print('... done')
+
+
+if __name__ == '__main__':
+    Test_FanoutDriver(True)
+    Benchmark_FanoutDriver(True)
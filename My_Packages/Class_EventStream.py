@@ -0,0 +1,295 @@
+#!/usr/bin/python3
+
+# ------------------------------------------------------------------
+# Name  : Class_EventStream.py
+# Source: https://raw.githubusercontent.com/walter-rothlin/RaspberryPi4PiPlates/refs/heads/main/My_Packages/Class_EventStream.py
+#
+# Description: Server-Sent Events (SSE) for the Flask web applications
+#              Producers publish events (e.g. sensor snapshots, LED-Matrix diffs) into a ring buffer with increasing ids.
+#              Every open browser connection is a generator which waits for new events and sends them as text/event-stream.
+#              A client which reconnects with Last-Event-ID gets the events it missed, or the full state if they are gone.
+#
+#                  events = EventStream()
+#                  MatrixWatcher(sense, events)
+#                  return Response(events.stream(last_event_id), mimetype='text/event-stream')   (Flask)
+#
+#                  const source = new EventSource('/events');                                      (Browser)
+#                  source.addEventListener('matrix', e => ... JSON.parse(e.data) ...);
+#
+# Autor: Walter Rothlin
+#
+# History:
+# 18-Oct-2026   Walter Rothlin      Initial Version
+# 18-Oct-2026   Walter Rothlin      MatrixWatcher: no polling without clients, reads the pixels only when pixel_version changed
+# ------------------------------------------------------------------
+
+import json
+import threading
+import time
+from collections import deque
+
+RETRY_MS = 2000  # reconnect delay for the browser
+
+
+def format_event(event_id, event, data):
+    '''
+    One event in the text/event-stream format.
+    '''
+    lines = [] if event_id is None else [f'id: {event_id}']
+    lines.append(f'event: {event}')
+    lines.extend(f'data: {line}' for line in json.dumps(data, separators=(',', ':')).splitlines())
+    return '\n'.join(lines) + '\n\n'
+
+
+def matrix_diff(old_frame, new_frame):
+    '''
+    :return: list of [index, r, g, b] for all pixels which differ (all pixels if old_frame is None)
+    '''
+    if old_frame is None:
+        return [[index] + list(pixel) for index, pixel in enumerate(new_frame)]
+    return [[index] + list(new) for index, (old, new) in enumerate(zip(old_frame, new_frame)) if list(old) != list(new)]
+
+
+class EventStream:
+    '''
+    Ring buffer of the last capacity events with a condition to wake up the waiting connections.
+    '''
+
+    # Initializer and setter/Getter and Properties
+    # ============================================
+    def __init__(self, capacity=256, keepalive=15.0, initial_events=None):
+        '''
+        Constructor
+        :param capacity: number of events kept for reconnecting clients
+        :param keepalive: seconds without event after which a comment is sent (keeps proxies and the connection open)
+        :param initial_events: function returning a list of (event, data) with the full state, sent to new clients
+        '''
+        self.__events = deque(maxlen=capacity)  # (id, event, data)
+        self.__next_id = 1
+        self.__condition = threading.Condition()
+        self.__keepalive = keepalive
+        self.__initial_events = initial_events
+        self.__clients = 0
+
+    def get_last_id(self):
+        return self.__next_id - 1
+
+    last_id = property(get_last_id)
+
+    def get_clients(self):
+        return self.__clients
+
+    clients = property(get_clients)
+
+    def set_initial_events(self, initial_events):
+        self.__initial_events = initial_events
+
+    # Business Methods
+    # ================
+    def publish(self, event, data):
+        '''
+        :return: id of the event
+        '''
+        with self.__condition:
+            event_id = self.__next_id
+            self.__next_id += 1
+            self.__events.append((event_id, event, data))
+            self.__condition.notify_all()
+        return event_id
+
+    def events_after(self, last_id):
+        '''
+        :return: (list of (id, event, data) with id > last_id, complete) complete is False if events were dropped
+        '''
+        with self.__condition:
+            return self.__events_after(last_id)
+
+    def __events_after(self, last_id):
+        events = [entry for entry in self.__events if entry[0] > last_id]
+        oldest_id = self.__events[0][0] if self.__events else self.__next_id
+        return events, last_id >= oldest_id - 1
+
+    def stream(self, last_event_id=None, timeout=None):
+        '''
+        Generator for one client connection (text/event-stream).
+        :param last_event_id: Last-Event-ID of a reconnecting client, None for a new client
+        :param timeout: seconds after which the stream ends (None = endless, the browser reconnects anyway)
+        '''
+        with self.__condition:
+            self.__clients += 1
+            last_id = self.__next_id - 1
+            send_state = True
+            if last_event_id is not None and last_event_id <= last_id and self.__events_after(last_event_id)[1]:
+                last_id = last_event_id  # reconnect: the missed events are still in the buffer
+                send_state = False
+        try:
+            yield f'retry: {RETRY_MS}\n\n'
+            if send_state and self.__initial_events is not None:
+                for event, data in self.__initial_events():
+                    yield format_event(None, event, data)
+            end = None if timeout is None else time.monotonic() + timeout
+            while end is None or time.monotonic() < end:
+                with self.__condition:
+                    events, complete = self.__events_after(last_id)
+                    if not events:
+                        self.__condition.wait(self.__keepalive)
+                        events, complete = self.__events_after(last_id)
+                if not complete and self.__initial_events is not None:
+                    for event, data in self.__initial_events():  # client too slow, missed events are gone: send the state
+                        yield format_event(None, event, data)
+                if not events:
+                    yield ': keepalive\n\n'
+                for event_id, event, data in events:
+                    yield format_event(event_id, event, data)
+                    last_id = event_id
+        finally:
+            with self.__condition:
+                self.__clients -= 1
+
+
+class MatrixWatcher:
+    '''
+    Publishes the changes of the LED-Matrix as 'matrix' events: {'pixels': [[index, r, g, b], ...]}.
+    The matrix is polled, so changes from every source (endpoints, Renderer, show_message) are seen.
+    Nothing is read while no client is connected. If the sense object has a pixel_version (MySenseHat), the
+    pixels are only read when it changed.
+    '''
+    def __init__(self, sense, event_stream, interval=0.05, start=True):
+        self.__sense = sense
+        self.__events = event_stream
+        self.__interval = interval
+        self.__frame = None
+        self.__version = None
+        self.__reads = 0
+        self.__stop_event = threading.Event()
+        self.__thread = threading.Thread(target=self.__run, name='MatrixWatcher', daemon=True)
+        if start:
+            self.__thread.start()
+
+    def get_frame(self):
+        return self.__frame
+
+    frame = property(get_frame)
+
+    def get_reads(self):
+        '''
+        :return: number of get_pixels() calls
+        '''
+        return self.__reads
+
+    reads = property(get_reads)
+
+    def check(self):
+        '''
+        Compares the LED-Matrix with the last published frame and publishes the difference.
+        :return: number of changed pixels
+        '''
+        version = getattr(self.__sense, 'pixel_version', None)
+        if version is not None and version == self.__version and self.__frame is not None:
+            return 0
+        frame = [list(pixel) for pixel in self.__sense.get_pixels()]
+        self.__reads += 1
+        self.__version = version
+        changed = matrix_diff(self.__frame, frame)
+        self.__frame = frame
+        if changed:
+            self.__events.publish('matrix', {'pixels': changed})
+        return len(changed)
+
+    def poll(self):
+        '''
+        One poll of the thread: without clients nothing is read and the last frame is forgotten, so the next
+        check() publishes all pixels (for clients reconnecting with Last-Event-ID).
+        :return: number of changed pixels
+        '''
+        if self.__events.clients == 0:
+            self.__frame = None
+            self.__version = None
+            return 0
+        return self.check()
+
+    def stop(self, timeout=None):
+        self.__stop_event.set()
+        if self.__thread.is_alive():
+            self.__thread.join(timeout)
+
+    def __run(self):
+        while not self.__stop_event.wait(self.__interval):
+            try:
+                self.poll()
+            except Exception as exception:
+                print(f'MatrixWatcher: {exception}')
+
+
+# Tests
+# =====
+class _Matrix:
+    def __init__(self):
+        self.pixels = [[0, 0, 0]] * 64
+
+    def get_pixels(self):
+        return self.pixels
+
+
+def Test_EventStream(do_test=True):
+    if do_test:
+        print('Test_EventStream()....', end='')
+        events = EventStream(capacity=4, keepalive=0.01, initial_events=lambda: [('state', {'full': True})])
+        matrix = _Matrix()
+        watcher = MatrixWatcher(matrix, events, start=False)
+
+        client = events.stream()
+        assert next(client).startswith('retry:')
+        assert next(client) == 'event: state\ndata: {"full":true}\n\n'
+
+        assert watcher.check() == 64
+        matrix.pixels = [[0, 0, 0]] * 63 + [[255, 0, 0]]
+        assert watcher.check() == 1
+        assert watcher.check() == 0
+        assert next(client).startswith('id: 1\nevent: matrix')
+        assert next(client) == 'id: 2\nevent: matrix\ndata: {"pixels":[[63,255,0,0]]}\n\n'
+        assert next(client) == ': keepalive\n\n'
+
+        # reconnect with Last-Event-ID: only the missed events
+        events.publish('sensors', {'temperature': 21.5})
+        reconnected = events.stream(last_event_id=2)
+        next(reconnected)
+        assert next(reconnected).startswith('id: 3\nevent: sensors')
+
+        # reconnect after the missed events were dropped: full state first
+        for i in range(5):
+            events.publish('sensors', {'temperature': i})
+        late = events.stream(last_event_id=2)
+        next(late)
+        assert next(late).startswith('event: state')
+        events.publish('sensors', {'temperature': 22.0})
+        assert next(late).startswith('id: 9\n')
+        assert events.clients == 3
+        late.close()
+        assert events.clients == 2
+        print('... done')
+
+
+def Test_MatrixWatcher(do_test=True):
+    if do_test:
+        print('Test_MatrixWatcher()....', end='')
+        events = EventStream(keepalive=0.01)
+        matrix = _Matrix()
+        matrix.pixel_version = 0
+        watcher = MatrixWatcher(matrix, events, start=False)
+        assert watcher.poll() == 0 and watcher.reads == 0  # no client: the matrix is not read
+
+        client = events.stream()
+        next(client)
+        assert watcher.poll() == 64 and watcher.poll() == 0 and watcher.reads == 1  # pixel_version unchanged
+        matrix.pixels = [[0, 0, 0]] * 63 + [[255, 0, 0]]
+        matrix.pixel_version += 1
+        assert watcher.poll() == 1 and watcher.reads == 2
+        client.close()
+        assert watcher.poll() == 0 and watcher.frame is None and watcher.reads == 2
+        print('... done')
+
+
+if __name__ == '__main__':
+    Test_EventStream(True)
+    Test_MatrixWatcher(True)
@@ -0,0 +1,768 @@
+#!/usr/bin/python3
+
+# ------------------------------------------------------------------
+# Name  : Class_FakeSenseHat.py
+# Source: https://raw.githubusercontent.com/walter-rothlin/RaspberryPi4PiPlates/refs/heads/main/My_Packages/Class_FakeSenseHat.py
+#
+# Description: Pure Python SenseHat without hardware (headless tests, load tests and benchmarks on any Linux)
+#              Same API as sense_hat.SenseHat (LED-Matrix, rotation, flips, text, sensors, IMU, joystick), so MySenseHat,
+#              the Flask applications and the games run unchanged:
+#
+#                  export SENSE_HAT_BACKEND=fake        # MySenseHat / Sense_Hat_Flask use FakeSenseHat
+#
+#                  sense = FakeSenseHat(latency=PI_LATENCY)                   # or: with FakeSenseHat() as sense:
+#                  sense.set_sensor('temperature', [21.0, 21.5, 22.0])       # one value per read, last one repeated
+#                  sense.set_sensor('pressure', lambda t: 1013 + t / 60)     # function of the elapsed seconds
+#                  sense.load_recording('imu.csv')                           # recorded series (e.g. IMUStream.save())
+#                  sense.stick.play([(0.5, 'up', 'pressed'), (0.1, 'up', 'released')])
+#                  print(sense.statistics)                                   # calls and simulated I/O time
+#
+#              The LED-Matrix is a memory mapped temporary file in the framebuffer format (RGB565), _fb_device is its
+#              path, so FramebufferDevice and everything reading the framebuffer works as with the real device.
+#
+# Autor: Walter Rothlin
+#
+# History:
+# 18-Oct-2026   Walter Rothlin      Initial Version
+# 18-Oct-2026   Walter Rothlin      Context manager and finalizer: the framebuffer file and the joystick pipe are always freed
+# ------------------------------------------------------------------
+
+import bisect
+import csv
+import inspect
+import math
+import os
+import select
+import struct
+import tempfile
+import threading
+import time
+from collections import Counter, namedtuple
+from Class_FramebufferDevice import FramebufferDevice, FRAME_BYTES, PIX_MAPS
+
+# Rough I/O times on a Raspberry Pi 4 (seconds per call), for realistic load tests
+PI_LATENCY = {'set_pixels': 0.002,
+              'get_pixels': 0.002,
+              'set_pixel': 0.0002,
+              'get_pixel': 0.0002,
+              'get_humidity': 0.01,
+              'get_temperature_from_humidity': 0.01,
+              'get_temperature_from_pressure': 0.01,
+              'get_pressure': 0.01,
+              'read_imu': 0.003}
+
+SENSOR_DEFAULTS = {'temperature': 21.5,
+                   'humidity': 45.0,
+                   'pressure': 1013.25,
+                   'orientation': (0.0, 0.0, 0.0),      # pitch, roll, yaw in degrees
+                   'accelerometer': (0.0, 0.0, 1.0),    # G
+                   'gyroscope': (0.0, 0.0, 0.0),        # rad/s
+                   'compass': (20.0, 0.0, -40.0)}       # uT
+
+# columns of a recording (CSV) --> sensor, IMU columns as written by Class_IMUStream
+RECORDING_COLUMNS = {'temperature': ('temperature',),
+                     'humidity': ('humidity',),
+                     'pressure': ('pressure',),
+                     'orientation': ('pitch', 'roll', 'yaw'),
+                     'accelerometer': ('accel_x', 'accel_y', 'accel_z'),
+                     'gyroscope': ('gyro_x', 'gyro_y', 'gyro_z'),
+                     'compass': ('compass_x', 'compass_y', 'compass_z')}
+
+
+def get_sense_hat_class(backend=None):
+    '''
+    :param backend: 'fake' or 'hardware', default the environment variable SENSE_HAT_BACKEND (default 'hardware')
+    :return: FakeSenseHat or sense_hat.SenseHat
+    '''
+    backend = (backend or os.environ.get('SENSE_HAT_BACKEND', 'hardware')).lower()
+    if backend == 'fake':
+        return FakeSenseHat
+    from sense_hat import SenseHat
+    return SenseHat
+
+
+# Sensor series
+# =============
+class SensorSeries:
+    '''
+    Values of one sensor. The source is
+        a number or tuple:    constant
+        a function:           function(elapsed seconds)
+        a list or iterator:   one value per read, the last value is repeated at the end
+        (times, values):      recorded series, the value at the elapsed time (optionally looped)
+    '''
+    def __init__(self, source, loop=False):
+        self.__function = None
+        self.__iterator = None
+        self.__times = None
+        self.__loop = loop
+        self.__value = None
+        if callable(source):
+            self.__function = source
+        elif isinstance(source, (int, float)) or (isinstance(source, tuple) and not isinstance(source[0], (list, tuple))):
+            self.__value = source
+        elif isinstance(source, tuple) and len(source) == 2:
+            self.__times, self.__values = list(source[0]), list(source[1])
+        else:
+            self.__iterator = iter(source)
+
+    def value(self, elapsed):
+        if self.__function is not None:
+            return self.__function(elapsed)
+        if self.__iterator is not None:
+            self.__value = next(self.__iterator, self.__value)
+            return self.__value
+        if self.__times is not None:
+            times = self.__times
+            if self.__loop and elapsed > times[-1]:
+                elapsed = times[0] + (elapsed - times[0]) % (times[-1] - times[0] or 1)
+            index = max(bisect.bisect_right(times, elapsed) - 1, 0)
+            return self.__values[index]
+        return self.__value
+
+
+# IMU
+# ===
+class FakeIMU:
+    '''
+    Replacement of RTIMU.RTIMU, getIMUData() as used by SenseHat._read_imu() / SenseHat._get_raw_data().
+    '''
+    def __init__(self, sense):
+        self.__sense = sense
+
+    def IMURead(self):
+        return True
+
+    def IMUGetPollInterval(self):
+        return 3
+
+    def getIMUData(self):
+        values = self.__sense._imu_values()
+        pitch, roll, yaw = (math.radians(value) for value in values['orientation'])
+        return {'fusionPoseValid': True, 'fusionPose': (roll, pitch, yaw),
+                'accelValid': True, 'accel': tuple(values['accelerometer']),
+                'gyroValid': True, 'gyro': tuple(values['gyroscope']),
+                'compassValid': True, 'compass': tuple(values['compass'])}
+
+
+# Joystick
+# ========
+InputEvent = namedtuple('InputEvent', ('timestamp', 'direction', 'action'))
+
+
+class FakeStick:
+    '''
+    Joystick with the API of sense_hat.stick.SenseStick. The events are written into a pipe in the evdev format,
+    so select(), add_reader() and blocking reads behave as with the input device.
+    '''
+    EVENT_FORMAT = 'llHHI'
+    EVENT_SIZE = struct.calcsize(EVENT_FORMAT)
+    EV_KEY = 0x01
+    KEY_CODES = {'up': 103, 'left': 105, 'right': 106, 'down': 108, 'middle': 28}
+    ACTION_VALUES = {'released': 0, 'pressed': 1, 'held': 2}
+
+    def __init__(self):
+        read_fd, write_fd = os.pipe()
+        self._stick_file = os.fdopen(read_fd, 'rb', buffering=0)
+        self.__write_fd = write_fd
+        self.__directions = {code: direction for direction, code in self.KEY_CODES.items()}
+        self.__actions = {value: action for action, value in self.ACTION_VALUES.items()}
+        self._callbacks = {}
+        self._callback_thread = None
+        self._callback_event = threading.Event()
+
+    def close(self):
+        if self._stick_file:
+            self._callbacks.clear()
+            self._start_stop_thread()
+            self._stick_file.close()
+            os.close(self.__write_fd)
+            self._stick_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        self.close()
+
+    # Scripted input
+    # ==============
+    def push(self, direction, action='pressed', timestamp=None):
+        '''
+        Writes one event as the kernel does.
+        '''
+        timestamp = time.time() if timestamp is None else timestamp
+        seconds = int(timestamp)
+        event = struct.pack(self.EVENT_FORMAT, seconds, int((timestamp - seconds) * 1000000),
+                            self.EV_KEY, self.KEY_CODES[direction], self.ACTION_VALUES[action])
+        os.write(self.__write_fd, event)
+
+    def press(self, direction):
+        '''
+        Pressed and released.
+        '''
+        self.push(direction, 'pressed')
+        self.push(direction, 'released')
+
+    def play(self, script, wait=False):
+        '''
+        Plays a list of (delay in seconds, direction, action) in a daemon thread.
+        :return: the thread
+        '''
+        def run():
+            for delay, direction, action in script:
+                time.sleep(delay)
+                self.push(direction, action)
+        thread = threading.Thread(target=run, name='FakeStick', daemon=True)
+        thread.start()
+        if wait:
+            thread.join()
+        return thread
+
+    # SenseStick API
+    # ==============
+    def _read(self):
+        event = self._stick_file.read(self.EVENT_SIZE)
+        tv_sec, tv_usec, type, code, value = struct.unpack(self.EVENT_FORMAT, event)
+        if type != self.EV_KEY:
+            return None
+        return InputEvent(tv_sec + tv_usec / 1000000, self.__directions[code], self.__actions[value])
+
+    def _wait(self, timeout=None):
+        readable, writable, exceptional = select.select([self._stick_file], [], [], timeout)
+        return bool(readable)
+
+    def wait_for_event(self, emptybuffer=False):
+        if emptybuffer:
+            while self._wait(0):
+                self._read()
+        while self._wait():
+            event = self._read()
+            if event:
+                return event
+
+    def get_events(self):
+        result = []
+        while self._wait(0):
+            event = self._read()
+            if event:
+                result.append(event)
+        return result
+
+    def _set_callback(self, key, function):
+        if function is not None and not callable(function):
+            raise ValueError('value must be None or a callable')
+        if function is not None and not inspect.signature(function).parameters:
+            function = (lambda callback: lambda event: callback())(function)
+        self._callbacks[key] = function
+        if function is None:
+            del self._callbacks[key]
+        self._start_stop_thread()
+
+    def _start_stop_thread(self):
+        if self._callbacks and not self._callback_thread:
+            self._callback_event.clear()
+            self._callback_thread = threading.Thread(target=self._callback_run, daemon=True)
+            self._callback_thread.start()
+        elif not self._callbacks and self._callback_thread:
+            self._callback_event.set()
+            self._callback_thread.join()
+            self._callback_thread = None
+
+    def _callback_run(self):
+        while not self._callback_event.is_set():
+            if not self._wait(0.1):
+                continue
+            event = self._read()
+            if event:
+                for key in (event.direction, '*'):
+                    callback = self._callbacks.get(key)
+                    if callback:
+                        callback(event)
+
+    direction_up = property(lambda self: self._callbacks.get('up'), lambda self, value: self._set_callback('up', value))
+    direction_down = property(lambda self: self._callbacks.get('down'), lambda self, value: self._set_callback('down', value))
+    direction_left = property(lambda self: self._callbacks.get('left'), lambda self, value: self._set_callback('left', value))
+    direction_right = property(lambda self: self._callbacks.get('right'), lambda self, value: self._set_callback('right', value))
+    direction_middle = property(lambda self: self._callbacks.get('middle'), lambda self, value: self._set_callback('middle', value))
+    direction_any = property(lambda self: self._callbacks.get('*'), lambda self, value: self._set_callback('*', value))
+
+
+# Font
+# ====
+def _load_font():
+    '''
+    The font of the installed sense_hat package (needs PIL), otherwise generated placeholder glyphs
+    (same size and trimming, so the scroll length of show_message() is realistic).
+    '''
+    try:
+        import sense_hat
+        from PIL import Image
+        directory = os.path.dirname(sense_hat.__file__)
+        pixels = [list(pixel) for pixel in Image.open(os.path.join(directory, 'sense_hat_text.png')).convert('RGB').getdata()]
+        with open(os.path.join(directory, 'sense_hat_text.txt'), 'r') as file:
+            return {char: pixels[index * 40:index * 40 + 40] for index, char in enumerate(file.read())}
+    except Exception:
+        font = {}
+        for code in range(32, 127):
+            width = 3 if chr(code) in '.,:;!\'|' else 5
+            font[chr(code)] = [[255, 255, 255] if code != 32 and column < width and 1 <= row <= 6 and (code >> (row + column) % 7) & 1
+                               else [0, 0, 0] for column in range(5) for row in range(8)]
+        return font
+
+
+# SenseHat
+# ========
+class FakeSenseHat:
+    '''
+    SenseHat without hardware. Every device call is counted, with latency it also takes the simulated I/O time.
+    '''
+    SENSE_HAT_FB_NAME = 'RPi-Sense FB'
+
+    # Initializer and setter/Getter and Properties
+    # ============================================
+    def __init__(self, imu_settings_file='RTIMULib', text_assets='sense_hat_text', sensors=None, latency=None, clock=None):
+        '''
+        Constructor (the parameters of SenseHat are accepted and ignored)
+        :param sensors: dict sensor --> source (see SensorSeries), e.g. {'temperature': 25.0}
+        :param latency: dict call --> seconds (e.g. PI_LATENCY), None: no delay
+        :param clock: function returning seconds (elapsed time of the sensor series), default time.monotonic
+        '''
+        file_descriptor, self._fb_device = tempfile.mkstemp(prefix='fake_sense_hat_fb_')
+        os.write(file_descriptor, bytes(FRAME_BYTES))
+        os.close(file_descriptor)
+        self.__fb = FramebufferDevice(self._fb_device)
+        self._rotation = 0
+        self._text_dict = _load_font()
+        self._imu = FakeIMU(self)
+        self._stick = FakeStick()
+        self.__clock = clock or time.monotonic
+        self.__start = self.__clock()
+        self.__latency = dict(latency or {})
+        self.__calls = Counter()
+        self.__io_time = 0.0
+        self.__lock = threading.Lock()
+        self.__gamma = list(range(32))
+        self.__sensors = {name: SensorSeries(value) for name, value in SENSOR_DEFAULTS.items()}
+        for name, source in (sensors or {}).items():
+            self.set_sensor(name, source)
+
+    def close(self):
+        '''
+        Frees the framebuffer file and the joystick pipe (also done by with and when the object is garbage collected).
+        '''
+        if getattr(self, '_FakeSenseHat__fb', None) is not None:
+            self.__fb.close()
+            self._stick.close()
+            os.remove(self._fb_device)
+            self.__fb = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:  # interpreter shutdown
+            pass
+
+    @property
+    def stick(self):
+        return self._stick
+
+    @property
+    def has_colour_sensor(self):
+        return False
+
+    def set_latency(self, latency):
+        self.__latency = dict(latency or {})
+
+    def get_statistics(self):
+        '''
+        :return: dict with the calls per method and the simulated I/O time in seconds
+        '''
+        with self.__lock:
+            return {'calls': dict(self.__calls), 'io_time': round(self.__io_time, 6)}
+
+    statistics = property(get_statistics)
+
+    def reset_statistics(self):
+        with self.__lock:
+            self.__calls.clear()
+            self.__io_time = 0.0
+
+    def set_sensor(self, name, source, loop=False):
+        '''
+        :param name: temperature, humidity, pressure, orientation, accelerometer, gyroscope or compass
+        :param source: see SensorSeries
+        '''
+        if name not in SENSOR_DEFAULTS:
+            raise ValueError(f'Unknown sensor {name}, known: {", ".join(SENSOR_DEFAULTS)}')
+        self.__sensors[name] = SensorSeries(source, loop)
+
+    def load_recording(self, path, loop=True):
+        '''
+        Sensor series from a CSV file with a 'time' column (seconds) and any of the RECORDING_COLUMNS.
+        The times are relative to the first row.
+        '''
+        with open(path, newline='') as file:
+            rows = list(csv.DictReader(file))
+        if not rows:
+            return
+        start = float(rows[0]['time'])
+        times = [float(row['time']) - start for row in rows]
+        for name, columns in RECORDING_COLUMNS.items():
+            if all(column in rows[0] for column in columns):
+                values = [tuple(float(row[column]) for column in columns) for row in rows]
+                if len(columns) == 1:
+                    values = [value[0] for value in values]
+                self.set_sensor(name, (times, values), loop)
+
+    def __device_io(self, name):
+        delay = self.__latency.get(name, 0)
+        with self.__lock:
+            self.__calls[name] += 1
+            self.__io_time += delay
+        if delay:
+            time.sleep(delay)
+
+    def __sensor(self, name):
+        return self.__sensors[name].value(self.__clock() - self.__start)
+
+    def _imu_values(self):
+        return {name: self.__sensor(name) for name in ('orientation', 'accelerometer', 'gyroscope', 'compass')}
+
+    # LED-Matrix
+    # ==========
+    @property
+    def rotation(self):
+        return self._rotation
+
+    @rotation.setter
+    def rotation(self, r):
+        self.set_rotation(r, True)
+
+    def set_rotation(self, r=0, redraw=True):
+        if r not in (0, 90, 180, 270):
+            raise ValueError('Rotation must be 0, 90, 180 or 270 degrees')
+        if redraw:
+            pixel_list = self.get_pixels()
+        self._rotation = r
+        if redraw:
+            self.set_pixels(pixel_list)
+
+    def flip_h(self, redraw=True):
+        pixel_list = self.get_pixels()
+        flipped = []
+        for i in range(8):
+            flipped.extend(reversed(pixel_list[i * 8:i * 8 + 8]))
+        if redraw:
+            self.set_pixels(flipped)
+        return flipped
+
+    def flip_v(self, redraw=True):
+        pixel_list = self.get_pixels()
+        flipped = []
+        for i in reversed(range(8)):
+            flipped.extend(pixel_list[i * 8:i * 8 + 8])
+        if redraw:
+            self.set_pixels(flipped)
+        return flipped
+
+    def set_pixels(self, pixel_list):
+        if len(pixel_list) != 64:
+            raise ValueError('Pixel lists must have 64 elements')
+        for index, pix in enumerate(pixel_list):
+            if len(pix) != 3:
+                raise ValueError('Pixel at index %d is invalid. Pixels must contain 3 elements: Red, Green and Blue' % index)
+            for element in pix:
+                if element > 255 or element < 0:
+                    raise ValueError('Pixel at index %d is invalid. Pixel elements must be between 0 and 255' % index)
+        self.__device_io('set_pixels')
+        self.__fb.set_pixels(pixel_list, self._rotation)
+
+    def get_pixels(self):
+        self.__device_io('get_pixels')
+        return self.__fb.get_pixels(self._rotation)
+
+    def set_pixel(self, x, y, *args):
+        pixel_error = 'Pixel arguments must be given as (r, g, b) or r, g, b'
+        if len(args) == 1:
+            pixel = args[0]
+            if len(pixel) != 3:
+                raise ValueError(pixel_error)
+        elif len(args) == 3:
+            pixel = args
+        else:
+            raise ValueError(pixel_error)
+        if x > 7 or x < 0:
+            raise ValueError('X position must be between 0 and 7')
+        if y > 7 or y < 0:
+            raise ValueError('Y position must be between 0 and 7')
+        for element in pixel:
+            if element > 255 or element < 0:
+                raise ValueError('Pixel elements must be between 0 and 255')
+        self.__device_io('set_pixel')
+        self.__fb.set_pixel(x, y, pixel, self._rotation)
+
+    def get_pixel(self, x, y):
+        if x > 7 or x < 0:
+            raise ValueError('X position must be between 0 and 7')
+        if y > 7 or y < 0:
+            raise ValueError('Y position must be between 0 and 7')
+        self.__device_io('get_pixel')
+        return self.__fb.get_pixel(x, y, self._rotation)
+
+    def load_image(self, file_path, redraw=True):
+        if not os.path.exists(file_path):
+            raise IOError('%s not found' % file_path)
+        from PIL import Image
+        pixel_list = list(map(list, Image.open(file_path).convert('RGB').getdata()))
+        if redraw:
+            self.set_pixels(pixel_list)
+        return pixel_list
+
+    def clear(self, *args):
+        if len(args) == 0:
+            colour = (0, 0, 0)
+        elif len(args) == 1:
+            colour = args[0]
+        elif len(args) == 3:
+            colour = args
+        else:
+            raise ValueError('Pixel arguments must be given as (r, g, b) or r, g, b')
+        self.set_pixels([colour] * 64)
+
+    # Text (as SenseHat: drawn with rotation - 90, the glyphs are stored rotated)
+    # ==========================================================================
+    def _trim_whitespace(self, char):
+        psum = lambda x: sum(sum(x, []))
+        if psum(char) > 0:
+            while psum(char[0:8]) == 0:
+                del char[0:8]
+            while psum(char[-8:]) == 0:
+                del char[-8:]
+        return char
+
+    def _get_char_pixels(self, s):
+        if len(s) == 1 and s in self._text_dict:
+            return list(self._text_dict[s])
+        return list(self._text_dict['?'])
+
+    def show_message(self, text_string, scroll_speed=.1, text_colour=[255, 255, 255], back_colour=[0, 0, 0]):
+        previous_rotation = self._rotation
+        self._rotation = (self._rotation - 90) % 360
+        scroll_pixels = [[None, None, None]] * 64
+        for s in text_string:
+            scroll_pixels.extend(self._trim_whitespace(self._get_char_pixels(s)))
+            scroll_pixels.extend([[None, None, None]] * 8)
+        scroll_pixels.extend([[None, None, None]] * 64)
+        coloured_pixels = [text_colour if pixel == [255, 255, 255] else back_colour for pixel in scroll_pixels]
+        try:
+            for i in range(len(coloured_pixels) // 8 - 8):
+                self.set_pixels(coloured_pixels[i * 8:i * 8 + 64])
+                time.sleep(scroll_speed)
+        finally:
+            self._rotation = previous_rotation
+
+    def show_letter(self, s, text_colour=[255, 255, 255], back_colour=[0, 0, 0]):
+        if len(s) > 1:
+            raise ValueError('Only one character may be passed into this method')
+        previous_rotation = self._rotation
+        self._rotation = (self._rotation - 90) % 360
+        pixel_list = [[None, None, None]] * 8 + self._get_char_pixels(s) + [[None, None, None]] * 16
+        try:
+            self.set_pixels([text_colour if pixel == [255, 255, 255] else back_colour for pixel in pixel_list])
+        finally:
+            self._rotation = previous_rotation
+
+    @property
+    def gamma(self):
+        return list(self.__gamma)
+
+    @gamma.setter
+    def gamma(self, buffer):
+        if len(buffer) != 32:
+            raise ValueError('Gamma array must be of length 32')
+        if not all(0 <= value <= 31 for value in buffer):
+            raise ValueError('Gamma values must be bewteen 0 and 31')
+        self.__gamma = list(buffer)
+
+    def gamma_reset(self):
+        self.__gamma = list(range(32))
+
+    @property
+    def low_light(self):
+        return self.__gamma == [0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 2, 2, 2, 3, 3, 3, 4, 4, 5, 5, 6, 6, 7, 7, 8, 8, 9, 10, 10]
+
+    @low_light.setter
+    def low_light(self, value):
+        self.__gamma = [0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 2, 2, 2, 3, 3, 3, 4, 4, 5, 5, 6, 6, 7, 7, 8, 8, 9, 10, 10] \
+            if value else list(range(32))
+
+    # Environmental sensors
+    # =====================
+    def get_humidity(self):
+        self.__device_io('get_humidity')
+        return self.__sensor('humidity')
+
+    def get_temperature_from_humidity(self):
+        self.__device_io('get_temperature_from_humidity')
+        return self.__sensor('temperature')
+
+    def get_temperature_from_pressure(self):
+        self.__device_io('get_temperature_from_pressure')
+        return self.__sensor('temperature')
+
+    def get_temperature(self):
+        return self.get_temperature_from_humidity()
+
+    def get_pressure(self):
+        self.__device_io('get_pressure')
+        return self.__sensor('pressure')
+
+    humidity = property(get_humidity)
+    temp = property(get_temperature)
+    temperature = property(get_temperature)
+    pressure = property(get_pressure)
+
+    # IMU
+    # ===
+    def set_imu_config(self, compass_enabled, gyro_enabled, accel_enabled):
+        if not all(isinstance(value, bool) for value in (compass_enabled, gyro_enabled, accel_enabled)):
+            raise TypeError('All set_imu_config parameters must be of boolean type')
+
+    def _read_imu(self):
+        self.__device_io('read_imu')
+        return True
+
+    def __raw(self, data_key):
+        self._read_imu()
+        x, y, z = self._imu.getIMUData()[data_key]
+        return {'x': x, 'y': y, 'z': z}
+
+    def get_orientation_radians(self):
+        raw = self.__raw('fusionPose')
+        return {'roll': raw['x'], 'pitch': raw['y'], 'yaw': raw['z']}
+
+    def get_orientation_degrees(self):
+        orientation = self.get_orientation_radians()
+        for key, value in orientation.items():
+            degrees = math.degrees(value)
+            orientation[key] = degrees + 360 if degrees < 0 else degrees
+        return orientation
+
+    def get_orientation(self):
+        return self.get_orientation_degrees()
+
+    def get_compass(self):
+        return self.get_orientation_degrees()['yaw']
+
+    def get_compass_raw(self):
+        return self.__raw('compass')
+
+    def get_gyroscope(self):
+        return self.get_orientation_degrees()
+
+    def get_gyroscope_raw(self):
+        return self.__raw('gyro')
+
+    def get_accelerometer(self):
+        return self.get_orientation_degrees()
+
+    def get_accelerometer_raw(self):
+        return self.__raw('accel')
+
+    orientation_radians = property(get_orientation_radians)
+    orientation = property(get_orientation_degrees)
+    compass = property(get_compass)
+    compass_raw = property(get_compass_raw)
+    gyro = gyroscope = property(get_gyroscope)
+    gyro_raw = gyroscope_raw = property(get_gyroscope_raw)
+    accel = accelerometer = property(get_accelerometer)
+    accel_raw = accelerometer_raw = property(get_accelerometer_raw)
+
+
+# Tests and Benchmark
+# ===================
+def Test_FakeSenseHat(do_test=True):
+    if do_test:
+        print('Test_FakeSenseHat()....', end='')
+        with FakeSenseHat(sensors={'temperature': [20.0, 21.0], 'pressure': lambda t: 1000.0}) as sense:
+            fb_device = sense._fb_device
+            sense.set_pixel(1, 0, 255, 0, 0)
+            assert sense.get_pixel(1, 0) == [248, 0, 0]  # RGB565 as the framebuffer
+            sense.set_rotation(90)  # redraw: same picture, other LEDs
+            assert sense.get_pixel(1, 0) == [248, 0, 0] and sense.flip_h(redraw=False)[6] == [248, 0, 0]
+            sense.set_rotation(0, redraw=False)
+            assert sense.get_pixels()[PIX_MAPS[90][1]] == [248, 0, 0]
+            sense.set_rotation(90, redraw=False)
+            sense.set_rotation(0)
+            assert sense.flip_h()[6] == [248, 0, 0] and sense.get_pixel(6, 0) == [248, 0, 0]
+            assert sense.flip_v(redraw=False)[62] == [248, 0, 0]
+            with FramebufferDevice(sense._fb_device) as fb:  # same memory as a FramebufferDevice on _fb_device
+                assert fb.get_pixel(6, 0) == [248, 0, 0]
+
+            sense.show_message('Hi', scroll_speed=0)
+            sense.show_letter('A')
+            assert sense.rotation == 0
+
+            assert [sense.get_temperature(), sense.get_temperature(), sense.get_temperature()] == [20.0, 21.0, 21.0]
+            assert sense.get_pressure() == 1000.0 and sense.get_humidity() == 45.0
+            sense.set_sensor('orientation', (10.0, 20.0, 270.0))
+            assert round(sense.get_compass()) == 270 and round(sense.get_orientation()['roll']) == 20
+            assert sense.get_accelerometer_raw() == {'x': 0.0, 'y': 0.0, 'z': 1.0}
+
+        assert not os.path.exists(fb_device)
+
+        recording = os.path.join(tempfile.gettempdir(), 'fake_sense_hat_recording.csv')
+        with open(recording, 'w') as file:
+            file.write('time,temperature,accel_x,accel_y,accel_z\n100,10,0,0,1\n101,11,0,1,0\n')
+        clock = [0.0]
+        sense = FakeSenseHat(clock=lambda: clock[0])
+        sense.load_recording(recording, loop=False)
+        clock[0] = 0.5
+        assert sense.get_temperature() == 10.0
+        clock[0] = 1.5
+        assert sense.get_temperature() == 11.0 and sense.get_accelerometer_raw()['y'] == 1.0
+
+        sense.stick.press('up')
+        sense.stick.push('left', 'held')
+        events = sense.stick.get_events()
+        assert [(event.direction, event.action) for event in events] == [('up', 'pressed'), ('up', 'released'), ('left', 'held')]
+        received = []
+        sense.stick.direction_middle = received.append
+        sense.stick.play([(0, 'middle', 'pressed')], wait=True)
+        time.sleep(0.2)
+        sense.stick.direction_middle = None
+        assert received[0].direction == 'middle'
+        assert sense.statistics['calls'] == {'get_temperature_from_humidity': 2, 'read_imu': 1}
+        sense.close()
+        os.remove(recording)
+        print('... done')
+
+
+def Benchmark_FakeSenseHat(do_test=True, count=200):
+    '''
+    Time of drawing code with and without simulated Raspberry Pi I/O.
+    '''
+    if do_test:
+        print('Benchmark_FakeSenseHat()....')
+        for name, latency in (('no latency', None), ('PI_LATENCY', PI_LATENCY)):
+            sense = FakeSenseHat(latency=latency)
+            start = time.perf_counter()
+            for i in range(count):
+                sense.set_pixels([[i % 256, 0, 0]] * 64)
+                sense.set_pixel(i % 8, 0, 0, 255, 0)
+            duration = time.perf_counter() - start
+            print(f'     {name:10s}: {duration / count * 1000:7.3f} ms per frame, {sense.statistics}')
+            sense.close()
+        print('... done')
+
+
+if __name__ == '__main__':
+    Test_FakeSenseHat(True)
+    Benchmark_FakeSenseHat(True)
@@ -0,0 +1,351 @@
+#!/usr/bin/python3
+
+# ------------------------------------------------------------------
+# Name  : Class_FlaskMetrics.py
+# Source: https://raw.githubusercontent.com/walter-rothlin/RaspberryPi4PiPlates/refs/heads/main/My_Packages/Class_FlaskMetrics.py
+#
+# Description: Instrumentation for the Flask applications, exposed as /metrics in the Prometheus text format
+#              Per route (URL rule, method, status): request counts and a latency histogram, the requests in flight
+#              and histograms of the hardware calls (LED-Matrix, sensors, GPIO):
+#
+#                  metrics = FlaskMetrics(app, prefix='sense_hat')
+#                  metrics.instrument(sense, ('set_pixels', 'get_temperature'))   # wraps the methods of an object
+#
+#                  @metrics.timed('switch_gpio')                                  # or as decorator
+#                  def switchGPIO(): ...
+#
+#                  with metrics.timed('read_config'):                             # or as context manager
+#                      ...
+#
+#              One observation is a bisect and a few increments under a lock (about a microsecond), so the
+#              instrumentation can stay on in production. Nothing is computed before /metrics is requested.
+#
+# Autor: Walter Rothlin
+#
+# History:
+# 18-Oct-2026   Walter Rothlin      Initial Version
+# 18-Oct-2026   Walter Rothlin      Help text of the in-flight gauge: streamed bodies are not counted
+# ------------------------------------------------------------------
+
+import bisect
+import functools
+import threading
+import time
+
+# upper bounds in seconds (le), +Inf is added
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    '''
+    Counts per bucket, sum and count. Not thread safe by itself, FlaskMetrics holds the lock.
+    '''
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.__buckets = tuple(sorted(buckets))
+        self.__counts = [0] * (len(self.__buckets) + 1)  # last one: above the highest bucket
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.__counts[bisect.bisect_left(self.__buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        '''
+        :return: list of (le, count of values <= le), the last le is '+Inf'
+        '''
+        result = []
+        total = 0
+        for le, count in zip(self.__buckets + ('+Inf',), self.__counts):
+            total += count
+            result.append((le, total))
+        return result
+
+
+class _CallTimer:
+    '''
+    Context manager and decorator of FlaskMetrics.timed().
+    '''
+    def __init__(self, metrics, name):
+        self.__metrics = metrics
+        self.__name = name
+        self.__local = threading.local()
+
+    def __enter__(self):
+        self.__local.__dict__.setdefault('starts', []).append(time.perf_counter())
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.__metrics.observe_call(self.__name, time.perf_counter() - self.__local.starts.pop(), exc_type is not None)
+        return False
+
+    def __call__(self, function):
+        metrics, name = self.__metrics, self.__name
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = function(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                metrics.observe_call(name, time.perf_counter() - start, failed)
+        return wrapper
+
+
+class FlaskMetrics:
+    '''
+    Request and hardware call metrics of one Flask application.
+    '''
+
+    # Initializer and setter/Getter and Properties
+    # ============================================
+    def __init__(self, app=None, prefix='flask', buckets=DEFAULT_BUCKETS, metrics_path='/metrics'):
+        '''
+        Constructor
+        :param app: Flask application, or None and init_app() later
+        :param prefix: prefix of the metric names (e.g. sense_hat --> sense_hat_http_requests_total)
+        :param buckets: upper bounds of the histograms in seconds
+        :param metrics_path: URL of the Prometheus endpoint, None: no endpoint (render() can be used)
+        '''
+        self.__prefix = prefix
+        self.__buckets = buckets
+        self.__metrics_path = metrics_path
+        self.__lock = threading.Lock()
+        self.__requests = {}          # (route, method, status) --> count
+        self.__request_times = {}     # (route, method) --> Histogram
+        self.__calls = {}             # name --> Histogram
+        self.__call_errors = {}       # name --> count
+        self.__in_flight = 0
+        self.__started_at = time.time()
+        self.__local = threading.local()
+        if app is not None:
+            self.init_app(app)
+
+    def get_in_flight(self):
+        return self.__in_flight
+
+    in_flight = property(get_in_flight)
+
+    def init_app(self, app):
+        app.before_request(self.__before_request)
+        app.after_request(self.__after_request)
+        app.teardown_request(self.__teardown_request)
+        if self.__metrics_path is not None:
+            app.add_url_rule(self.__metrics_path, 'metrics', self.metrics_view)
+        return self
+
+    # Business Methods
+    # ================
+    def timed(self, name):
+        '''
+        :return: context manager and decorator which records the duration as hardware call name
+        '''
+        return _CallTimer(self, name)
+
+    def instrument(self, target, names):
+        '''
+        Replaces the methods (or module functions) names of target by timed wrappers.
+        '''
+        for name in names:
+            setattr(target, name, self.timed(name)(getattr(target, name)))
+        return target
+
+    def observe_call(self, name, duration, failed=False):
+        with self.__lock:
+            histogram = self.__calls.get(name)
+            if histogram is None:
+                histogram = self.__calls[name] = Histogram(self.__buckets)
+                self.__call_errors[name] = 0
+            histogram.observe(duration)
+            if failed:
+                self.__call_errors[name] += 1
+
+    def observe_request(self, route, method, status, duration):
+        key = (route, method)
+        with self.__lock:
+            histogram = self.__request_times.get(key)
+            if histogram is None:
+                histogram = self.__request_times[key] = Histogram(self.__buckets)
+            histogram.observe(duration)
+            self.__requests[(route, method, status)] = self.__requests.get((route, method, status), 0) + 1
+
+    def render(self):
+        '''
+        :return: all metrics in the Prometheus text format
+        '''
+        prefix = self.__prefix
+        with self.__lock:
+            requests = sorted(self.__requests.items())
+            request_times = [(key, histogram.cumulative(), histogram.sum, histogram.count)
+                             for key, histogram in sorted(self.__request_times.items())]
+            calls = [(name, histogram.cumulative(), histogram.sum, histogram.count, self.__call_errors[name])
+                     for name, histogram in sorted(self.__calls.items())]
+            in_flight = self.__in_flight
+        lines = [f'# HELP {prefix}_http_requests_total Requests per route, method and status.',
+                 f'# TYPE {prefix}_http_requests_total counter']
+        for (route, method, status), count in requests:
+            lines.append(f'{prefix}_http_requests_total{{{_labels(route=route, method=method, status=status)}}} {count}')
+        lines += [f'# HELP {prefix}_http_request_duration_seconds Request latency per route and method.',
+                  f'# TYPE {prefix}_http_request_duration_seconds histogram']
+        for (route, method), buckets, total, count in request_times:
+            lines += self.__histogram_lines(f'{prefix}_http_request_duration_seconds', buckets, total, count,
+                                            route=route, method=method)
+        lines += [f'# HELP {prefix}_http_requests_in_flight Requests being processed (a streamed body like /events is not counted).',
+                  f'# TYPE {prefix}_http_requests_in_flight gauge',
+                  f'{prefix}_http_requests_in_flight {in_flight}',
+                  f'# HELP {prefix}_hardware_call_duration_seconds Duration of the hardware calls.',
+                  f'# TYPE {prefix}_hardware_call_duration_seconds histogram']
+        for name, buckets, total, count, errors in calls:
+            lines += self.__histogram_lines(f'{prefix}_hardware_call_duration_seconds', buckets, total, count, call=name)
+        lines += [f'# HELP {prefix}_hardware_call_errors_total Hardware calls which raised an exception.',
+                  f'# TYPE {prefix}_hardware_call_errors_total counter']
+        for name, buckets, total, count, errors in calls:
+            lines.append(f'{prefix}_hardware_call_errors_total{{{_labels(call=name)}}} {errors}')
+        lines += [f'# HELP {prefix}_start_time_seconds Start of the application (unix time).',
+                  f'# TYPE {prefix}_start_time_seconds gauge',
+                  f'{prefix}_start_time_seconds {self.__started_at:.3f}']
+        return '\n'.join(lines) + '\n'
+
+    def metrics_view(self):
+        from flask import Response
+        return Response(self.render(), mimetype=CONTENT_TYPE)
+
+    # Internals
+    # =========
+    @staticmethod
+    def __histogram_lines(name, buckets, total, count, **labels):
+        label_text = _labels(**labels)
+        lines = [f'{name}_bucket{{{label_text},le="{_number(le) if le != "+Inf" else le}"}} {value}' for le, value in buckets]
+        lines.append(f'{name}_sum{{{label_text}}} {total!r}')
+        lines.append(f'{name}_count{{{label_text}}} {count}')
+        return lines
+
+    def __before_request(self):
+        self.__local.start = time.perf_counter()
+        self.__local.status = None
+        with self.__lock:
+            self.__in_flight += 1
+
+    def __after_request(self, response):
+        self.__local.status = response.status_code
+        return response
+
+    def __teardown_request(self, exception=None):
+        start = getattr(self.__local, 'start', None)
+        if start is None:
+            return
+        self.__local.start = None
+        from flask import request
+        duration = time.perf_counter() - start
+        route = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+        status = self.__local.status or (500 if exception is not None else 200)
+        with self.__lock:
+            self.__in_flight -= 1
+        self.observe_request(route, request.method, status, duration)
+
+
+# Tests and Benchmark
+# ===================
+def Test_FlaskMetrics(do_test=True):
+    if do_test:
+        print('Test_FlaskMetrics()....', end='')
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+        assert histogram.cumulative() == [(0.1, 2), (1.0, 3), ('+Inf', 4)] and histogram.count == 4
+
+        metrics = FlaskMetrics(prefix='test', buckets=(0.01, 1.0))
+
+        class Device:
+            def read(self):
+                return 42
+
+            def fail(self):
+                raise OSError('I2C')
+
+        device = metrics.instrument(Device(), ('read', 'fail'))
+        assert device.read() == 42
+        try:
+            device.fail()
+        except OSError:
+            pass
+        with metrics.timed('block'):
+            pass
+        metrics.observe_request('/get_pixel', 'GET', 200, 0.002)
+        metrics.observe_request('/get_pixel', 'GET', 400, 0.5)
+        text = metrics.render()
+        assert 'test_http_requests_total{route="/get_pixel",method="GET",status="400"} 1' in text
+        assert 'test_http_request_duration_seconds_bucket{route="/get_pixel",method="GET",le="0.01"} 1' in text
+        assert 'test_http_request_duration_seconds_count{route="/get_pixel",method="GET"} 2' in text
+        assert 'test_hardware_call_duration_seconds_count{call="read"} 1' in text
+        assert 'test_hardware_call_errors_total{call="fail"} 1' in text and 'call="block"' in text
+
+        try:
+            from flask import Flask
+        except ImportError:
+            print('... done (without Flask)')
+            return
+        app = Flask(__name__)
+        metrics = FlaskMetrics(app, prefix='app')
+
+        @app.route('/hello/<name>')
+        def hello(name):
+            assert metrics.in_flight == 1
+            return f'Hello {name}'
+
+        client = app.test_client()
+        client.get('/hello/a')
+        client.get('/hello/b')
+        client.get('/missing')
+        response = client.get('/metrics')
+        text = response.get_data(as_text=True)
+        assert response.mimetype == 'text/plain'
+        assert 'app_http_requests_total{route="/hello/<name>",method="GET",status="200"} 2' in text
+        assert 'app_http_requests_total{route="<unmatched>",method="GET",status="404"} 1' in text
+        assert 'app_http_requests_in_flight 1' in text and metrics.in_flight == 0
+        print('... done')
+
+
+def Benchmark_FlaskMetrics(do_test=True, count=200000):
+    '''
+    Cost of one observation (request or hardware call).
+    '''
+    if do_test:
+        print('Benchmark_FlaskMetrics()....')
+        metrics = FlaskMetrics()
+        start = time.perf_counter()
+        for i in range(count):
+            metrics.observe_request('/set_pixel', 'GET', 200, 0.001)
+        print(f'     observe_request     : {(time.perf_counter() - start) / count * 1e6:6.2f} us')
+        function = metrics.timed('set_pixel')(lambda: None)
+        start = time.perf_counter()
+        for i in range(count):
+            function()
+        print(f'     timed call          : {(time.perf_counter() - start) / count * 1e6:6.2f} us')
+        start = time.perf_counter()
+        for i in range(100):
+            metrics.render()
+        print(f'     render              : {(time.perf_counter() - start) / 100 * 1e3:6.2f} ms')
+        print('... done')
+
+
+if __name__ == '__main__':
+    Test_FlaskMetrics(True)
+    Benchmark_FlaskMetrics(True)
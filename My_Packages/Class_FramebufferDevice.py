@@ -0,0 +1,231 @@
+#!/usr/bin/python3
+
+# ------------------------------------------------------------------
+# Name  : Class_FramebufferDevice.py
+# Source: https://raw.githubusercontent.com/walter-rothlin/RaspberryPi4PiPlates/refs/heads/main/My_Packages/Class_FramebufferDevice.py
+#
+# Description: Memory mapped access to the framebuffer of the Sense HAT LED-Matrix (/dev/fb*)
+#              The device is opened and mapped once, pixels are written in place as RGB565 (uint16)
+#              through a memoryview. A full frame is packed in framebuffer order and written with one slice assignment.
+#              Any file with at least 128 bytes can be used instead of the device (tests without HAT):
+#
+#                  with open('/tmp/fb_test', 'wb') as f:
+#                      f.write(bytes(128))
+#                  fb = FramebufferDevice('/tmp/fb_test')
+#                  fb.set_pixel(0, 0, (255, 0, 0))
+#
+# Autor: Walter Rothlin
+#
+# History:
+# 18-Oct-2026   Walter Rothlin      Initial Version
+# 18-Oct-2026   Walter Rothlin      set_pixels() and rotated write_rgb565() as one slice assignment, no file leak if mmap fails
+# ------------------------------------------------------------------
+
+import mmap
+from array import array
+import os
+import struct
+import time
+
+FRAME_BYTES = 128  # 64 pixels * 2 bytes (RGB565)
+
+
+def _rotate_left(pix_map):
+    # same as numpy.rot90(): new[row][col] = old[col][7 - row]
+    return [[pix_map[col][7 - row] for col in range(8)] for row in range(8)]
+
+
+def _create_pix_maps():
+    pix_map_0 = [[row * 8 + col for col in range(8)] for row in range(8)]
+    pix_map_90 = _rotate_left(pix_map_0)
+    pix_map_180 = _rotate_left(pix_map_90)
+    pix_map_270 = _rotate_left(pix_map_180)
+    # flat: logical index (y * 8 + x) --> pixel offset in the framebuffer, as SenseHat._pix_map
+    return {rotation: [offset for row in pix_map for offset in row]
+            for rotation, pix_map in ((0, pix_map_0), (90, pix_map_90), (180, pix_map_180), (270, pix_map_270))}
+
+
+PIX_MAPS = _create_pix_maps()
+# pixel offset in the framebuffer --> logical index: a frame in this order is the framebuffer content
+FRAMEBUFFER_ORDERS = {rotation: [pix_map.index(offset) for offset in range(64)] for rotation, pix_map in PIX_MAPS.items()}
+
+
+def rgb_to_rgb565(r, g, b):
+    return ((r >> 3) & 0x1F) << 11 | ((g >> 2) & 0x3F) << 5 | ((b >> 3) & 0x1F)
+
+
+def rgb565_to_rgb(value):
+    return [((value & 0xF800) >> 11) << 3, ((value & 0x7E0) >> 5) << 2, (value & 0x1F) << 3]
+
+
+class FramebufferDevice:
+    '''
+    The LED-Matrix framebuffer, memory mapped. Rotation is passed with every call (as SenseHat._rotation),
+    because SenseHat.show_letter()/show_message() change the rotation temporarily.
+    '''
+
+    # Initializer and setter/Getter and Properties
+    # ============================================
+    def __init__(self, path):
+        '''
+        Constructor
+        :param path: framebuffer device (e.g. /dev/fb1) or a regular file with at least 128 bytes
+        '''
+        self.__path = path
+        self.__file = open(path, 'r+b')
+        size = os.fstat(self.__file.fileno()).st_size
+        if 0 < size < FRAME_BYTES:
+            self.__file.close()
+            raise ValueError(f'{path} has {size} bytes, the LED-Matrix needs {FRAME_BYTES} bytes')
+        try:
+            self.__mmap = mmap.mmap(self.__file.fileno(), FRAME_BYTES)  # e.g. an empty regular file: ValueError
+        except (OSError, ValueError):
+            self.__file.close()
+            raise
+        self.__bytes = memoryview(self.__mmap)
+        self.__pixels = self.__bytes.cast('H')  # 64 x uint16, native byte order as SenseHat._pack_bin()
+
+    def get_path(self):
+        return self.__path
+
+    path = property(get_path)
+
+    def close(self):
+        if self.__mmap is None:
+            return
+        self.__pixels.release()
+        self.__bytes.release()
+        self.__mmap.close()
+        self.__file.close()
+        self.__mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    # Business Methods
+    # ================
+    def set_pixel(self, x, y, pixel, rotation=0):
+        self.__pixels[PIX_MAPS[rotation][y * 8 + x]] = rgb_to_rgb565(pixel[0], pixel[1], pixel[2])
+
+    def get_pixel(self, x, y, rotation=0):
+        return rgb565_to_rgb(self.__pixels[PIX_MAPS[rotation][y * 8 + x]])
+
+    def set_pixels(self, pixel_list, rotation=0):
+        '''
+        Writes a full frame of 64 pixels (r, g, b) in logical order: packed once, one slice assignment.
+        '''
+        if len(pixel_list) != 64:
+            raise ValueError('Pixel lists must have 64 elements')
+        values = [rgb_to_rgb565(pixel[0], pixel[1], pixel[2]) for pixel in pixel_list]
+        self.__pixels[:] = array('H', [values[index] for index in FRAMEBUFFER_ORDERS[rotation]])
+
+    def get_pixels(self, rotation=0):
+        pixels = self.__pixels
+        return [rgb565_to_rgb(pixels[offset]) for offset in PIX_MAPS[rotation]]
+
+    def write_rgb565(self, frame, rotation=0):
+        '''
+        Writes a packed frame (128 bytes RGB565 in logical order, e.g. from SpriteAtlas.get_rgb565()).
+        One single slice assignment, with rotation after reordering the values.
+        '''
+        if len(frame) != FRAME_BYTES:
+            raise ValueError(f'A packed frame must have {FRAME_BYTES} bytes')
+        if rotation == 0:
+            self.__bytes[:] = frame
+            return
+        values = memoryview(frame).cast('H')
+        self.__pixels[:] = array('H', [values[index] for index in FRAMEBUFFER_ORDERS[rotation]])
+
+    def read_rgb565(self):
+        '''
+        :return: bytes, the raw framebuffer (physical order)
+        '''
+        return bytes(self.__bytes)
+
+    def flush(self):
+        self.__mmap.flush()
+
+
+# Tests and Benchmark
+# ===================
+def create_test_device(path='/tmp/sense_hat_fb_test'):
+    with open(path, 'wb') as file:
+        file.write(bytes(FRAME_BYTES))
+    return path
+
+
+def Test_FramebufferDevice(do_test=True, path='/tmp/sense_hat_fb_test'):
+    if do_test:
+        print('Test_FramebufferDevice()....', end='')
+        with FramebufferDevice(create_test_device(path)) as fb:
+            fb.set_pixel(1, 0, (255, 0, 0))
+            assert fb.get_pixel(1, 0) == [248, 0, 0]
+            assert fb.read_rgb565()[2:4] == struct.pack('H', 0xF800)
+            assert fb.get_pixel(0, 6, rotation=90) == [248, 0, 0]
+
+            frame = [(0, 255, 0)] * 64
+            fb.set_pixels(frame)
+            assert fb.get_pixels() == [[0, 252, 0]] * 64
+            packed = struct.pack('H', rgb_to_rgb565(0, 0, 255)) * 64
+            fb.write_rgb565(packed)
+            assert fb.read_rgb565() == packed
+            for rotation in (90, 180, 270):  # one slice assignment, same LEDs as pixel by pixel
+                fb.set_pixels([(i * 4, 0, 0) for i in range(64)], rotation=rotation)
+                assert fb.get_pixels(rotation=rotation) == [[i * 4 & 0xF8, 0, 0] for i in range(64)]
+                fb.write_rgb565(b''.join(struct.pack('H', rgb_to_rgb565(i * 4, 0, 0)) for i in range(64)), rotation=rotation)
+                assert fb.get_pixel(1, 0, rotation=rotation) == [0, 0, 0] and fb.get_pixel(2, 0, rotation=rotation) == [8, 0, 0]
+                assert fb.read_rgb565()[PIX_MAPS[rotation][63] * 2:PIX_MAPS[rotation][63] * 2 + 2] == struct.pack('H', 0xF800)
+            fb.write_rgb565(packed)
+        with open(path, 'rb') as file:
+            assert file.read() == packed
+
+        with open(path, 'wb'):  # empty file: mmap fails, the file is closed
+            pass
+        try:
+            FramebufferDevice(path)
+            assert False, 'ValueError expected'
+        except ValueError:
+            pass
+        print('... done')
+
+
+def Benchmark_frames_per_second(do_test=True, path='/tmp/sense_hat_fb_test', duration=1.0):
+    '''
+    Frames per second: SenseHat style (open/seek/write per frame) against the memory mapped device.
+    '''
+    if do_test:
+        print('Benchmark_frames_per_second()....')
+        create_test_device(path)
+        frame = [((i * 4) % 256, (i * 8) % 256, 255 - i) for i in range(64)]
+        packed = b''.join(struct.pack('H', rgb_to_rgb565(*pixel)) for pixel in frame)
+
+        def file_writes():
+            with open(path, 'r+b') as f:
+                for index, pixel in zip(PIX_MAPS[0], frame):
+                    f.seek(index * 2)
+                    f.write(struct.pack('H', rgb_to_rgb565(*pixel)))
+
+        with FramebufferDevice(path) as fb:
+            benchmarks = [
+                ('file writes (SenseHat)', file_writes),
+                ('mmap set_pixels       ', lambda: fb.set_pixels(frame)),
+                ('mmap set_pixels (r90) ', lambda: fb.set_pixels(frame, rotation=90)),
+                ('mmap write_rgb565     ', lambda: fb.write_rgb565(packed)),
+            ]
+            for name, write_frame in benchmarks:
+                count = 0
+                start = time.perf_counter()
+                while time.perf_counter() - start < duration:
+                    write_frame()
+                    count += 1
+                print(f'     {name}: {count / (time.perf_counter() - start):10.0f} frames/s')
+        print('... done')
+
+
+if __name__ == '__main__':
+    Test_FramebufferDevice(True)
+    Benchmark_frames_per_second(True)
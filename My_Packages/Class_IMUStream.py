@@ -0,0 +1,436 @@
+#!/usr/bin/python3
+
+# ------------------------------------------------------------------
+# Name  : Class_IMUStream.py
+# Source: https://raw.githubusercontent.com/walter-rothlin/RaspberryPi4PiPlates/refs/heads/main/My_Packages/Class_IMUStream.py
+#
+# Description: IMU acquisition (accelerometer, gyroscope, magnetometer) of the Sense HAT at a fixed rate
+#              A daemon thread reads the IMU into preallocated NumPy ring buffers. Every block of samples is filtered
+#              at once (vectorized): low-pass for the accelerometer, complementary filter for pitch/roll and a
+#              tilt compensated heading. Consumers (Flask, games) get windows of the ring buffers as read-only views,
+#              nothing is copied:
+#
+#                  stream = IMUStream(SenseHatIMUSource(sense), rate=100)
+#                  orientation = stream.filtered.window(50)       # the last 50 samples (view)
+#                  pitch = orientation[:, FILTERED_COLUMNS.index('pitch')]
+#
+#              Recorded data can be replayed without hardware:
+#                  stream.save('imu.csv')
+#                  stream = IMUStream(ReplayIMUSource('imu.csv'), rate=None)   # as fast as possible
+#
+# Autor: Walter Rothlin
+#
+# History:
+# 18-Oct-2026   Walter Rothlin      Initial Version
+# 18-Oct-2026   Walter Rothlin      A failed IMU read is skipped (no duplicated sample) and counted as failed_reads
+# 18-Oct-2026   Walter Rothlin      SenseHatIMUSource: bus_lock shared with the SensorSampler, one I2C user at a time
+# ------------------------------------------------------------------
+
+import math
+import threading
+import time
+import numpy as np
+
+RAW_COLUMNS = ('time', 'accel_x', 'accel_y', 'accel_z', 'gyro_x', 'gyro_y', 'gyro_z', 'compass_x', 'compass_y', 'compass_z')
+FILTERED_COLUMNS = ('time', 'accel_x', 'accel_y', 'accel_z', 'pitch', 'roll', 'heading')
+
+_ACCEL = slice(1, 4)
+_GYRO = slice(4, 7)
+_COMPASS = slice(7, 10)
+
+
+def first_order_iir(x, a, y0):
+    '''
+    y[n] = a * y[n-1] + x[n] for a whole block at once (closed form, no Python loop):
+        y[n] = a^n * (a * y0 + sum(x[k] * a^-k, k = 0..n))
+    :param x: array (n) or (n, channels)
+    :param a: filter coefficient 0 <= a < 1
+    :param y0: output before the block, scalar or (channels)
+    :return: array like x
+    '''
+    x = np.asarray(x, dtype=float)
+    if a == 0:
+        return x.copy()
+    chunk = max(1, int(200 / -math.log10(a)))  # a^-k must not overflow
+    y = np.empty_like(x)
+    for start in range(0, len(x), chunk):
+        part = x[start:start + chunk]
+        k = np.arange(len(part)).reshape((-1,) + (1,) * (x.ndim - 1))
+        y[start:start + chunk] = a ** k * (a * np.asarray(y0) + np.cumsum(part * a ** -k, axis=0))
+        y0 = y[start + len(part) - 1]
+    return y
+
+
+class RingBuffer:
+    '''
+    Preallocated ring buffer of rows (samples) with a fixed number of columns.
+    Every row is stored twice (at i and i + capacity), so the last n rows are always one contiguous slice:
+    window() returns a view without copying.
+    '''
+    def __init__(self, capacity, columns):
+        self.__capacity = capacity
+        self.__columns = tuple(columns)
+        self.__data = np.zeros((2 * capacity, len(columns)))
+        self.__count = 0  # rows written since the start
+
+    def get_capacity(self):
+        return self.__capacity
+
+    capacity = property(get_capacity)
+
+    def get_count(self):
+        return self.__count
+
+    count = property(get_count)
+
+    def get_columns(self):
+        return self.__columns
+
+    columns = property(get_columns)
+
+    def __len__(self):
+        return min(self.__count, self.__capacity)
+
+    def write(self, block):
+        '''
+        Appends a block of rows (array (n, columns)), vectorized.
+        '''
+        block = np.asarray(block)[-self.__capacity:]
+        rows = (self.__count + np.arange(len(block))) % self.__capacity
+        self.__data[rows] = block
+        self.__data[rows + self.__capacity] = block
+        self.__count += len(block)
+
+    def window(self, n=None):
+        '''
+        The last n rows, oldest first, as read-only view. The view shows new data once capacity more rows are
+        written, use copy() to keep it longer (or compare count before and after).
+        :return: array (n, columns)
+        '''
+        n = len(self) if n is None else min(n, len(self))
+        end = self.__count % self.__capacity + self.__capacity
+        view = self.__data[end - n:end]
+        view.flags.writeable = False
+        return view
+
+    def column(self, name, n=None):
+        return self.window(n)[:, self.__columns.index(name)]
+
+    def latest(self):
+        '''
+        :return: dict with the last row or None
+        '''
+        if self.__count == 0:
+            return None
+        return dict(zip(self.__columns, self.window(1)[0].tolist()))
+
+
+# IMU sources
+# ===========
+class SenseHatIMUSource:
+    '''
+    Reads the IMU of a SenseHat. All three sensors are taken from one IMU read (instead of three with the
+    get_..._raw() methods).
+    '''
+    def __init__(self, sense, bus_lock=None):
+        '''
+        :param bus_lock: lock held during every IMU read, shared with the other I2C users (e.g. SensorSampler)
+        '''
+        self.__sense = sense
+        self.__bus_lock = bus_lock if bus_lock is not None else threading.Lock()
+        with self.__bus_lock:
+            sense.set_imu_config(True, True, True)
+        self.__values = [0.0] * 9
+
+    def read(self):
+        '''
+        :return: (timestamp or None, [accel xyz in G, gyro xyz in rad/s, compass xyz in uT]),
+                 (None, None) if the IMU had no new data
+        '''
+        sense = self.__sense
+        if hasattr(sense, '_read_imu'):
+            with self.__bus_lock:
+                if not sense._read_imu():
+                    return None, None
+                data = sense._imu.getIMUData()
+            for offset, valid, key in ((0, 'accelValid', 'accel'), (3, 'gyroValid', 'gyro'), (6, 'compassValid', 'compass')):
+                if data[valid]:
+                    self.__values[offset:offset + 3] = data[key]
+        else:
+            values = []
+            with self.__bus_lock:
+                raws = (sense.get_accelerometer_raw(), sense.get_gyroscope_raw(), sense.get_compass_raw())
+            for raw in raws:
+                values.extend((raw['x'], raw['y'], raw['z']))
+            self.__values = values
+        return None, list(self.__values)
+
+
+class ReplayIMUSource:
+    '''
+    Replays an IMU recording (CSV written by IMUStream.save()) with the recorded timestamps.
+    '''
+    def __init__(self, path, loop=False):
+        self.__data = np.loadtxt(path, delimiter=',', skiprows=1, ndmin=2)
+        self.__loop = loop
+        self.__index = 0
+        self.__time_offset = 0.0
+
+    def __len__(self):
+        return len(self.__data)
+
+    def read(self):
+        '''
+        :return: (timestamp, [9 values]), raises StopIteration at the end (without loop)
+        '''
+        if self.__index >= len(self.__data):
+            if not self.__loop:
+                raise StopIteration
+            duration = self.__data[-1, 0] - self.__data[0, 0]
+            self.__time_offset += duration + (duration / max(len(self.__data) - 1, 1))
+            self.__index = 0
+        row = self.__data[self.__index]
+        self.__index += 1
+        return row[0] + self.__time_offset, row[1:].tolist()
+
+
+# IMU stream
+# ==========
+class IMUStream:
+    '''
+    Reads an IMU source at a fixed rate in a daemon thread, filters block by block and keeps raw and filtered
+    samples in ring buffers.
+    '''
+
+    # Initializer and setter/Getter and Properties
+    # ============================================
+    def __init__(self, source, rate=100, capacity=4096, block_size=16, alpha=0.98, lowpass=0.8, start=True):
+        '''
+        Constructor
+        :param source: SenseHatIMUSource, ReplayIMUSource or any object with read() --> (timestamp or None, 9 values),
+                       values None: failed read, no sample
+        :param rate: samples per second, None: as fast as possible (replay, benchmark)
+        :param capacity: samples kept in the ring buffers
+        :param block_size: samples filtered together (latency of the filtered values: block_size / rate)
+        :param alpha: complementary filter, weight of the gyroscope (0.98: the accelerometer corrects the drift slowly)
+        :param lowpass: coefficient of the accelerometer low-pass (0: no filter)
+        '''
+        self.__source = source
+        self.__rate = rate
+        self.__block_size = block_size
+        self.__alpha = alpha
+        self.__lowpass = lowpass
+        self.raw = RingBuffer(capacity, RAW_COLUMNS)
+        self.filtered = RingBuffer(capacity, FILTERED_COLUMNS)
+        self.__staging = np.zeros((block_size, len(RAW_COLUMNS)))
+        self.__last_time = None
+        self.__accel_state = None
+        self.__angles = None  # pitch, roll in degrees
+        self.__overruns = 0
+        self.__failed_reads = 0
+        self.__read_time = 0.0
+        self.__started_at = None
+        self.__stop_event = threading.Event()
+        self.__thread = threading.Thread(target=self.__run, name='IMUStream', daemon=True)
+        if start:
+            self.__thread.start()
+
+    def get_statistics(self):
+        '''
+        :return: dict with samples, overruns (sample read later than one period), failed_reads (skipped, no sample),
+                 average read time and actual rate
+        '''
+        samples = self.raw.count
+        duration = time.monotonic() - self.__started_at if self.__started_at else 0
+        return {'samples': samples,
+                'overruns': self.__overruns,
+                'failed_reads': self.__failed_reads,
+                'read_time_ms': round(self.__read_time / samples * 1000, 4) if samples else None,
+                'rate': round(samples / duration, 1) if duration else None}
+
+    statistics = property(get_statistics)
+
+    def is_running(self):
+        return self.__thread.is_alive()
+
+    def join(self, timeout=None):
+        self.__thread.join(timeout)
+
+    def stop(self, timeout=None):
+        self.__stop_event.set()
+        if self.__thread.is_alive():
+            self.__thread.join(timeout)
+
+    def save(self, path, n=None):
+        '''
+        Writes the last n raw samples as CSV (for ReplayIMUSource).
+        '''
+        np.savetxt(path, self.raw.window(n), delimiter=',', header=','.join(RAW_COLUMNS), comments='', fmt='%.6f')
+
+    # Filtering
+    # =========
+    def process_block(self, block):
+        '''
+        Filters a block of raw samples (array (n, RAW_COLUMNS)) and appends raw and filtered samples to the ring buffers.
+        '''
+        times = block[:, 0]
+        previous = times[0] if self.__last_time is None else self.__last_time
+        dt = np.diff(times, prepend=previous)
+        self.__last_time = times[-1]
+
+        accel = block[:, _ACCEL]
+        if self.__accel_state is None:
+            self.__accel_state = accel[0]
+        accel_lp = first_order_iir((1 - self.__lowpass) * accel, self.__lowpass, self.__accel_state)
+        self.__accel_state = accel_lp[-1]
+
+        # pitch/roll from gravity and integrated from the gyroscope, combined by the complementary filter
+        ax, ay, az = accel_lp[:, 0], accel_lp[:, 1], accel_lp[:, 2]
+        accel_angles = np.degrees(np.column_stack((np.arctan2(-ax, np.hypot(ay, az)), np.arctan2(ay, az))))
+        if self.__angles is None:
+            self.__angles = accel_angles[0]
+        gyro_angles = np.degrees(block[:, [5, 4]]) * dt[:, None]  # pitch: rotation around y, roll: around x
+        angles = first_order_iir(self.__alpha * gyro_angles + (1 - self.__alpha) * accel_angles, self.__alpha, self.__angles)
+        self.__angles = angles[-1]
+
+        # heading from the magnetometer, tilt compensated
+        pitch, roll = np.radians(angles[:, 0]), np.radians(angles[:, 1])
+        mx, my, mz = block[:, 7], block[:, 8], block[:, 9]
+        mx_h = mx * np.cos(pitch) + mz * np.sin(pitch)
+        my_h = mx * np.sin(roll) * np.sin(pitch) + my * np.cos(roll) - mz * np.sin(roll) * np.cos(pitch)
+        heading = np.degrees(np.arctan2(-my_h, mx_h)) % 360
+
+        self.raw.write(block)
+        self.filtered.write(np.column_stack((times, accel_lp, angles, heading)))
+
+    # Acquisition thread
+    # ==================
+    def __run(self):
+        period = 1.0 / self.__rate if self.__rate else 0
+        staging = self.__staging
+        self.__started_at = time.monotonic()
+        next_sample_at = self.__started_at
+        filled = 0
+        try:
+            while not self.__stop_event.is_set():
+                if period:
+                    now = time.monotonic()
+                    if next_sample_at > now:
+                        self.__stop_event.wait(next_sample_at - now)
+                    elif now - next_sample_at > period:
+                        self.__overruns += 1
+                        next_sample_at = now  # resynchronize instead of reading a burst
+                    next_sample_at += period
+                read_start = time.monotonic()
+                timestamp, values = self.__source.read()
+                read_end = time.monotonic()
+                self.__read_time += read_end - read_start
+                if values is None:
+                    self.__failed_reads += 1  # the previous values would be a duplicated sample for the filters
+                    continue
+                staging[filled, 0] = read_end if timestamp is None else timestamp
+                staging[filled, 1:] = values
+                filled += 1
+                if filled == self.__block_size:
+                    self.process_block(staging)
+                    filled = 0
+        except StopIteration:  # end of a replay
+            pass
+        if filled:
+            self.process_block(staging[:filled])
+
+
+# Tests and Benchmark
+# ===================
+def create_test_recording(path='/tmp/imu_test.csv', samples=1000, rate=100, pitch=10.0, gyro_bias=0.0):
+    '''
+    Synthetic recording: the HAT tilted by pitch degrees, some sensor noise, compass pointing north.
+    '''
+    rng = np.random.default_rng(1)
+    times = np.arange(samples) / rate
+    pitch_rad = math.radians(pitch)
+    accel = np.tile([-math.sin(pitch_rad), 0, math.cos(pitch_rad)], (samples, 1)) + rng.normal(0, 0.02, (samples, 3))
+    gyro = np.full((samples, 3), gyro_bias) + rng.normal(0, 0.01, (samples, 3))
+    compass = np.tile([30.0 * math.cos(pitch_rad), 0, -30.0 * math.sin(pitch_rad)], (samples, 1))
+    data = np.column_stack((times, accel, gyro, compass))
+    np.savetxt(path, data, delimiter=',', header=','.join(RAW_COLUMNS), comments='', fmt='%.6f')
+    return path
+
+
+def Test_IMUStream(do_test=True):
+    if do_test:
+        print('Test_IMUStream()....', end='')
+        x = np.random.default_rng(2).normal(size=(300, 2))
+        expected, y = np.empty_like(x), np.array([0.5, -0.5])
+        for n in range(len(x)):
+            y = 0.9 * y + x[n]
+            expected[n] = y
+        assert np.allclose(first_order_iir(x, 0.9, [0.5, -0.5]), expected)
+
+        ring = RingBuffer(5, ('a', 'b'))
+        ring.write([[1, 1], [2, 2], [3, 3]])
+        ring.write([[4, 4], [5, 5], [6, 6], [7, 7]])
+        assert ring.window().tolist() == [[3, 3], [4, 4], [5, 5], [6, 6], [7, 7]]
+        assert ring.column('a', 2).tolist() == [6, 7] and ring.latest() == {'a': 7, 'b': 7}
+        assert ring.window(3).base is not None  # a view, not a copy
+
+        stream = IMUStream(ReplayIMUSource(create_test_recording(pitch=10.0)), rate=None, capacity=512)
+        stream.join(timeout=10)
+        assert stream.raw.count == 1000 and len(stream.filtered) == 512
+        latest = stream.filtered.latest()
+        assert abs(latest['pitch'] - 10.0) < 1.0 and abs(latest['roll']) < 1.0, latest
+        assert min(latest['heading'], 360 - latest['heading']) < 2.0, latest
+
+        # failed IMU reads (every third) are skipped, not repeated as samples
+        class FlakyIMU:
+            reads = 0
+
+            def set_imu_config(self, *enabled):
+                pass
+
+            def _read_imu(self):
+                self.reads += 1
+                if self.reads > 30:
+                    raise StopIteration
+                return self.reads % 3 != 0
+
+            class _imu:
+                getIMUData = staticmethod(lambda: {'accelValid': True, 'accel': (0, 0, 1), 'gyroValid': True,
+                                                   'gyro': (0, 0, 0), 'compassValid': True, 'compass': (30, 0, 0)})
+
+        stream = IMUStream(SenseHatIMUSource(FlakyIMU()), rate=None, block_size=4)
+        stream.join(timeout=10)
+        assert stream.raw.count == 20 and stream.statistics['failed_reads'] == 10, stream.statistics
+        print('... done')
+
+
+def Benchmark_IMUStream(do_test=True, samples=20000):
+    '''
+    Sustainable sample rate: processing (filters, ring buffers) with a replayed recording, and the time of one
+    IMU read on the hardware (if a Sense HAT is available).
+    '''
+    if do_test:
+        print('Benchmark_IMUStream()....')
+        path = create_test_recording('/tmp/imu_benchmark.csv', samples=samples)
+        for block_size in (1, 16, 64):
+            stream = IMUStream(ReplayIMUSource(path), rate=None, block_size=block_size)
+            start = time.perf_counter()
+            stream.join()
+            duration = time.perf_counter() - start
+            print(f'     block_size {block_size:3d}: {samples / duration:10.0f} samples/s (without IMU reads)')
+        try:
+            from sense_hat import SenseHat
+            source = SenseHatIMUSource(SenseHat())
+            start = time.perf_counter()
+            for _ in range(200):
+                source.read()
+            read_time = (time.perf_counter() - start) / 200
+            print(f'     Sense HAT IMU read: {read_time * 1000:6.2f} ms --> max {1 / read_time:6.0f} samples/s')
+        except Exception as exception:
+            print(f'     no Sense HAT: {exception}')
+        print('... done')
+
+
+if __name__ == '__main__':
+    Test_IMUStream(True)
+    Benchmark_IMUStream(True)
@@ -0,0 +1,312 @@
+#!/usr/bin/python3
+
+# ------------------------------------------------------------------
+# Name  : Class_JoystickStream.py
+# Source: https://raw.githubusercontent.com/walter-rothlin/RaspberryPi4PiPlates/refs/heads/main/My_Packages/Class_JoystickStream.py
+#
+# Description: asyncio event source for the Sense HAT joystick
+#              The input device is read once, by the event loop (add_reader, no thread, no polling).
+#              Raw events are debounced, holds are detected by own timers (instead of the kernel auto repeat) and every
+#              event is fanned out to any number of subscribers, each with its own bounded queue:
+#
+#                  async def main():
+#                      async with JoystickStream(sense.stick) as joystick:
+#                          async for event in joystick.subscribe(actions=('pressed', 'held')):
+#                              print(event.direction, event.action)
+#
+#              A slow subscriber never blocks the others: if its queue is full the oldest event is dropped.
+#
+# Autor: Walter Rothlin
+#
+# History:
+# 18-Oct-2026   Walter Rothlin      Initial Version
+# ------------------------------------------------------------------
+
+import asyncio
+import time
+from collections import namedtuple
+
+DIRECTION_UP = 'up'
+DIRECTION_DOWN = 'down'
+DIRECTION_LEFT = 'left'
+DIRECTION_RIGHT = 'right'
+DIRECTION_MIDDLE = 'middle'
+ACTION_PRESSED = 'pressed'
+ACTION_RELEASED = 'released'
+ACTION_HELD = 'held'
+
+# same fields as sense_hat.stick.InputEvent
+JoystickEvent = namedtuple('JoystickEvent', ('timestamp', 'direction', 'action'))
+
+
+class Subscription:
+    '''
+    Bounded queue of one subscriber, async iterable. Ends (StopAsyncIteration / get() returns None) when the
+    subscription or the stream is closed.
+    '''
+    def __init__(self, stream, maxsize, directions=None, actions=None):
+        self.__stream = stream
+        self.__queue = asyncio.Queue(maxsize)
+        self.__directions = None if directions is None else set(directions)
+        self.__actions = None if actions is None else set(actions)
+        self.__dropped = 0
+        self.__closed = False
+
+    def get_dropped(self):
+        '''
+        :return: number of events dropped because the queue was full
+        '''
+        return self.__dropped
+
+    dropped = property(get_dropped)
+
+    def get_closed(self):
+        return self.__closed
+
+    closed = property(get_closed)
+
+    def __len__(self):
+        return self.__queue.qsize()
+
+    # Business Methods
+    # ================
+    def put(self, event):
+        '''
+        Called by the stream (in the event loop). Drops the oldest event if the queue is full.
+        '''
+        if self.__closed:
+            return
+        if event is not None:
+            if self.__directions is not None and event.direction not in self.__directions:
+                return
+            if self.__actions is not None and event.action not in self.__actions:
+                return
+        if self.__queue.full():
+            self.__queue.get_nowait()
+            self.__dropped += 1
+        self.__queue.put_nowait(event)
+
+    async def get(self):
+        '''
+        :return: next JoystickEvent, None if closed
+        '''
+        if self.__closed and self.__queue.empty():
+            return None
+        event = await self.__queue.get()
+        if event is None:
+            self.__closed = True
+        return event
+
+    def get_nowait(self):
+        '''
+        :return: next JoystickEvent, None if there is none (or closed)
+        '''
+        if self.__queue.empty():
+            return None
+        return self.__queue.get_nowait()
+
+    def close(self):
+        self.__stream.unsubscribe(self)
+        self.put(None)  # wakes up a waiting get()
+        self.__closed = True
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        event = await self.get()
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+
+class JoystickStream:
+    '''
+    Debounced joystick events with hold detection, fanned out to subscribers. Runs in the asyncio event loop.
+    '''
+
+    # Initializer and setter/Getter and Properties
+    # ============================================
+    def __init__(self, stick=None, debounce=0.02, hold_time=0.5, repeat_interval=0.1, queue_size=16):
+        '''
+        Constructor
+        :param stick: SenseStick (sense.stick) or None (events only from feed(), e.g. emulator or tests)
+        :param debounce: seconds a release must last to count (a release/press pair within it is a bounce)
+        :param hold_time: seconds pressed before the first 'held' event
+        :param repeat_interval: seconds between further 'held' events, None: only one 'held' event
+        :param queue_size: default queue size of the subscribers
+        '''
+        self.__stick = stick
+        self.__debounce = debounce
+        self.__hold_time = hold_time
+        self.__repeat_interval = repeat_interval
+        self.__queue_size = queue_size
+        self.__subscriptions = []
+        self.__pressed = {}           # direction --> TimerHandle of the next 'held' event
+        self.__pending_release = {}   # direction --> TimerHandle of the delayed 'released' event
+        self.__loop = None
+        self.__raw_events = 0
+        self.__bounces = 0
+        self.__events = 0
+
+    def get_statistics(self):
+        return {'raw_events': self.__raw_events,
+                'bounces': self.__bounces,
+                'events': self.__events,
+                'subscribers': len(self.__subscriptions),
+                'dropped': sum(subscription.dropped for subscription in self.__subscriptions)}
+
+    statistics = property(get_statistics)
+
+    def get_pressed(self):
+        '''
+        :return: set of the directions pressed right now (debounced)
+        '''
+        return set(self.__pressed)
+
+    pressed = property(get_pressed)
+
+    # Business Methods
+    # ================
+    def start(self):
+        '''
+        Starts reading the stick. Must be called in the running event loop.
+        '''
+        self.__loop = asyncio.get_running_loop()
+        if self.__stick is not None:
+            self.__loop.add_reader(self.__stick._stick_file.fileno(), self.__on_readable)
+        return self
+
+    def stop(self):
+        '''
+        Stops reading, cancels the timers and ends all subscriptions.
+        '''
+        if self.__loop is not None and self.__stick is not None:
+            self.__loop.remove_reader(self.__stick._stick_file.fileno())
+        for handle in list(self.__pressed.values()) + list(self.__pending_release.values()):
+            if handle is not None:
+                handle.cancel()
+        self.__pressed.clear()
+        self.__pending_release.clear()
+        for subscription in list(self.__subscriptions):
+            subscription.close()
+
+    async def __aenter__(self):
+        return self.start()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def subscribe(self, maxsize=None, directions=None, actions=None):
+        '''
+        :param maxsize: queue size, default queue_size of the stream
+        :param directions: only these directions (e.g. ('left', 'right')), None: all
+        :param actions: only these actions (e.g. ('pressed', 'held')), None: all
+        :return: Subscription (async iterable)
+        '''
+        subscription = Subscription(self, self.__queue_size if maxsize is None else maxsize, directions, actions)
+        self.__subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        if subscription in self.__subscriptions:
+            self.__subscriptions.remove(subscription)
+
+    def feed(self, direction, action, timestamp=None):
+        '''
+        Processes one raw event (from the stick or injected). Must be called in the event loop.
+        '''
+        self.__raw_events += 1
+        if self.__loop is None:
+            self.__loop = asyncio.get_running_loop()
+        if action == ACTION_PRESSED:
+            pending = self.__pending_release.pop(direction, None)
+            if pending is not None:  # released and pressed again within debounce: contact bounce
+                pending.cancel()
+                self.__bounces += 1
+            elif direction not in self.__pressed:
+                self.__pressed[direction] = self.__loop.call_later(self.__hold_time, self.__hold, direction)
+                self.__publish(JoystickEvent(timestamp or time.time(), direction, ACTION_PRESSED))
+        elif action == ACTION_RELEASED:
+            if direction in self.__pressed and direction not in self.__pending_release:
+                self.__pending_release[direction] = self.__loop.call_later(self.__debounce, self.__release,
+                                                                           direction, timestamp or time.time())
+        # ACTION_HELD of the kernel (auto repeat) is ignored, holds are detected by the own timer
+
+    # Internals
+    # =========
+    def __on_readable(self):
+        event = self.__stick._read()
+        if event is not None:
+            self.feed(event.direction, event.action, event.timestamp)
+
+    def __release(self, direction, timestamp):
+        self.__pending_release.pop(direction, None)
+        handle = self.__pressed.pop(direction, None)
+        if handle is not None:
+            handle.cancel()
+        self.__publish(JoystickEvent(timestamp, direction, ACTION_RELEASED))
+
+    def __hold(self, direction):
+        if direction not in self.__pressed:
+            return
+        self.__pressed[direction] = None
+        if self.__repeat_interval is not None:
+            self.__pressed[direction] = self.__loop.call_later(self.__repeat_interval, self.__hold, direction)
+        self.__publish(JoystickEvent(time.time(), direction, ACTION_HELD))
+
+    def __publish(self, event):
+        self.__events += 1
+        for subscription in self.__subscriptions:
+            subscription.put(event)
+
+
+# Tests
+# =====
+def Test_JoystickStream(do_test=True):
+    if do_test:
+        print('Test_JoystickStream()....', end='')
+
+        async def run_test():
+            joystick = JoystickStream(debounce=0.02, hold_time=0.1, repeat_interval=0.05, queue_size=4).start()
+            everything = joystick.subscribe(maxsize=100)
+            presses = joystick.subscribe(actions=(ACTION_PRESSED,), directions=(DIRECTION_LEFT,))
+            slow = joystick.subscribe(maxsize=2)
+
+            joystick.feed(DIRECTION_LEFT, ACTION_PRESSED)
+            joystick.feed(DIRECTION_LEFT, ACTION_RELEASED)
+            joystick.feed(DIRECTION_LEFT, ACTION_PRESSED)   # bounce
+            joystick.feed(DIRECTION_LEFT, ACTION_HELD)      # kernel auto repeat
+            await asyncio.sleep(0.22)                       # held at 0.1, 0.15, 0.2
+            joystick.feed(DIRECTION_LEFT, ACTION_RELEASED)
+            await asyncio.sleep(0.05)
+            joystick.feed(DIRECTION_UP, ACTION_PRESSED)
+            joystick.feed(DIRECTION_UP, ACTION_RELEASED)
+            await asyncio.sleep(0.05)
+
+            actions = [(event.direction, event.action) for event in [everything.get_nowait() for _ in range(len(everything))]]
+            assert actions == [('left', 'pressed'), ('left', 'held'), ('left', 'held'), ('left', 'held'),
+                               ('left', 'released'), ('up', 'pressed'), ('up', 'released')], actions
+            assert len(presses) == 1 and slow.dropped == 5 and len(slow) == 2
+            assert joystick.statistics['bounces'] == 1 and joystick.pressed == set()
+
+            received = []
+
+            async def consumer():
+                async for event in presses:
+                    received.append(event)
+
+            task = asyncio.ensure_future(consumer())
+            joystick.feed(DIRECTION_LEFT, ACTION_PRESSED)
+            await asyncio.sleep(0.01)
+            joystick.stop()
+            await asyncio.wait_for(task, 1)
+            assert len(received) == 2 and presses.closed
+            assert joystick.statistics['subscribers'] == 0
+
+        asyncio.run(run_test())
+        print('... done')
+
+
+if __name__ == '__main__':
+    Test_JoystickStream(True)
@@ -20,16 +20,29 @@
 # 08-Dec-2024   Walter Rothlin      Added additonal Test-Cases
 # 09-Dec-2024   Walter Rothlin      Added simpler version for set_pixel()
 # 17-Dec-2024   Walter Rothlin      round(float(rgb)) values
+# 18-Oct-2026   Walter Rothlin      Batch mode with in-memory framebuffer (begin_batch()/commit())
+# 18-Oct-2026   Walter Rothlin      Dirty-region diffing against the last written frame, frame statistics
+# 18-Oct-2026   Walter Rothlin      Lazy logging (print_log) and integer fast path in set_pixel()
+# 18-Oct-2026   Walter Rothlin      draw_line()/drawLine() use waltisLibrary_Rasterizer, draw_rectangle/circle/polygon added
+# 18-Oct-2026   Walter Rothlin      Optional memory mapped framebuffer device (Class_FramebufferDevice)
+# 18-Oct-2026   Walter Rothlin      SENSE_HAT_BACKEND=fake: subclass of FakeSenseHat, runs without hardware (Class_FakeSenseHat)
+# 18-Oct-2026   Walter Rothlin      pixel_version counter on every change of the LED-Matrix, get_versioned_pixels() and get_changed_pixels(since)
 
 # todo: defining the grid (xmin..xmax, ymin..ymax) and returns a list of visible points for a line
 #       an element of the list contains x, y and a color tuple
 # ------------------------------------------------------------------
 
-from sense_hat import SenseHat
+from Class_FakeSenseHat import get_sense_hat_class
 from time import sleep
 from enum import Enum
 from datetime import datetime
+from collections import OrderedDict
+import threading
 import time
+from waltisLibrary_Rasterizer import line_points, rectangle_points, circle_points, polygon_points, clip
+from Class_FramebufferDevice import FramebufferDevice
+
+SenseHat = get_sense_hat_class()  # sense_hat.SenseHat, or FakeSenseHat with SENSE_HAT_BACKEND=fake
 
 class LogLevel(Enum):
     ALLWAYS = 0
@@ -39,19 +52,33 @@ class LogLevel(Enum):
     FATAL = 4
     NO_TRACE = 9
 
+def is_log_enabled(actual_log_level, log_level_msg):
+    return log_level_msg.value >= actual_log_level.value
+
 def get_status_string(actual_log_level, log_level_msg, message, with_timestamp=True):
+    if not is_log_enabled(actual_log_level, log_level_msg):
+        return ''
     timestamp_str = ''
     if with_timestamp:
         timestamp_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    if log_level_msg.value >= actual_log_level.value:
-        return f'{timestamp_str} {log_level_msg.name}: {message}'
-    else:
-        return ''
+    return f'{timestamp_str} {log_level_msg.name}: {message}'
 
 def print_if_not_empty(message):
     if message != '':
         print(message)
 
+def print_log(actual_log_level, log_level_msg, message, *args):
+    '''
+    Lazy version of print_if_not_empty(get_status_string(...)): the level is checked first,
+    the message is only formatted (message.format(*args)) if it is really printed.
+
+        print_log(self.debug_mode, LogLevel.INFO, 'set_pixel(x={}, y={})', x, y)
+    '''
+    if is_log_enabled(actual_log_level, log_level_msg):
+        if args:
+            message = message.format(*args)
+        print(get_status_string(actual_log_level, log_level_msg, message))
+
 
 def colorHex_to_rgb(color):
     """
@@ -131,6 +158,28 @@ def rgb_to_colorHex(color):
         raise TypeError("Input must be a hex string or an RGB tuple.")
 
 
+BYTES_PER_PIXEL = 2  # RGB565 in the framebuffer device /dev/fb*
+
+
+class FrameBatch:
+    '''
+    Context manager returned by MySenseHat.begin_batch(). Commits the framebuffer when the with-block ends.
+
+        with sense.begin_batch():
+            sense.draw_line(0, 0, 7, 7)
+            sense.set_pixel(0, 7, 255, 0, 0)
+    '''
+    def __init__(self, sense):
+        self.__sense = sense
+
+    def __enter__(self):
+        return self.__sense
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.__sense.commit()
+        return False
+
+
 class MySenseHat(SenseHat):
     '''
     A subclass from SenseHat where set_pixel() has been overwritten and draw_line() added.
@@ -148,18 +197,39 @@ class MySenseHat(SenseHat):
 
     # Initializer and setter/Getter and Properties
     # ============================================
-    def __init__(self, default_bg_color=cyan, default_fg_color=red, trace_level_on=LogLevel.WARNING):
+    def __init__(self, default_bg_color=cyan, default_fg_color=red, trace_level_on=LogLevel.WARNING, diff_threshold=8, framebuffer_device=None):
         '''
         Constructor
         :param default_bg_color: color of the background
         :param default_fg_color: color of the foreground
         :param trace_on: LogLevel for debug mode
+        :param diff_threshold: up to this number of changed pixels a frame is written pixel by pixel, otherwise with one set_pixels()
+        :param framebuffer_device: None: pixels are written by the SenseHat class
+                                   True: the framebuffer device of the SenseHat is memory mapped
+                                   path or FramebufferDevice: this device (or file) is used for the LED-Matrix
         '''
         self.__default_fg_color = default_fg_color
         self.__default_bg_color = default_bg_color
         self.__trace_level_on = trace_level_on
+        self.__frame_buffer = None  # list of 64 [r, g, b] while a batch is open, otherwise None
+        self.__batch_depth = 0
+        self.__shadow_frame = None  # copy of the last frame written to the LED-Matrix, None = unknown
+        self.__shadow_rotation = None
+        self.__diff_threshold = diff_threshold
+        self.__fb = None
+        self.__pixel_version = 0
+        self.__frame_history = OrderedDict()  # pixel_version --> frame as returned by get_versioned_pixels()
+        self.__frame_history_size = 16
+        self.__frame_history_lock = threading.Lock()
+        self.reset_frame_statistics()
         super().__init__()
 
+        if framebuffer_device is True:
+            framebuffer_device = self._fb_device
+        if isinstance(framebuffer_device, str):
+            framebuffer_device = FramebufferDevice(framebuffer_device)
+        self.__fb = framebuffer_device
+
     def set_debug_mode(self, trace_level_on):
         self.__trace_level_on = trace_level_on
 
@@ -169,6 +239,249 @@ class MySenseHat(SenseHat):
 
     debug_mode = property(get_debug_mode, set_debug_mode)
 
+    def get_framebuffer_device(self):
+        return self.__fb
+
+    framebuffer_device = property(get_framebuffer_device)
+
+    def get_pixel_version(self):
+        '''
+        :return: counter which is incremented on every change of the LED-Matrix (or of the batch framebuffer)
+        '''
+        return self.__pixel_version
+
+    pixel_version = property(get_pixel_version)
+
+
+    # LED-Matrix access (SenseHat class or memory mapped FramebufferDevice)
+    # ====================================================================
+    def __device_set_pixel(self, x, y, pixel):
+        if self.__fb is not None:
+            self.__fb.set_pixel(x, y, pixel, self._rotation)
+        else:
+            super().set_pixel(x, y, pixel)
+
+    def __device_set_pixels(self, frame):
+        if self.__fb is not None:
+            self.__fb.set_pixels(frame, self._rotation)
+        else:
+            super().set_pixels(frame)
+
+    def __device_get_pixel(self, x, y):
+        if self.__fb is not None:
+            return self.__fb.get_pixel(x, y, self._rotation)
+        return super().get_pixel(x, y)
+
+    def __device_get_pixels(self):
+        if self.__fb is not None:
+            return self.__fb.get_pixels(self._rotation)
+        return super().get_pixels()
+
+    def write_rgb565(self, frame):
+        '''
+        Writes a packed RGB565 frame (128 bytes, e.g. SpriteAtlas.get_rgb565()).
+        With a FramebufferDevice and outside a batch it is copied directly into the framebuffer.
+        :return: None
+        '''
+        if self.__fb is not None and self.__frame_buffer is None:
+            self.__fb.write_rgb565(frame, self._rotation)
+            self.__frame_count += 1
+            self.__pixels_written += 64
+            self.invalidate_shadow()
+            return
+        values = memoryview(bytes(frame)).cast('H')
+        self.set_pixels([[((v & 0xF800) >> 11) << 3, ((v & 0x7E0) >> 5) << 2, (v & 0x1F) << 3] for v in values])
+
+
+    # Batch mode (in-memory framebuffer)
+    # ==================================
+    def begin_batch(self):
+        '''
+        Starts a batch: all drawing methods write into an in-memory framebuffer instead of the LED-Matrix.
+        The framebuffer is written with one single set_pixels() call by commit().
+        Batches can be nested, only the outermost commit() writes to the LED-Matrix.
+        :return: FrameBatch, usable as context manager (commits on exit)
+        '''
+        if self.__batch_depth == 0:
+            self.__frame_buffer = [list(pixel) for pixel in self.__device_get_pixels()]
+        self.__batch_depth += 1
+        print_log(self.__trace_level_on, LogLevel.INFO, 'begin_batch() depth={}', self.__batch_depth)
+        return FrameBatch(self)
+
+    def commit(self):
+        '''
+        Ends a batch started with begin_batch() and writes the framebuffer to the LED-Matrix.
+        :return: None
+        '''
+        if self.__batch_depth == 0:
+            print_log(self.__trace_level_on, LogLevel.WARNING, 'commit() without begin_batch()')
+            return
+        self.__batch_depth -= 1
+        print_log(self.__trace_level_on, LogLevel.INFO, 'commit() depth={}', self.__batch_depth)
+        if self.__batch_depth == 0:
+            frame = self.__frame_buffer
+            self.__frame_buffer = None
+            self.__flush_frame(frame)
+
+    def is_batch_active(self):
+        return self.__batch_depth > 0
+
+    def __write_pixel(self, x, y, r, g, b):
+        '''
+        Writes one already validated pixel either into the framebuffer (batch) or directly to the LED-Matrix.
+        '''
+        pixel = [r, g, b]
+        if self.__frame_buffer is not None:
+            self.__frame_buffer[y * 8 + x] = pixel
+            self.__pixel_version += 1
+            return
+
+        # Outside a batch: only write the pixel if it differs from the LED-Matrix
+        if self.__shadow_rotation != self._rotation:
+            self.__shadow_frame = None
+        if self.__shadow_frame is not None and self.__shadow_frame[y * 8 + x] == pixel:
+            self.__bytes_avoided += BYTES_PER_PIXEL
+            return
+        self.__device_set_pixel(x, y, pixel)
+        self.__pixel_version += 1
+        self.__pixels_written += 1
+        if self.__shadow_frame is not None:
+            self.__shadow_frame[y * 8 + x] = pixel
+
+    def __flush_frame(self, frame):
+        '''
+        Writes a complete frame to the LED-Matrix. Only the pixels which differ from the last written frame (shadow) are sent:
+        up to diff_threshold changed pixels one by one with set_pixel(), more with one single set_pixels().
+        :param frame: list of 64 [r, g, b]
+        '''
+        self.__frame_count += 1
+        if self.__shadow_frame is None or self.__shadow_rotation != self._rotation:
+            # unknown content or the pixel mapping has changed (e.g. show_letter() turns the rotation temporarily)
+            changed = range(64)
+        else:
+            changed = [i for i in range(64) if frame[i] != self.__shadow_frame[i]]
+
+        if len(changed) == 0:
+            pixels_written = 0
+        elif len(changed) <= self.__diff_threshold:
+            for i in changed:
+                self.__device_set_pixel(i % 8, i // 8, frame[i])
+            pixels_written = len(changed)
+        else:
+            self.__device_set_pixels(frame)
+            pixels_written = 64
+
+        print_log(self.__trace_level_on, LogLevel.INFO, 'flush_frame() changed={} written={}', len(changed), pixels_written)
+        if pixels_written > 0:
+            self.__pixel_version += 1
+        self.__pixels_written += pixels_written
+        self.__bytes_avoided += (64 - pixels_written) * BYTES_PER_PIXEL
+        self.__shadow_frame = frame
+        self.__shadow_rotation = self._rotation
+
+    def invalidate_shadow(self):
+        '''
+        Forgets the last written frame, e.g. when another program has written to the LED-Matrix.
+        The next frame is written completely. The content is unknown, therefore it counts as a change (pixel_version).
+        '''
+        self.__shadow_frame = None
+        self.__pixel_version += 1
+
+    def reset_frame_statistics(self):
+        self.__frame_count = 0
+        self.__pixels_written = 0
+        self.__bytes_avoided = 0
+
+    def get_frame_statistics(self):
+        '''
+        Returns the I/O counters of the LED-Matrix since the last reset_frame_statistics().
+        :return: dict with frames, pixels_written, bytes_written and bytes_avoided
+        '''
+        return {'frames': self.__frame_count,
+                'pixels_written': self.__pixels_written,
+                'bytes_written': self.__pixels_written * BYTES_PER_PIXEL,
+                'bytes_avoided': self.__bytes_avoided}
+
+    frame_statistics = property(get_frame_statistics)
+
+    def set_pixels(self, pixel_list):
+        '''
+        Overwrites the set_pixels() method from the SenseHat class.
+        Writes into the framebuffer while a batch is open, otherwise only the changed pixels are written to the LED-Matrix.
+        :param pixel_list: list of 64 pixels (r, g, b)
+        :return: None
+        '''
+        if len(pixel_list) != 64:
+            raise ValueError('Pixel lists must have 64 elements')
+        for index, pixel in enumerate(pixel_list):
+            if len(pixel) != 3 or not all(0 <= c <= 255 for c in pixel):
+                raise ValueError(f'Pixel at index {index} is invalid. Pixels must contain 3 elements: Red, Green and Blue from 0 to 255')
+
+        frame = [list(pixel) for pixel in pixel_list]
+        if self.__frame_buffer is not None:
+            self.__frame_buffer = frame
+            self.__pixel_version += 1
+        else:
+            self.__flush_frame(frame)
+
+    def set_rotation(self, r=0, redraw=True):
+        '''
+        Overwrites the set_rotation() method from the SenseHat class.
+        The pixel mapping changes, therefore the next frame has to be written completely.
+        '''
+        self.invalidate_shadow()
+        super().set_rotation(r, redraw)
+
+    def get_pixels(self):
+        '''
+        Overwrites the get_pixels() method from the SenseHat class, reads from the framebuffer while a batch is open.
+        :return: list of 64 pixels [r, g, b]
+        '''
+        if self.__frame_buffer is not None:
+            return [list(pixel) for pixel in self.__frame_buffer]
+        return self.__device_get_pixels()
+
+    def get_pixel(self, x, y):
+        '''
+        Overwrites the get_pixel() method from the SenseHat class, reads from the framebuffer while a batch is open.
+        :return: pixel [r, g, b]
+        '''
+        if self.__frame_buffer is not None:
+            if not (0 <= x <= 7 and 0 <= y <= 7):
+                raise ValueError('X and Y position must be between 0 and 7')
+            return list(self.__frame_buffer[y * 8 + x])
+        return self.__device_get_pixel(x, y)
+
+    def get_versioned_pixels(self):
+        '''
+        Like get_pixels(), but the LED-Matrix is read only once per pixel_version: the frame is kept (together with
+        a few older ones) until the next change, e.g. for REST-Clients which poll the matrix.
+        :return: (pixel_version, list of 64 pixels [r, g, b])
+        '''
+        version = self.__pixel_version  # read before the pixels: a concurrent change is seen with the next version
+        with self.__frame_history_lock:
+            frame = self.__frame_history.get(version)
+        if frame is None:
+            frame = [list(pixel) for pixel in self.get_pixels()]
+            with self.__frame_history_lock:
+                frame = self.__frame_history.setdefault(version, frame)
+                while len(self.__frame_history) > self.__frame_history_size:
+                    self.__frame_history.popitem(last=False)
+        return version, [list(pixel) for pixel in frame]
+
+    def get_changed_pixels(self, since):
+        '''
+        The pixels which differ from the frame returned by get_versioned_pixels() for pixel_version since.
+        If this frame is not known anymore (too old, or from before a restart) all 64 pixels are returned.
+        :return: (pixel_version, list of [index, r, g, b], True if all pixels are returned)
+        '''
+        version, frame = self.get_versioned_pixels()
+        with self.__frame_history_lock:
+            old_frame = self.__frame_history.get(since)
+        if old_frame is None:
+            return version, [[index] + pixel for index, pixel in enumerate(frame)], True
+        return version, [[index] + pixel for index, pixel in enumerate(frame) if pixel != old_frame[index]], False
+
 
     # Business Methods
     # ================
@@ -219,8 +532,20 @@ class MySenseHat(SenseHat):
 
         :return: None
         '''
+        trace_level_on = self.__trace_level_on
 
-        print_if_not_empty(get_status_string(self.debug_mode, LogLevel.INFO, f'set_pixel(self, x={x}, y={y}, r={r}, g={g}, b={b}, pixel_color={pixel_color})')) 
+        # Fast path: integer coordinates and colors in range, no conversions needed
+        if (type(x) is int and type(y) is int and type(r) is int and type(g) is int and type(b) is int and pixel_color is None
+                and 0 <= x <= 7 and 0 <= y <= 7 and 0 <= r <= 255 and 0 <= g <= 255 and 0 <= b <= 255):
+            print_log(trace_level_on, LogLevel.INFO, 'set_pixel(self, x={}, y={}, r={}, g={}, b={})', x, y, r, g, b)
+            self.__write_pixel(x, y, r, g, b)
+            return
+
+        print_log(trace_level_on, LogLevel.INFO, 'set_pixel(self, x={}, y={}, r={}, g={}, b={}, pixel_color={})', x, y, r, g, b, pixel_color)
+
+        # set_pixel(x, y, (r, g, b)) as in the SenseHat class
+        if pixel_color is None and isinstance(r, (tuple, list)):
+            pixel_color = r
 
         # Handle the different types of the function arguments
         if pixel_color is not None:
@@ -273,15 +598,15 @@ class MySenseHat(SenseHat):
                 x = int(round(float(x)))
                 y = int(round(float(y)))
             except ValueError:
-                print_if_not_empty(get_status_string(self.debug_mode, LogLevel.ERROR,f'set_pixel(x={x}, y={y}) Conversion failed!!' ))
+                print_log(trace_level_on, LogLevel.ERROR, 'set_pixel(x={}, y={}) Conversion failed!!', x, y)
                 has_a_parameter_error = True
 
         # Checking the coordinates and calling the original set_pixel() method from the super class
         if not has_a_parameter_error and (0 <= x <= 7) and (0 <= y <= 7):
-            print_if_not_empty(get_status_string(self.debug_mode, LogLevel.INFO,f'set_pixel(self, x={x}, y={y}, r={r}, g={g}, b={b}, pixel_color={pixel_color})\n'))
-            super().set_pixel(x, y, int(round(float(r))), int(round(float(g))), int(round(float(b))))
+            print_log(trace_level_on, LogLevel.INFO, 'set_pixel(self, x={}, y={}, r={}, g={}, b={}, pixel_color={})\n', x, y, r, g, b, pixel_color)
+            self.__write_pixel(x, y, int(round(float(r))), int(round(float(g))), int(round(float(b))))
         else:
-            print_if_not_empty(get_status_string(self.debug_mode, LogLevel.WARNING,f'set_pixel(x={x}, y={y}) Coordinates out of range!\n'))
+            print_log(trace_level_on, LogLevel.WARNING, 'set_pixel(x={}, y={}) Coordinates out of range!\n', x, y)
 
 
 
@@ -307,32 +632,13 @@ class MySenseHat(SenseHat):
         else:
             draw_speed = 0
 
-        print_if_not_empty(get_status_string(self.debug_mode, LogLevel.INFO,f'draw_line(self, x1={x_start}, y1={y_start}, x2={x_end}, y2={y_end}, r={r}, g={g}, b={b}, draw_speed={draw_speed})'))
+        print_log(self.__trace_level_on, LogLevel.INFO, 'draw_line(self, x1={}, y1={}, x2={}, y2={}, r={}, g={}, b={}, draw_speed={})', x_start, y_start, x_end, y_end, r, g, b, draw_speed)
 
-        if x_start == x_end:
-            if y_start > y_end:
-                y_start, y_end = y_end, y_start
-            for y in range(round(y_start), round(y_end+1)):
-                self.set_pixel(x_start, y, r, g, b)
+        x_start, y_start, x_end, y_end = (int(round(float(v))) for v in (x_start, y_start, x_end, y_end))
+        for x, y in line_points(x_start, y_start, x_end, y_end):
+            self.set_pixel(x, y, r, g, b)
+            if draw_speed > 0:
                 sleep(draw_speed)
-        else:
-            if x_start > x_end:
-                x_start, x_end = x_end, x_start
-                y_start, y_end = y_end, y_start
-            a = (y_start-y_end)/(x_start-x_end)
-            c = y_start - a*x_start
-            if abs(a) >= 1:  # Steile Linie
-                if y_start > y_end:
-                    y_start, y_end = y_end, y_start
-                for y in range(round(y_start), round(y_end+1)):
-                    x = (y - c)/a
-                    self.set_pixel(x, y, r, g, b)
-                    sleep(draw_speed)
-            else: # Flache Linie
-                for x in range(round(x_start), round(x_end+1)):
-                    y = a*x + c
-                    self.set_pixel(x, y, r, g, b)
-                    sleep(draw_speed)
 
     # draw_line from Stefan_Scheuber
     # ==============================
@@ -349,56 +655,40 @@ class MySenseHat(SenseHat):
         
         :param sleepTime: Zeit für das setzen einzelner Pixel
         """
-        if abs(x_start-x_end) > abs(y_start-y_end):
-            gradient_y = (y_end-y_start)/abs(x_end-x_start)
-            value_list = self.__calculatPoints(x_end,x_start)
-            liste_points = self.__calculateXY(x_start,y_start,value_list,gradient_y)
-        else:
-            gradient_x = (x_end-x_start)/abs(y_end-y_start)
-            value_list = self.__calculatPoints(y_end,y_start) 
-            liste_points = self.__calculateXY(x_start,y_start,value_list,gradient_x,False)
+        for x, y in line_points(x_start, y_start, x_end, y_end):
+            self.set_pixel(x, y, pixel_color=forground_color)
+            if sleepTime > 0:
+                time.sleep(sleepTime)
 
-        for point in liste_points:
-            self.set_pixel(point['x'],point['y'],(forground_color))
-            time.sleep(sleepTime)
+    def draw_rectangle(self, x_start=0, y_start=0, x_end=7, y_end=7, r=255, g=255, b=255, filled=False):
+        '''
+        Draws a rectangle with the corners (x_start, y_start) and (x_end, y_end).
+        :param filled: True draws a filled rectangle
+        :return: None
+        '''
+        print_log(self.__trace_level_on, LogLevel.INFO, 'draw_rectangle(self, x1={}, y1={}, x2={}, y2={}, r={}, g={}, b={}, filled={})', x_start, y_start, x_end, y_end, r, g, b, filled)
+        for x, y in clip(rectangle_points(x_start, y_start, x_end, y_end, filled)):
+            self.set_pixel(x, y, r, g, b)
 
-    def __calculatPoints (self,end,start):
-        """
-        Methode gibt eine Liste von Werten, abhängig von den Start und Endpunkten zurück
-        :param end  : start der Linie
-        :param start: ende der Linie
-        """
-        value_list=[]
-        if start < end:
-            for x_calculation in range (0, end-start+1):
-                value_list.append(x_calculation)
-        else:
-            for x_calculation in range (0,end-start-1,-1):
-                value_list.append(x_calculation)
-        return value_list
-    
-    def __calculateXY (self,x_start,y_start,valueList,gradient,calculateY=True):
-        """
-        Methode gibt eine Liste von Werten, abhängig von den Start und Endpunkten zurück
-        :param x_start: start der x-Kordinate
-        :param y_start: start der y-Kordinate
-        :param valueList: Liste von Zwischenwerten
-        :param gradient : Steigung der Geraden
-        :param calculateY: Berechnung der Y = True (Berechnung Y auf Basis X)
-        """
-        calculation = 0
-        liste = []
-        for calculation in valueList:
-            calculation_2nd= gradient * abs(calculation)
-            if calculateY:
-                x = calculation + x_start
-                y = calculation_2nd + y_start
-                liste.append({'x':x,'y':y})
-            else:
-                x = calculation_2nd + x_start
-                y = calculation + y_start
-                liste.append({'x':x,'y':y})
-        return liste 
+    def draw_circle(self, x_center=3, y_center=3, radius=3, r=255, g=255, b=255, filled=False):
+        '''
+        Draws a circle (midpoint algorithm) around (x_center, y_center).
+        :param filled: True draws a filled circle
+        :return: None
+        '''
+        print_log(self.__trace_level_on, LogLevel.INFO, 'draw_circle(self, x={}, y={}, radius={}, r={}, g={}, b={}, filled={})', x_center, y_center, radius, r, g, b, filled)
+        for x, y in clip(circle_points(x_center, y_center, radius, filled)):
+            self.set_pixel(x, y, r, g, b)
+
+    def draw_polygon(self, vertices, r=255, g=255, b=255, filled=False):
+        '''
+        Draws a closed polygon through the vertices [(x, y), ...].
+        :param filled: True draws a filled polygon
+        :return: None
+        '''
+        print_log(self.__trace_level_on, LogLevel.INFO, 'draw_polygon(self, vertices={}, r={}, g={}, b={}, filled={})', vertices, r, g, b, filled)
+        for x, y in clip(polygon_points(vertices, filled)):
+            self.set_pixel(x, y, r, g, b)
 
 
 def Test_set_pixel(sense, do_test=False):
@@ -476,6 +766,90 @@ def Test_draw_line(sense, do_test=True):
             sense.set_debug_mode = old_state
     
         
+def Test_batch(sense, do_test=True):
+        if do_test:
+            print('Test_batch()....')
+            sense.clear()
+            with sense.begin_batch():
+                sense.draw_line(0, 0, 7, 7, 255, 0, 0)
+                sense.draw_line(7, 0, 0, 7, 0, 255, 0)
+                sense.set_pixel(3, 0, 0, 0, 255)
+                print(f'     batch active: {sense.is_batch_active()}')
+            print(f'     batch active: {sense.is_batch_active()}')
+            sleep(3)
+
+            sense.begin_batch()
+            sense.clear(sense.blue)
+            sense.draw_line(0, 4, 7, 4, 255, 255, 0)
+            sense.commit()
+            sleep(3)
+            sense.clear()
+            print('... done')
+
+
+def Test_pixel_version(sense, do_test=True):
+        if do_test:
+            print('Test_pixel_version()....', end='')
+            sense.clear()
+            version, frame = sense.get_versioned_pixels()
+            assert sense.get_versioned_pixels() == (version, frame)
+            sense.clear()  # no pixel changed
+            assert sense.pixel_version == version
+
+            sense.set_pixel(2, 1, 248, 0, 0)  # exact in RGB565
+            assert sense.pixel_version > version
+            changed_version, changed, full = sense.get_changed_pixels(version)
+            assert changed_version == sense.pixel_version and changed == [[10, 248, 0, 0]] and not full
+            assert sense.get_changed_pixels(changed_version)[1] == []
+            assert sense.get_changed_pixels(-1)[2] and len(sense.get_changed_pixels(-1)[1]) == 64
+
+            with sense.begin_batch():
+                sense.set_pixel(0, 0, 0, 0, 248)
+                assert sense.get_changed_pixels(changed_version)[1] == [[0, 0, 0, 248]]
+            sense.set_rotation(sense.rotation, redraw=False)  # new pixel mapping: counts as a change
+            assert sense.pixel_version > changed_version
+            sense.clear()
+            print('... done')
+
+
+def Benchmark_set_pixel(sense, do_test=True, count=20000):
+        '''
+        Measures set_pixel() calls per second without LED-Matrix I/O (inside a batch):
+        string/float arguments (conversion path, as before) against int arguments (fast path).
+        '''
+        if do_test:
+            old_state = sense.debug_mode
+            sense.debug_mode = LogLevel.WARNING
+            print('Benchmark_set_pixel()....')
+            with sense.begin_batch():
+                start = time.perf_counter()
+                for i in range(count):
+                    sense.set_pixel(f'{i % 8}', float(i // 8 % 8), '255', 0.0, 0.0)
+                duration_slow = time.perf_counter() - start
+
+                start = time.perf_counter()
+                for i in range(count):
+                    sense.set_pixel(i % 8, i // 8 % 8, 255, 0, 0)
+                duration_fast = time.perf_counter() - start
+            print(f'     conversion path: {count / duration_slow:10.0f} calls/s')
+            print(f'     fast path      : {count / duration_fast:10.0f} calls/s')
+            sense.debug_mode = old_state
+            print('... done')
+
+
+def Test_shapes(sense, do_test=True):
+        if do_test:
+            print('Test_shapes()....')
+            with sense.begin_batch():
+                sense.clear()
+                sense.draw_rectangle(0, 0, 7, 7, 0, 0, 255)
+                sense.draw_circle(3, 3, 2, 255, 255, 0, filled=True)
+                sense.draw_polygon([(5, 7), (7, 7), (6, 4)], 255, 0, 0, filled=True)
+            sleep(3)
+            sense.clear()
+            print('... done')
+
+
 def Test_drawLine(sense, do_test):
         if do_test:
             old_state = sense.debug_mode 
@@ -501,6 +875,11 @@ if __name__ == '__main__':
     Test_set_pixel(sense, True)
     Test_draw_line(sense, True)
     Test_drawLine(sense, True)
+    Test_batch(sense, True)
+    Test_shapes(sense, True)
+    Test_pixel_version(sense, True)
+    print(sense.frame_statistics)
+    Benchmark_set_pixel(sense, True)
 
 
 
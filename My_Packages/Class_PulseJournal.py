@@ -0,0 +1,320 @@
+#!/usr/bin/python3
+
+# ------------------------------------------------------------------
+# Name  : Class_PulseJournal.py
+# Source: https://raw.githubusercontent.com/walter-rothlin/RaspberryPi4PiPlates/refs/heads/main/My_Packages/Class_PulseJournal.py
+#
+# Description: Crash-safe journal of the pulses of a master clock (e.g. Bahnhof_MutterUhr.py)
+#              Every pulse appends one record (polarity of the relais and the minute shown by the slave clock), so
+#              after a reboot or crash the master knows what the dial shows and can catch up:
+#
+#                  journal = PulseJournal('/home/pi/logs/mutter_uhr.journal')
+#                  if journal.last is not None:
+#                      print(journal.last.polarity, journal.last.displayed_minute)
+#                  journal.append(polarity, displayed_minute)
+#
+#              The file is append-only with fixed size records and a CRC32 each: a torn or damaged last record
+#              (power loss while writing) is dropped on open. fsync() is batched: after sync_every records or at the
+#              latest sync_interval seconds after the first unsynced record (timer), so a burst of pulses (catch-up)
+#              does not wear the SD card. When the file has more than compact_records records it is replaced by a
+#              file with only the last record (write to .tmp, fsync, rename).
+#
+# Autor: Walter Rothlin
+#
+# History:
+# 18-Oct-2026   Walter Rothlin      Initial Version
+# ------------------------------------------------------------------
+
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+MINUTES_PER_DIAL = 12 * 60
+
+# sequence number, time (ns since epoch), polarity, displayed minute (0..719) + CRC32 of these fields
+RECORD = struct.Struct('<IqBH')
+CRC = struct.Struct('<I')
+RECORD_SIZE = RECORD.size + CRC.size
+
+JournalRecord = namedtuple('JournalRecord', ('sequence', 'timestamp_ns', 'polarity', 'displayed_minute'))
+
+
+def encode_record(record):
+    data = RECORD.pack(record.sequence, record.timestamp_ns, 1 if record.polarity else 0, record.displayed_minute)
+    return data + CRC.pack(zlib.crc32(data))
+
+
+def decode_records(data):
+    '''
+    :return: (list of JournalRecord, number of valid bytes), reading stops at the first torn or damaged record
+    '''
+    records = []
+    position = 0
+    while position + RECORD_SIZE <= len(data):
+        fields = data[position:position + RECORD.size]
+        crc, = CRC.unpack_from(data, position + RECORD.size)
+        if zlib.crc32(fields) != crc:
+            break
+        sequence, timestamp_ns, polarity, displayed_minute = RECORD.unpack(fields)
+        records.append(JournalRecord(sequence, timestamp_ns, bool(polarity), displayed_minute))
+        position += RECORD_SIZE
+    return records, position
+
+
+def minutes_behind(displayed_minute, now):
+    '''
+    :param now: datetime (local time)
+    :return: number of pulses (0..719) the slave clock needs to show now
+    '''
+    return ((now.hour % 12) * 60 + now.minute - displayed_minute) % MINUTES_PER_DIAL
+
+
+class PulseJournal:
+    '''
+    Append-only journal of the pulses, replayed on open.
+    '''
+
+    # Initializer and setter/Getter and Properties
+    # ============================================
+    def __init__(self, path, sync_every=16, sync_interval=2.0, compact_records=1024):
+        '''
+        Constructor: reads the journal (drops a torn last record) and opens it for appending.
+        :param path: journal file, created if missing
+        :param sync_every: fsync() after this number of unsynced records
+        :param sync_interval: fsync() at the latest this number of seconds after the first unsynced record
+        :param compact_records: the file is compacted when it has more records
+        '''
+        self.__path = path
+        self.__sync_every = sync_every
+        self.__sync_interval = sync_interval
+        self.__compact_records = compact_records
+        self.__lock = threading.Lock()
+        self.__timer = None
+        self.__unsynced = 0
+        self.__syncs = 0
+        self.__compactions = 0
+
+        data = b''
+        if os.path.exists(path):
+            with open(path, 'rb') as file:
+                data = file.read()
+        records, valid = decode_records(data)
+        self.__dropped_bytes = len(data) - valid
+        self.__last = records[-1] if records else None
+        self.__records = len(records)
+
+        self.__fd = os.open(path, os.O_WRONLY | os.O_CREAT, 0o644)
+        if self.__dropped_bytes:
+            print(f'PulseJournal: {self.__dropped_bytes} Bytes am Ende von {path} verworfen (unvollständiger Eintrag)')
+            os.ftruncate(self.__fd, valid)
+            os.fsync(self.__fd)
+        os.lseek(self.__fd, valid, os.SEEK_SET)
+        if self.__records > self.__compact_records:
+            self.compact()
+
+    def get_last(self):
+        '''
+        :return: last JournalRecord, None if the journal is empty
+        '''
+        return self.__last
+
+    last = property(get_last)
+
+    def get_statistics(self):
+        return {'records': self.__records,
+                'unsynced': self.__unsynced,
+                'syncs': self.__syncs,
+                'compactions': self.__compactions,
+                'dropped_bytes': self.__dropped_bytes,
+                'file_size': self.__records * RECORD_SIZE}
+
+    statistics = property(get_statistics)
+
+    # Business Methods
+    # ================
+    def append(self, polarity, displayed_minute, timestamp_ns=None):
+        '''
+        Appends one pulse. fsync() is batched (sync_every, sync_interval).
+        :return: JournalRecord
+        '''
+        with self.__lock:
+            if self.__fd is None:
+                raise ValueError('PulseJournal is closed')
+            sequence = 0 if self.__last is None else (self.__last.sequence + 1) & 0xFFFFFFFF
+            record = JournalRecord(sequence, time.time_ns() if timestamp_ns is None else timestamp_ns,
+                                   bool(polarity), displayed_minute % MINUTES_PER_DIAL)
+            os.write(self.__fd, encode_record(record))
+            self.__last = record
+            self.__records += 1
+            self.__unsynced += 1
+            if self.__unsynced >= self.__sync_every:
+                self.__sync()
+            elif self.__timer is None:
+                self.__timer = threading.Timer(self.__sync_interval, self.sync)
+                self.__timer.daemon = True
+                self.__timer.start()
+            if self.__records > self.__compact_records:
+                self.__compact()
+        return record
+
+    def sync(self):
+        '''
+        Writes the unsynced records to the disk (fsync).
+        '''
+        with self.__lock:
+            if self.__fd is not None:
+                self.__sync()
+
+    def compact(self):
+        '''
+        Replaces the journal by one with only the last record.
+        '''
+        with self.__lock:
+            if self.__fd is not None:
+                self.__compact()
+
+    def close(self):
+        with self.__lock:
+            if self.__fd is not None:
+                self.__sync()
+                os.close(self.__fd)
+                self.__fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # Internals (called with the lock)
+    # ================================
+    def __sync(self):
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+        if self.__unsynced:
+            os.fsync(self.__fd)
+            self.__unsynced = 0
+            self.__syncs += 1
+
+    def __compact(self):
+        directory = os.path.dirname(os.path.abspath(self.__path))
+        file_descriptor, temp_path = tempfile.mkstemp(prefix=os.path.basename(self.__path) + '.', suffix='.tmp', dir=directory)
+        try:
+            try:
+                if self.__last is not None:
+                    os.write(file_descriptor, encode_record(self.__last))
+                os.fsync(file_descriptor)
+            finally:
+                os.close(file_descriptor)
+            os.replace(temp_path, self.__path)  # atomic: the old or the new journal, never a mix
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        _fsync_directory(directory)
+
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+        os.close(self.__fd)
+        self.__fd = os.open(self.__path, os.O_WRONLY)
+        os.lseek(self.__fd, 0, os.SEEK_END)
+        self.__records = 0 if self.__last is None else 1
+        self.__unsynced = 0
+        self.__compactions += 1
+
+
+def _fsync_directory(directory):
+    '''
+    Makes the rename durable (not possible on every platform).
+    '''
+    try:
+        directory_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(directory_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(directory_fd)
+
+
+# Tests and Benchmark
+# ===================
+def Test_PulseJournal(do_test=True):
+    if do_test:
+        print('Test_PulseJournal()....', end='')
+        from datetime import datetime
+        directory = tempfile.mkdtemp(prefix='pulse_journal_')
+        path = os.path.join(directory, 'test.journal')
+
+        with PulseJournal(path, sync_every=8, sync_interval=0.05, compact_records=100) as journal:
+            assert journal.last is None
+            for minute in range(50):
+                journal.append(minute % 2 == 1, 600 + minute)
+            assert journal.statistics['syncs'] == 6 and journal.statistics['unsynced'] == 2
+            time.sleep(0.1)  # the timer syncs the rest
+            assert journal.statistics['unsynced'] == 0 and journal.statistics['syncs'] == 7
+
+        journal = PulseJournal(path)
+        assert journal.last == JournalRecord(49, journal.last.timestamp_ns, True, 649) and journal.statistics['records'] == 50
+        journal.close()
+
+        with open(path, 'ab') as file:  # power loss while writing: torn record
+            file.write(encode_record(JournalRecord(50, 0, False, 650))[:7])
+        journal = PulseJournal(path)
+        assert journal.last.displayed_minute == 649 and journal.statistics['dropped_bytes'] == 7
+        journal.append(False, 650)
+        journal.close()
+        assert os.path.getsize(path) == 51 * RECORD_SIZE
+
+        with open(path, 'r+b') as file:  # damaged last record: CRC does not match
+            file.seek(-3, os.SEEK_END)
+            file.write(b'\xff')
+        with PulseJournal(path, compact_records=10) as journal:  # compacted on open
+            assert journal.last.displayed_minute == 649 and journal.statistics['compactions'] == 1
+            for minute in range(650, 665):
+                journal.append(minute % 2 == 1, minute % MINUTES_PER_DIAL)
+            assert journal.statistics['compactions'] == 2
+        assert os.path.getsize(path) <= 10 * RECORD_SIZE
+        journal = PulseJournal(path)
+        assert journal.last.displayed_minute == 664 and journal.last.sequence == 64
+        journal.close()
+
+        assert minutes_behind(664, datetime(2026, 10, 18, 23, 10)) == 6
+        assert minutes_behind(0, datetime(2026, 10, 18, 12, 0)) == 0
+        assert minutes_behind(10, datetime(2026, 10, 18, 0, 5)) == 715
+        os.remove(path)
+        os.rmdir(directory)
+        print('... done')
+
+
+def Benchmark_PulseJournal(do_test=True, count=500):
+    '''
+    Pulses per second (catch-up burst) with a fsync() per record and batched.
+    '''
+    if do_test:
+        print(f'Benchmark_PulseJournal(count={count})....')
+        directory = tempfile.mkdtemp(prefix='pulse_journal_')
+        path = os.path.join(directory, 'benchmark.journal')
+        for sync_every in (1, 16):
+            with PulseJournal(path, sync_every=sync_every, compact_records=count * 2) as journal:
+                start = time.perf_counter()
+                for minute in range(count):
+                    journal.append(minute % 2 == 1, minute)
+                duration = time.perf_counter() - start
+                print(f'     sync_every={sync_every:<3d} {count / duration:10.0f} records/s  fsyncs: {journal.statistics["syncs"]}')
+            os.remove(path)
+        os.rmdir(directory)
+        print('... done')
+
+
+if __name__ == '__main__':
+    Test_PulseJournal(True)
+    Benchmark_PulseJournal(True)
@@ -0,0 +1,453 @@
+#!/usr/bin/python3
+
+# ------------------------------------------------------------------
+# Name  : Class_Renderer.py
+# Source: https://raw.githubusercontent.com/walter-rothlin/RaspberryPi4PiPlates/refs/heads/main/My_Packages/Class_Renderer.py
+#
+# Description: Render thread for animations on the LED-Matrix
+#              Callers put frames, animations or commands into a bounded queue and return immediately
+#              (e.g. a Flask request). The render thread draws them paced to a target FPS:
+#               - a new single frame replaces a single frame which is still waiting (coalesce)
+#               - a full queue drops the oldest waiting single frame
+#               - an animation which is behind schedule skips frames (the last frame is always drawn)
+#              As the only thread which talks to the LED-Matrix it is also the command queue for the web applications:
+#               - jobs with a higher priority are drawn first (FIFO within the same priority)
+#               - jobs with the same coalesce_key which are waiting next to each other are merged, only the newest
+#                 one is executed (e.g. set_rotation, or clear/set_pixels which replace waiting frames: FRAME_KEY)
+#
+#                  renderer = Renderer(sense, fps=25)
+#                  future = renderer.submit_animation(line_animation(sense, 0, 0, 7, 7, (255, 0, 0)), frame_time=0.1)
+#                  future.result()  # only if the caller wants to wait
+#
+# Autor: Walter Rothlin
+#
+# History:
+# 18-Oct-2026   Walter Rothlin      Initial Version
+# 18-Oct-2026   Walter Rothlin      Priorities and coalescing of commands (hardware command queue for Flask)
+# 18-Oct-2026   Walter Rothlin      Frames can also be packed RGB565 (128 bytes, e.g. Class_TextScroller)
+# 18-Oct-2026   Walter Rothlin      cancel(cancel_key): cancels only the animations with this key (e.g. scrolling texts)
+# ------------------------------------------------------------------
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from math import sin, pi
+from waltisLibrary_Rasterizer import line_points, clip
+from Class_FramebufferDevice import rgb565_to_rgb
+
+HIGH = 0
+NORMAL = 1
+LOW = 2
+
+FRAME_KEY = 'frame'  # coalesce_key of jobs which replace the whole LED-Matrix (frames, clear, set_pixels)
+
+
+# Animations (generators, evaluated in the render thread)
+# =======================================================
+def line_animation(sense, x_start, y_start, x_end, y_end, pixel_color=(255, 255, 255)):
+    '''
+    Draws a line pixel by pixel onto the current content of the LED-Matrix: one frame per pixel.
+    '''
+    frame = [list(pixel) for pixel in sense.get_pixels()]
+    for x, y in clip(line_points(x_start, y_start, x_end, y_end)):
+        frame[y * 8 + x] = list(pixel_color)
+        yield list(frame)
+
+
+def points_animation(sense, points, pixel_color=(255, 255, 255)):
+    '''
+    Draws the points (e.g. from waltisLibrary_Rasterizer) one by one: one frame per point.
+    '''
+    frame = [list(pixel) for pixel in sense.get_pixels()]
+    for x, y in clip(points):
+        frame[y * 8 + x] = list(pixel_color)
+        yield list(frame)
+
+
+def flash_animation(pixel_color, steps=50, repeat=1):
+    '''
+    Fades the whole LED-Matrix in and out (as flash_display() in Hero_Labyrinth.py): steps frames per flash.
+    '''
+    for _ in range(repeat):
+        for i in range(steps + 1):
+            multi = sin(i * pi / steps)
+            pixel = [int(colour * multi) for colour in pixel_color]
+            yield [pixel] * 64
+
+
+class _Job:
+    FRAME = 'frame'
+    ANIMATION = 'animation'
+    COMMAND = 'command'
+
+    def __init__(self, kind, payload, frame_time=None, priority=NORMAL, coalesce_key=None, cancel_key=None):
+        self.kind = kind
+        self.payload = payload
+        self.frame_time = frame_time
+        self.priority = priority
+        self.coalesce_key = coalesce_key
+        self.cancel_key = cancel_key
+        self.cancelled = False
+        self.futures = [Future()]
+
+
+class Renderer:
+    '''
+    Daemon thread which owns the drawing on the LED-Matrix. All submit_...() methods return a
+    concurrent.futures.Future, which is done when the job has been drawn (or cancelled when it was dropped).
+    '''
+
+    # Initializer and setter/Getter and Properties
+    # ============================================
+    def __init__(self, sense, fps=25, max_queue=32, start=True):
+        '''
+        Constructor
+        :param sense: SenseHat, MySenseHat or any object with set_pixels()
+        :param fps: maximal number of frames per second drawn on the LED-Matrix
+        :param max_queue: maximal number of waiting jobs (frames, animations, commands)
+        '''
+        self.__sense = sense
+        self.__frame_time = 1.0 / fps
+        self.__max_queue = max_queue
+        self.__jobs = deque()
+        self.__condition = threading.Condition()
+        self.__stop_event = threading.Event()
+        self.__cancel_generation = 0
+        self.__next_frame_at = time.monotonic()
+        self.reset_statistics()
+        self.__thread = threading.Thread(target=self.__run, name='Renderer', daemon=True)
+        if start:
+            self.__thread.start()
+
+    def get_fps(self):
+        return 1.0 / self.__frame_time
+
+    def set_fps(self, fps):
+        self.__frame_time = 1.0 / fps
+
+    fps = property(get_fps, set_fps)
+
+    def get_queue_length(self):
+        with self.__condition:
+            return len(self.__jobs)
+
+    queue_length = property(get_queue_length)
+
+    def reset_statistics(self):
+        self.__statistics = {'frames_rendered': 0, 'frames_skipped': 0, 'frames_dropped': 0,
+                             'frames_coalesced': 0, 'commands': 0, 'commands_coalesced': 0}
+
+    def get_statistics(self):
+        '''
+        :return: dict with frames_rendered, frames_skipped (late animation frames), frames_dropped (queue full),
+                 frames_coalesced (replaced by a newer job), commands and commands_coalesced
+        '''
+        return dict(self.__statistics)
+
+    statistics = property(get_statistics)
+
+    def is_running(self):
+        return self.__thread.is_alive()
+
+    # Business Methods
+    # ================
+    def submit_frame(self, frame, coalesce=True, priority=NORMAL, timeout=None):
+        '''
+        Queues one frame (64 pixels) for set_pixels().
+        :param coalesce: True: replaces the frames (and FRAME_KEY commands) waiting just before it
+        '''
+        frame = [list(pixel) for pixel in frame]
+        if len(frame) != 64:
+            raise ValueError('A frame must have 64 pixels')
+        coalesce_key = FRAME_KEY if coalesce else None
+        return self.__put(_Job(_Job.FRAME, frame, priority=priority, coalesce_key=coalesce_key), timeout)
+
+    def submit_animation(self, frames, frame_time=None, priority=NORMAL, timeout=None, cancel_key=None):
+        '''
+        Queues an animation: a list or a generator of frames. A generator is evaluated in the render thread.
+        :param frame_time: seconds per frame, default and minimum 1/fps
+        :param cancel_key: cancel(cancel_key) stops this animation and leaves all other jobs alone
+        '''
+        return self.__put(_Job(_Job.ANIMATION, frames, frame_time, priority=priority, cancel_key=cancel_key), timeout)
+
+    def submit(self, function, *args, priority=NORMAL, coalesce_key=None, timeout=None, **kwargs):
+        '''
+        Queues a call (e.g. sense.clear or sense.show_letter), executed in the render thread in queue order.
+        The future returns the return value of the function.
+        :param priority: HIGH, NORMAL or LOW
+        :param coalesce_key: waiting jobs with the same key right before this one are not executed any more,
+                             their futures get the result of this call
+        '''
+        job = _Job(_Job.COMMAND, (function, args, kwargs), priority=priority, coalesce_key=coalesce_key)
+        return self.__put(job, timeout)
+
+    def cancel_all(self):
+        '''
+        Cancels all waiting jobs and stops a running animation after its current frame.
+        '''
+        with self.__condition:
+            self.__cancel_generation += 1
+            while self.__jobs:
+                for future in self.__jobs.popleft().futures:
+                    future.cancel()
+            self.__condition.notify_all()
+
+    def cancel(self, cancel_key):
+        '''
+        Cancels the waiting animations with this cancel_key and stops the running one after its current frame.
+        :return: number of cancelled animations
+        '''
+        with self.__condition:
+            cancelled = [job for job in self.__jobs if job.cancel_key == cancel_key]
+            for job in cancelled:
+                self.__jobs.remove(job)
+                for future in job.futures:
+                    future.cancel()
+            if self.__current_job is not None and self.__current_job.cancel_key == cancel_key:
+                self.__current_job.cancelled = True
+                cancelled.append(self.__current_job)
+            self.__condition.notify_all()
+        return len(cancelled)
+
+    def wait_idle(self, timeout=None):
+        '''
+        Waits until all queued jobs are drawn.
+        :return: True if idle, False on timeout
+        '''
+        with self.__condition:
+            return self.__condition.wait_for(lambda: not self.__jobs and not self.__busy, timeout)
+
+    def stop(self, timeout=None):
+        self.cancel_all()
+        self.__stop_event.set()
+        with self.__condition:
+            self.__condition.notify_all()
+        if self.__thread.is_alive():
+            self.__thread.join(timeout)
+
+    # Queue and render thread
+    # =======================
+    __busy = False
+    __current_job = None
+
+    def __drop_oldest_frame(self):
+        for job in self.__jobs:
+            if job.kind == _Job.FRAME:
+                self.__jobs.remove(job)
+                for future in job.futures:
+                    future.cancel()
+                self.__statistics['frames_dropped'] += 1
+                return True
+        return False
+
+    def __insert_position(self, priority):
+        position = len(self.__jobs)
+        while position > 0 and self.__jobs[position - 1].priority > priority:
+            position -= 1
+        return position
+
+    def __coalesce(self, job, position):
+        '''
+        Removes the waiting jobs with the same coalesce_key right before position, job takes over their futures.
+        :return: position of job
+        '''
+        while position > 0 and self.__jobs[position - 1].coalesce_key == job.coalesce_key:
+            replaced = self.__jobs[position - 1]
+            del self.__jobs[position - 1]
+            position -= 1
+            job.futures.extend(replaced.futures)
+            self.__statistics['frames_coalesced' if replaced.kind == _Job.FRAME else 'commands_coalesced'] += 1
+        return position
+
+    def __put(self, job, timeout=None):
+        with self.__condition:
+            if self.__stop_event.is_set():
+                raise RuntimeError('Renderer is stopped')
+            position = self.__insert_position(job.priority)
+            if job.coalesce_key is not None:
+                position = self.__coalesce(job, position)
+            if len(self.__jobs) >= self.__max_queue:
+                if not self.__drop_oldest_frame() and \
+                        not self.__condition.wait_for(lambda: len(self.__jobs) < self.__max_queue, timeout):
+                    raise queue.Full(f'Renderer queue is full ({self.__max_queue} jobs)')
+                position = self.__insert_position(job.priority)
+            self.__jobs.insert(position, job)
+            self.__condition.notify_all()
+        return job.futures[0]
+
+    def __wait_for_frame_slot(self, frame_time):
+        now = time.monotonic()
+        if self.__next_frame_at > now:
+            self.__stop_event.wait(self.__next_frame_at - now)
+            now = self.__next_frame_at
+        self.__next_frame_at = now + frame_time
+
+    def __draw(self, frame):
+        if isinstance(frame, (bytes, bytearray, memoryview)):  # packed RGB565
+            if hasattr(self.__sense, 'write_rgb565'):
+                self.__sense.write_rgb565(frame)
+            else:
+                self.__sense.set_pixels([rgb565_to_rgb(value) for value in memoryview(frame).cast('H')])
+        else:
+            self.__sense.set_pixels(frame)
+        self.__statistics['frames_rendered'] += 1
+
+    def __play(self, job, generation):
+        frame_time = max(job.frame_time or 0, self.__frame_time)
+        frames = iter(job.payload)
+        frame = next(frames, None)
+        deadline = time.monotonic()
+        while frame is not None:
+            next_frame = next(frames, None)
+            if self.__stop_event.is_set() or generation != self.__cancel_generation or job.cancelled:
+                return False
+            late = time.monotonic() - deadline
+            if next_frame is not None and late > frame_time:
+                self.__statistics['frames_skipped'] += 1  # behind schedule: skip, the next frame contains it
+            else:
+                self.__wait_for_frame_slot(frame_time)
+                self.__draw(frame)
+            deadline += frame_time
+            frame = next_frame
+        return True
+
+    def __run(self):
+        while not self.__stop_event.is_set():
+            with self.__condition:
+                self.__busy = False
+                self.__current_job = None
+                self.__condition.notify_all()
+                while not self.__jobs and not self.__stop_event.is_set():
+                    self.__condition.wait()
+                if self.__stop_event.is_set():
+                    return
+                job = self.__jobs.popleft()
+                generation = self.__cancel_generation
+                self.__current_job = job
+                self.__busy = True
+                self.__condition.notify_all()
+            futures = [future for future in job.futures if future.set_running_or_notify_cancel()]
+            try:
+                if job.kind == _Job.FRAME:
+                    self.__wait_for_frame_slot(self.__frame_time)
+                    self.__draw(job.payload)
+                    result = True
+                elif job.kind == _Job.ANIMATION:
+                    result = self.__play(job, generation)
+                else:
+                    function, args, kwargs = job.payload
+                    result = function(*args, **kwargs)
+                    self.__statistics['commands'] += 1
+            except Exception as exception:
+                for future in futures:
+                    future.set_exception(exception)
+            else:
+                for future in futures:
+                    future.set_result(result)
+
+
+# Tests
+# =====
+class _FrameRecorder:
+    def __init__(self, write_time=0):
+        self.frames = []
+        self.pixels = [[0, 0, 0]] * 64
+        self.write_time = write_time
+
+    def set_pixels(self, frame):
+        time.sleep(self.write_time)
+        self.frames.append(frame)
+        self.pixels = frame
+
+    def get_pixels(self):
+        return self.pixels
+
+
+def Test_Renderer(do_test=True):
+    if do_test:
+        print('Test_Renderer()....', end='')
+        sense = _FrameRecorder()
+        renderer = Renderer(sense, fps=200)
+
+        future = renderer.submit_animation(line_animation(sense, 0, 0, 7, 7, (255, 0, 0)))
+        assert future.result(timeout=5) is True
+        assert len(sense.frames) == 8 and sense.pixels[63] == [255, 0, 0]
+
+        done = renderer.submit(lambda: 42)
+        assert done.result(timeout=5) == 42
+
+        # coalesce: while the render thread is busy, only the newest waiting frame is drawn
+        blocker = threading.Event()
+        renderer.submit(blocker.wait)
+        first = renderer.submit_frame([[1, 1, 1]] * 64)
+        second = renderer.submit_frame([[2, 2, 2]] * 64)
+        blocker.set()
+        assert second.result(timeout=5) and first.result(timeout=5)
+        assert sense.pixels == [[2, 2, 2]] * 64
+        assert renderer.statistics['frames_coalesced'] == 1
+
+        # a late animation (LED-Matrix slower than the frame time) skips frames but ends with its last frame
+        frames_before = len(sense.frames)
+        sense.write_time = 0.01
+        slow = renderer.submit_animation(flash_animation((0, 0, 255), steps=100))
+        assert slow.result(timeout=10)
+        assert len(sense.frames) - frames_before < 101 and sense.pixels == [[0, 0, 0]] * 64
+        assert renderer.statistics['frames_skipped'] > 0
+
+        # command queue: priorities and coalescing of waiting commands
+        calls = []
+        frames_before = len(sense.frames)
+        blocker = threading.Event()
+        renderer.submit(blocker.wait)
+        rotation_1 = renderer.submit(calls.append, 'rotation 90', coalesce_key='rotation')
+        rotation_2 = renderer.submit(calls.append, 'rotation 180', coalesce_key='rotation')
+        renderer.submit_frame([[3, 3, 3]] * 64)
+        clear = renderer.submit(calls.append, 'clear', coalesce_key=FRAME_KEY)  # replaces the waiting frame
+        renderer.submit(calls.append, 'low', priority=LOW)
+        renderer.submit(calls.append, 'high', priority=HIGH)
+        blocker.set()
+        assert renderer.wait_idle(timeout=5)
+        assert calls == ['high', 'rotation 180', 'clear', 'low']
+        assert rotation_1.done() and rotation_2.done() and clear.done()
+        assert len(sense.frames) == frames_before and renderer.statistics['commands_coalesced'] == 1
+
+        # cancel(cancel_key): stops the running and the waiting animations with this key, other jobs are drawn
+        calls = []
+        running = renderer.submit_animation([[[4, 4, 4]] * 64] * 100, frame_time=0.05, cancel_key='message')
+        waiting = renderer.submit_animation([[[5, 5, 5]] * 64], cancel_key='message')
+        command = renderer.submit(calls.append, 'clear', coalesce_key=FRAME_KEY)
+        other = renderer.submit_animation([[[6, 6, 6]] * 64])
+        while not running.running():
+            time.sleep(0.001)
+        assert renderer.cancel('message') == 2
+        assert running.result(timeout=5) is False and waiting.cancelled()
+        assert command.result(timeout=5) is None and other.result(timeout=5) is True and calls == ['clear']
+        assert sense.pixels == [[6, 6, 6]] * 64
+
+        renderer.stop(timeout=5)
+        assert not renderer.is_running()
+        print('... done')
+
+
+def Benchmark_Renderer(do_test=True, fps=25, seconds=2):
+    '''
+    Frame pacing: how exactly the render thread keeps the target FPS.
+    '''
+    if do_test:
+        print('Benchmark_Renderer()....')
+        sense = _FrameRecorder()
+        renderer = Renderer(sense, fps=fps)
+        frames = [[[i % 256, 0, 0]] * 64 for i in range(int(fps * seconds))]
+        start = time.monotonic()
+        renderer.submit_animation(frames).result()
+        duration = time.monotonic() - start
+        print(f'     target {fps} fps: {len(frames) / duration:6.1f} fps  {renderer.statistics}')
+        renderer.stop()
+        print('... done')
+
+
+if __name__ == '__main__':
+    Test_Renderer(True)
+    Benchmark_Renderer(True)
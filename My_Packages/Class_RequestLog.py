@@ -0,0 +1,168 @@
+#!/usr/bin/python3
+
+# ------------------------------------------------------------------
+# Name  : Class_RequestLog.py
+# Source: https://raw.githubusercontent.com/walter-rothlin/RaspberryPi4PiPlates/refs/heads/main/My_Packages/Class_RequestLog.py
+#
+# Description: Request log with a fixed capacity for the Flask web applications
+#              The newest capacity entries (id, timestamp, message) are kept in a ring buffer, older ones are
+#              dropped or, with spill_file, written to a rotating log file. The template only renders the newest
+#              display_size entries:
+#
+#                  request_log = RequestLog(capacity=1000, display_size=50, spill_file='request_log.txt')
+#                  request_log.append('get_status()')
+#                  {% for entry in request_log.newest() %}{{ entry }}{% endfor %}     (Jinja template)
+#
+# Autor: Walter Rothlin
+#
+# History:
+# 18-Oct-2026   Walter Rothlin      Initial Version
+# ------------------------------------------------------------------
+
+import logging
+import logging.handlers
+import threading
+from collections import deque
+from datetime import datetime
+
+TIME_FORMAT = '%d-%m-%y %H:%M:%S'
+
+
+class RequestLog:
+    '''
+    Ring buffer of timestamped log entries, thread safe.
+    '''
+
+    # Initializer and setter/Getter and Properties
+    # ============================================
+    def __init__(self, capacity=1000, display_size=50, spill_file=None, max_bytes=1000000, backup_count=3):
+        '''
+        Constructor
+        :param capacity: number of entries kept in memory
+        :param display_size: number of entries returned by newest() (rendered in the template)
+        :param spill_file: None or a file, every entry is also written to it (rotating, see logging.handlers)
+        :param max_bytes: size of the spill file before it is rotated
+        :param backup_count: number of rotated spill files kept (spill_file.1 .. spill_file.n)
+        '''
+        self.__entries = deque(maxlen=capacity)  # (id, datetime, message)
+        self.__display_size = display_size
+        self.__next_id = 1
+        self.__lock = threading.Lock()
+        self.__spill = None
+        if spill_file is not None:
+            handler = logging.handlers.RotatingFileHandler(spill_file, maxBytes=max_bytes, backupCount=backup_count)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            self.__spill = logging.getLogger(f'RequestLog.{spill_file}')
+            self.__spill.setLevel(logging.INFO)
+            self.__spill.propagate = False
+            self.__spill.addHandler(handler)
+
+    def get_capacity(self):
+        return self.__entries.maxlen
+
+    capacity = property(get_capacity)
+
+    def get_display_size(self):
+        return self.__display_size
+
+    def set_display_size(self, display_size):
+        self.__display_size = display_size
+
+    display_size = property(get_display_size, set_display_size)
+
+    def get_last_id(self):
+        return self.__next_id - 1
+
+    last_id = property(get_last_id)
+
+    def __len__(self):
+        return len(self.__entries)
+
+    # Business Methods
+    # ================
+    def append(self, message):
+        '''
+        Adds an entry with the actual time.
+        :return: id of the entry
+        '''
+        timestamp = datetime.now()
+        with self.__lock:
+            entry_id = self.__next_id
+            self.__next_id += 1
+            self.__entries.append((entry_id, timestamp, str(message)))
+        if self.__spill is not None:
+            self.__spill.info(format_entry((entry_id, timestamp, message)))
+        return entry_id
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+    def newest(self, count=None):
+        '''
+        The newest entries formatted as text, oldest first (as the list was rendered before).
+        :param count: number of entries, default display_size
+        :return: list of str
+        '''
+        count = self.__display_size if count is None else count
+        with self.__lock:
+            start = max(len(self.__entries) - count, 0)
+            entries = [self.__entries[index] for index in range(start, len(self.__entries))]
+        return [format_entry(entry) for entry in entries]
+
+    def page(self, offset=0, limit=50, since_id=None):
+        '''
+        One page of entries for the JSON endpoint, newest first.
+        :param offset: number of newest entries to skip
+        :param limit: maximal number of entries
+        :param since_id: only entries with a higher id (polling for new entries)
+        :return: dict with entries (id, time, message), total, capacity, last_id
+        '''
+        with self.__lock:
+            total = len(self.__entries)
+            entries = []
+            for index in range(total - 1 - offset, -1, -1):
+                entry = self.__entries[index]
+                if len(entries) >= limit or (since_id is not None and entry[0] <= since_id):
+                    break
+                entries.append(entry)
+            last_id = self.__next_id - 1
+        return {'entries': [{'id': entry_id, 'time': timestamp.strftime(TIME_FORMAT), 'message': message}
+                            for entry_id, timestamp, message in entries],
+                'offset': offset,
+                'limit': limit,
+                'total': total,
+                'capacity': self.capacity,
+                'last_id': last_id}
+
+
+def format_entry(entry):
+    entry_id, timestamp, message = entry
+    return f'{timestamp.strftime(TIME_FORMAT)}: {message}'
+
+
+# Tests
+# =====
+def Test_RequestLog(do_test=True, spill_file='/tmp/request_log_test.txt'):
+    if do_test:
+        print('Test_RequestLog()....', end='')
+        log = RequestLog(capacity=10, display_size=3)
+        for i in range(25):
+            log.append(f'request {i}')
+        assert len(log) == 10 and log.last_id == 25
+        assert [entry.split(': ')[1] for entry in log.newest()] == ['request 22', 'request 23', 'request 24']
+        page = log.page(offset=2, limit=4)
+        assert [entry['id'] for entry in page['entries']] == [23, 22, 21, 20]
+        assert [entry['id'] for entry in log.page(since_id=22)['entries']] == [25, 24, 23]
+        assert log.page(offset=9, limit=5)['entries'][0]['message'] == 'request 15'
+
+        log = RequestLog(capacity=2, spill_file=spill_file, max_bytes=200, backup_count=1)
+        for i in range(20):
+            log.append(f'spilled {i}')
+        with open(spill_file) as file:
+            assert file.read().splitlines()[-1].endswith('spilled 19')
+        print('... done')
+
+
+if __name__ == '__main__':
+    Test_RequestLog(True)
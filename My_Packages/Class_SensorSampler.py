@@ -0,0 +1,203 @@
+#!/usr/bin/python3
+
+# ------------------------------------------------------------------
+# Name  : Class_SensorSampler.py
+# Source: https://raw.githubusercontent.com/walter-rothlin/RaspberryPi4PiPlates/refs/heads/main/My_Packages/Class_SensorSampler.py
+#
+# Description: Background sampling of the Sense HAT environment sensors (temperature, humidity, pressure)
+#              A daemon thread reads all sensors at a fixed rate and publishes an immutable snapshot.
+#              Readers get the latest snapshot without a lock (one reference read) and without I2C traffic.
+#              get_snapshot(max_age) reads the sensors again only if the snapshot is older than max_age:
+#
+#                  sampler = SensorSampler(sense, interval=2.0)
+#                  snapshot = sampler.get_snapshot(max_age=0.5)
+#                  print(snapshot.temperature, snapshot.age)
+#
+# Autor: Walter Rothlin
+#
+# History:
+# 18-Oct-2026   Walter Rothlin      Initial Version
+# 18-Oct-2026   Walter Rothlin      Listeners for new snapshots (e.g. Server-Sent Events)
+# 18-Oct-2026   Walter Rothlin      bus_lock: one lock shared with the other I2C users (e.g. SenseHatIMUSource)
+# ------------------------------------------------------------------
+
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+
+class SensorSnapshot(namedtuple('SensorSnapshot', ['temperature', 'humidity', 'pressure', 'timestamp', 'read_at'])):
+    '''
+    Sensor values of one sampling. timestamp is time.monotonic() (for the age), read_at the wall clock time.
+    '''
+    __slots__ = ()
+
+    @property
+    def age(self):
+        return time.monotonic() - self.timestamp
+
+    def as_dict(self):
+        return {'temperature': self.temperature,
+                'humidity': self.humidity,
+                'pressure': self.pressure,
+                'read_at': self.read_at.strftime('%d-%m-%y %H:%M:%S'),
+                'age': round(self.age, 3)}
+
+
+class SensorSampler:
+    '''
+    Reads the sensors of a SenseHat in a daemon thread every interval seconds.
+    Fresh reads on request (max_age) are rate limited to one per min_read_interval seconds.
+    '''
+
+    # Initializer and setter/Getter and Properties
+    # ============================================
+    def __init__(self, sense, interval=1.0, min_read_interval=0.1, bus_lock=None, start=True):
+        '''
+        Constructor
+        :param sense: SenseHat or MySenseHat (get_temperature(), get_humidity(), get_pressure())
+        :param interval: seconds between two background samplings
+        :param min_read_interval: minimal seconds between two sensor reads, also for max_age requests
+        :param bus_lock: lock held while reading the sensors, shared with every other thread which talks to the
+                         Sense HAT over I2C (e.g. SenseHatIMUSource). None = a lock of its own: then only the
+                         sensor reads of this sampler are serialized.
+        '''
+        self.__sense = sense
+        self.__interval = interval
+        self.__min_read_interval = min_read_interval
+        self.__read_lock = bus_lock if bus_lock is not None else threading.Lock()  # readers of the snapshot need no lock
+        self.__stop_event = threading.Event()
+        self.__reads = 0
+        self.__snapshot = None
+        self.__listeners = []
+        self.__thread = threading.Thread(target=self.__run, name='SensorSampler', daemon=True)
+        if start:
+            self.__thread.start()
+
+    def get_interval(self):
+        return self.__interval
+
+    def set_interval(self, interval):
+        self.__interval = interval
+
+    interval = property(get_interval, set_interval)
+
+    def get_reads(self):
+        '''
+        :return: number of sensor reads (each reads all sensors once)
+        '''
+        return self.__reads
+
+    reads = property(get_reads)
+
+    def add_listener(self, listener):
+        '''
+        :param listener: function(snapshot), called in the reading thread after every sensor read
+        '''
+        self.__listeners.append(listener)
+
+    # Business Methods
+    # ================
+    def get_snapshot(self, max_age=None):
+        '''
+        Returns the latest snapshot. The sensors are read only if there is none yet or it is older than max_age.
+        :param max_age: seconds, None = any age
+        :return: SensorSnapshot
+        '''
+        snapshot = self.__snapshot
+        if snapshot is None or (max_age is not None and snapshot.age > max_age):
+            snapshot = self.refresh(max_age)
+        return snapshot
+
+    def refresh(self, max_age=None):
+        '''
+        Reads all sensors now, unless another thread did it while waiting for the bus (or within min_read_interval).
+        :return: SensorSnapshot
+        '''
+        with self.__read_lock:
+            snapshot = self.__snapshot
+            if snapshot is not None:
+                limit = max(max_age if max_age is not None else 0, self.__min_read_interval)
+                if snapshot.age <= limit:
+                    return snapshot
+            snapshot = SensorSnapshot(temperature=self.__sense.get_temperature(),
+                                      humidity=self.__sense.get_humidity(),
+                                      pressure=self.__sense.get_pressure(),
+                                      timestamp=time.monotonic(),
+                                      read_at=datetime.now())
+            self.__reads += 1
+            self.__snapshot = snapshot  # publish: one reference assignment
+        for listener in self.__listeners:
+            listener(snapshot)
+        return snapshot
+
+    def stop(self, timeout=None):
+        self.__stop_event.set()
+        if self.__thread.is_alive():
+            self.__thread.join(timeout)
+
+    def __run(self):
+        while not self.__stop_event.is_set():
+            try:
+                self.refresh()
+            except Exception as exception:
+                print(f'SensorSampler: {exception}')
+            self.__stop_event.wait(self.__interval)
+
+
+# Tests
+# =====
+class _CountingSensors:
+    def __init__(self):
+        self.reads = 0
+
+    def get_temperature(self):
+        self.reads += 1
+        return 21.5
+
+    def get_humidity(self):
+        return 45.0
+
+    def get_pressure(self):
+        return 1013.2
+
+
+def Test_SensorSampler(do_test=True):
+    if do_test:
+        print('Test_SensorSampler()....', end='')
+        sensors = _CountingSensors()
+        sampler = SensorSampler(sensors, interval=60, min_read_interval=0.05, start=False)
+        snapshot = sampler.get_snapshot()
+        assert snapshot.temperature == 21.5 and sensors.reads == 1
+        for _ in range(100):
+            assert sampler.get_snapshot() is snapshot
+        assert sampler.get_snapshot(max_age=0) is snapshot and sensors.reads == 1  # rate limited
+        time.sleep(0.06)
+        assert sampler.get_snapshot(max_age=0.01) is not snapshot and sensors.reads == 2
+        published = []
+        sampler.add_listener(published.append)
+        time.sleep(0.06)
+        assert sampler.get_snapshot(max_age=0.01) is published[-1]
+        assert set(sampler.get_snapshot().as_dict()) == {'temperature', 'humidity', 'pressure', 'read_at', 'age'}
+
+        bus_lock = threading.Lock()
+        sampler = SensorSampler(sensors, interval=60, min_read_interval=0, bus_lock=bus_lock, start=False)
+        reads = sensors.reads
+        with bus_lock:  # another I2C user is reading: the sampler waits
+            reader = threading.Thread(target=sampler.refresh)
+            reader.start()
+            reader.join(0.05)
+            assert reader.is_alive() and sensors.reads == reads
+        reader.join(1)
+        assert sensors.reads == reads + 1
+
+        sampler = SensorSampler(sensors, interval=0.01, min_read_interval=0)
+        time.sleep(0.1)
+        sampler.stop(timeout=1)
+        assert sampler.reads > 1
+        print('... done')
+
+
+if __name__ == '__main__':
+    Test_SensorSampler(True)
@@ -0,0 +1,241 @@
+#!/usr/bin/python3
+
+# ------------------------------------------------------------------
+# Name  : Class_SpriteAtlas.py
+# Source: https://raw.githubusercontent.com/walter-rothlin/RaspberryPi4PiPlates/refs/heads/main/My_Packages/Class_SpriteAtlas.py
+#
+# Description: Precompiled 8x8 sprites and font glyphs for the LED-Matrix
+#              A sprite is compiled once into 64 palette indices. The frames (pixel list and packed RGB565)
+#              are built once per palette and then reused: recoloring is a palette swap, drawing is one
+#              set_pixels() call.
+#
+#                  atlas = SpriteAtlas()
+#                  atlas.add_sprite('arrow', ['___XX___',
+#                                             '__XXXX__',
+#                                             ...], legend='_X')
+#                  atlas.blit(sense, 'arrow', palette=[black, yellow])
+#
+# Autor: Walter Rothlin
+#
+# History:
+# 18-Oct-2026   Walter Rothlin      Initial Version
+# 18-Oct-2026   Walter Rothlin      blit() writes packed RGB565 frames to a FramebufferDevice
+# ------------------------------------------------------------------
+
+import os
+import pickle
+import struct
+
+ATLAS_CACHE_VERSION = 1
+
+
+def pack_rgb565(pixel):
+    '''
+    Packs (r, g, b) into the 16 bit format of the Sense HAT framebuffer (same as SenseHat._pack_bin()).
+    :return: bytes (2)
+    '''
+    r = (pixel[0] >> 3) & 0x1F
+    g = (pixel[1] >> 2) & 0x3F
+    b = (pixel[2] >> 3) & 0x1F
+    return struct.pack('H', (r << 11) + (g << 5) + b)
+
+
+def rotate_frame_left(frame):
+    '''
+    Turns a frame of 64 pixels by 90 degrees, as used to turn the (rotated) SenseHat font glyphs upright.
+    '''
+    return [frame[col * 8 + 7 - row] for row in range(8) for col in range(8)]
+
+
+class SpriteAtlas:
+    '''
+    Named 8x8 bitmaps (sprites and font glyphs) compiled into palette indices, with a frame cache per palette.
+    '''
+
+    # Initializer and setter/Getter and Properties
+    # ============================================
+    def __init__(self, cache_file=None):
+        '''
+        Constructor
+        :param cache_file: optional file for the compiled atlas. If it exists it is loaded, save() writes it.
+        '''
+        self.__bitmaps = {}          # name --> bytes with 64 palette indices
+        self.__default_palettes = {}  # name --> tuple of colours
+        self.__pixel_cache = {}      # (name, palette) --> list of 64 [r, g, b]
+        self.__rgb565_cache = {}     # (name, palette) --> bytes (128)
+        self.__cache_file = cache_file
+        if cache_file is not None and os.path.exists(cache_file):
+            self.load(cache_file)
+
+    def get_names(self):
+        return list(self.__bitmaps.keys())
+
+    names = property(get_names)
+
+    def __contains__(self, name):
+        return name in self.__bitmaps
+
+    # Compiling
+    # =========
+    def add_sprite(self, name, rows, legend='_X', palette=((0, 0, 0), (255, 255, 255))):
+        '''
+        Compiles a sprite given as 8 strings of 8 characters.
+        :param name: name of the sprite
+        :param rows: 8 strings, each character is looked up in the legend
+        :param legend: the position of a character in the legend is its palette index ('_X': '_' = 0, 'X' = 1)
+        :param palette: default colours for the palette indices
+        :return: None
+        '''
+        if len(rows) != 8 or any(len(row) != 8 for row in rows):
+            raise ValueError(f'Sprite {name} must have 8 rows with 8 characters')
+        try:
+            indices = bytes(legend.index(char) for row in rows for char in row)
+        except ValueError:
+            raise ValueError(f'Sprite {name} contains a character which is not in the legend "{legend}"')
+        self.add_bitmap(name, indices, palette)
+
+    def add_bitmap(self, name, indices, palette=((0, 0, 0), (255, 255, 255))):
+        '''
+        Adds an already compiled bitmap (64 palette indices).
+        '''
+        if len(indices) != 64:
+            raise ValueError(f'Bitmap {name} must have 64 palette indices')
+        self.__bitmaps[name] = bytes(indices)
+        self.__default_palettes[name] = tuple(tuple(colour) for colour in palette)
+        self.__invalidate(name)
+
+    def add_glyphs_from_sense_hat(self, sense, characters=None, prefix='char_'):
+        '''
+        Compiles the font glyphs of the SenseHat (as used by show_letter()) into sprites named prefix + character.
+        The glyphs are read from the SenseHat text assets and turned upright.
+        :param sense: SenseHat (or MySenseHat) instance
+        :param characters: characters to compile, default all characters of the SenseHat font
+        :return: None
+        '''
+        text_dict = sense._text_dict  # loaded by SenseHat.__init__() from sense_hat_text.png
+        if characters is None:
+            characters = text_dict.keys()
+        white = [255, 255, 255]
+        for char in characters:
+            if char not in text_dict:
+                continue
+            # show_letter() layout: 8 empty pixels, 40 glyph pixels, 16 empty pixels, drawn with rotation - 90
+            frame = [0] * 8 + [1 if list(pixel) == white else 0 for pixel in text_dict[char]] + [0] * 16
+            self.add_bitmap(prefix + char, rotate_frame_left(frame))
+
+    def __invalidate(self, name):
+        for cache in (self.__pixel_cache, self.__rgb565_cache):
+            for key in [key for key in cache if key[0] == name]:
+                del cache[key]
+
+    def __palette_key(self, name, palette):
+        if name not in self.__bitmaps:
+            raise KeyError(f'Unknown sprite: {name}')
+        if palette is None:
+            return self.__default_palettes[name]
+        return tuple(tuple(colour) for colour in palette)
+
+    # Frames
+    # ======
+    def get_pixels(self, name, palette=None):
+        '''
+        Returns the sprite as pixel list for set_pixels(). Built once per palette, do not modify the list.
+        :param palette: colours for the palette indices, default the palette given with add_sprite()
+        :return: list of 64 [r, g, b]
+        '''
+        palette = self.__palette_key(name, palette)
+        key = (name, palette)
+        pixels = self.__pixel_cache.get(key)
+        if pixels is None:
+            colours = [list(colour) for colour in palette]
+            pixels = [colours[index] for index in self.__bitmaps[name]]
+            self.__pixel_cache[key] = pixels
+        return pixels
+
+    def get_rgb565(self, name, palette=None):
+        '''
+        Returns the sprite packed as RGB565 (128 bytes, row by row), built once per palette.
+        :return: bytes
+        '''
+        palette = self.__palette_key(name, palette)
+        key = (name, palette)
+        packed = self.__rgb565_cache.get(key)
+        if packed is None:
+            packed_colours = [pack_rgb565(colour) for colour in palette]
+            packed = b''.join(packed_colours[index] for index in self.__bitmaps[name])
+            self.__rgb565_cache[key] = packed
+        return packed
+
+    def blit(self, sense, name, palette=None):
+        '''
+        Draws the sprite with one single write to the LED-Matrix.
+        A MySenseHat with a memory mapped FramebufferDevice gets the packed RGB565 frame.
+        :param sense: SenseHat, MySenseHat or any object with set_pixels()
+        :return: None
+        '''
+        if getattr(sense, 'framebuffer_device', None) is not None:
+            sense.write_rgb565(self.get_rgb565(name, palette))
+        else:
+            sense.set_pixels(self.get_pixels(name, palette))
+
+    # Disk cache
+    # ==========
+    def save(self, cache_file=None):
+        '''
+        Writes the compiled bitmaps and the packed RGB565 frames to the cache file.
+        '''
+        cache_file = cache_file or self.__cache_file
+        if cache_file is None:
+            raise ValueError('No cache file given')
+        data = {'version': ATLAS_CACHE_VERSION,
+                'bitmaps': self.__bitmaps,
+                'palettes': self.__default_palettes,
+                'rgb565': self.__rgb565_cache}
+        temp_file = cache_file + '.tmp'
+        with open(temp_file, 'wb') as file:
+            pickle.dump(data, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, cache_file)
+
+    def load(self, cache_file=None):
+        '''
+        Loads a cache file written by save(). A cache file of another version is ignored.
+        :return: True if loaded
+        '''
+        cache_file = cache_file or self.__cache_file
+        try:
+            with open(cache_file, 'rb') as file:
+                data = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return False
+        if data.get('version') != ATLAS_CACHE_VERSION:
+            return False
+        self.__bitmaps.update(data['bitmaps'])
+        self.__default_palettes.update(data['palettes'])
+        self.__rgb565_cache.update(data['rgb565'])
+        return True
+
+
+def Test_SpriteAtlas(do_test=True):
+    if do_test:
+        print('Test_SpriteAtlas()....', end='')
+        atlas = SpriteAtlas()
+        atlas.add_sprite('frame', ['XXXXXXXX',
+                                   'X______X',
+                                   'X______X',
+                                   'X__YY__X',
+                                   'X__YY__X',
+                                   'X______X',
+                                   'X______X',
+                                   'XXXXXXXX'], legend='_XY', palette=[(0, 0, 0), (255, 0, 0), (0, 0, 255)])
+        pixels = atlas.get_pixels('frame')
+        assert pixels[0] == [255, 0, 0] and pixels[9] == [0, 0, 0] and pixels[27] == [0, 0, 255]
+        assert atlas.get_pixels('frame') is pixels
+        green = atlas.get_pixels('frame', palette=[(0, 0, 0), (0, 255, 0), (0, 0, 255)])
+        assert green[0] == [0, 255, 0]
+        assert len(atlas.get_rgb565('frame')) == 128
+        assert atlas.get_rgb565('frame')[0:2] == pack_rgb565((255, 0, 0))
+        print('... done')
+
+
+if __name__ == '__main__':
+    Test_SpriteAtlas(True)
@@ -0,0 +1,292 @@
+#!/usr/bin/python3
+
+# ------------------------------------------------------------------
+# Name  : Class_TextScroller.py
+# Source: https://raw.githubusercontent.com/walter-rothlin/RaspberryPi4PiPlates/refs/heads/main/My_Packages/Class_TextScroller.py
+#
+# Description: Pre-rendered scrolling text for the LED-Matrix (replacement for SenseHat.show_message())
+#              The whole scroll sequence of a text is rendered once into packed RGB565 frames (128 bytes each) and kept
+#              in a LRU cache with a byte budget. Showing the same IP/date/status text again costs no rendering.
+#              The frames are played by the Renderer (own thread, paced, cancellable in the middle of the text):
+#
+#                  scroller = TextScroller(sense)
+#                  scroller.show_message('192.168.1.10', scroll_speed=0.08, text_colour=[0, 0, 255])  # waits
+#                  scroller.show_message('Hallo', blocking=False)                                     # returns
+#                  scroller.cancel()
+#
+# Autor: Walter Rothlin
+#
+# History:
+# 18-Oct-2026   Walter Rothlin      Initial Version
+# 18-Oct-2026   Walter Rothlin      cancel() stops only the scrolling texts (MESSAGE_KEY), not the other jobs of a shared Renderer
+# ------------------------------------------------------------------
+
+import threading
+import time
+from collections import OrderedDict
+from Class_SpriteAtlas import pack_rgb565, rotate_frame_left
+from Class_Renderer import Renderer
+
+FRAME_BYTES = 128  # 64 pixels RGB565
+MESSAGE_KEY = 'message'  # cancel_key of the scrolling texts in the Renderer
+
+
+def _glyph_columns(text_dict, char):
+    '''
+    Glyph of a character as palette indices (1 = text), trimmed as SenseHat._trim_whitespace() does.
+    A glyph has 5 columns of 8 pixels (stored rotated, one column = 8 consecutive pixels).
+    '''
+    glyph = text_dict.get(char) if len(char) == 1 else None
+    if glyph is None:
+        glyph = text_dict['?']
+    indices = [1 if list(pixel) == [255, 255, 255] else 0 for pixel in glyph]
+    columns = [indices[i:i + 8] for i in range(0, len(indices), 8)]
+    if any(sum(pixel) for pixel in glyph):  # trimmed by pixel sum: any non black pixel counts
+        sums = [sum(sum(pixel) for pixel in glyph[i:i + 8]) for i in range(0, len(glyph), 8)]
+        while sums and sums[0] == 0:
+            del sums[0], columns[0]
+        while sums and sums[-1] == 0:
+            del sums[-1], columns[-1]
+    return columns
+
+
+def render_scroll_frames(text_dict, text_string, text_colour=(255, 255, 255), back_colour=(0, 0, 0)):
+    '''
+    Renders the frames of SenseHat.show_message() as packed RGB565, upright for the actual rotation
+    (show_message() draws with rotation - 90, the frames here are turned instead).
+    :param text_dict: font of the SenseHat (sense._text_dict)
+    :return: bytes, 128 bytes per frame
+    '''
+    strip = [0] * 64  # 8 empty columns before and after the text, 1 empty column after each letter
+    for char in text_string:
+        for column in _glyph_columns(text_dict, char):
+            strip.extend(column)
+        strip.extend([0] * 8)
+    strip.extend([0] * 64)
+    packed = (pack_rgb565(back_colour), pack_rgb565(text_colour))
+    frames = []
+    for i in range(len(strip) // 8 - 8):
+        frame = rotate_frame_left(strip[i * 8:i * 8 + 64])
+        frames.append(b''.join([packed[index] for index in frame]))
+    return b''.join(frames)
+
+
+class TextFrameCache:
+    '''
+    LRU cache of rendered scroll sequences, limited by the total number of bytes.
+    The key is (text, text_colour, back_colour). The rotation is not part of the key: the frames are upright and
+    set_pixels()/write_rgb565() apply the actual rotation, so one entry serves all rotations.
+    '''
+
+    # Initializer and setter/Getter and Properties
+    # ============================================
+    def __init__(self, text_dict, max_bytes=256 * 1024):
+        '''
+        Constructor
+        :param text_dict: font of the SenseHat (sense._text_dict)
+        :param max_bytes: byte budget for all cached sequences (a 20 character text needs about 15 kB)
+        '''
+        self.__text_dict = text_dict
+        self.__max_bytes = max_bytes
+        self.__entries = OrderedDict()  # key --> bytes
+        self.__bytes = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__lock = threading.Lock()
+
+    def get_statistics(self):
+        with self.__lock:
+            return {'entries': len(self.__entries), 'bytes': self.__bytes, 'max_bytes': self.__max_bytes,
+                    'hits': self.__hits, 'misses': self.__misses}
+
+    statistics = property(get_statistics)
+
+    # Business Methods
+    # ================
+    def get_frames(self, text_string, text_colour=(255, 255, 255), back_colour=(0, 0, 0)):
+        '''
+        :return: bytes with all frames of the scroll sequence (128 bytes per frame)
+        '''
+        key = (text_string, tuple(text_colour), tuple(back_colour))
+        with self.__lock:
+            frames = self.__entries.get(key)
+            if frames is not None:
+                self.__entries.move_to_end(key)
+                self.__hits += 1
+                return frames
+            self.__misses += 1
+        frames = render_scroll_frames(self.__text_dict, text_string, text_colour, back_colour)
+        with self.__lock:
+            if len(frames) <= self.__max_bytes and key not in self.__entries:
+                self.__entries[key] = frames
+                self.__bytes += len(frames)
+                while self.__bytes > self.__max_bytes:
+                    evicted_key, evicted = self.__entries.popitem(last=False)
+                    self.__bytes -= len(evicted)
+        return frames
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.__bytes = 0
+
+
+def iter_frames(frames):
+    '''
+    The single frames (memoryviews of 128 bytes) of a scroll sequence, e.g. for Renderer.submit_animation().
+    '''
+    view = memoryview(frames)
+    for start in range(0, len(view), FRAME_BYTES):
+        yield view[start:start + FRAME_BYTES]
+
+
+class TextScroller:
+    '''
+    show_message() with cached frames, played by a Renderer (non-blocking and cancellable).
+    '''
+    def __init__(self, sense, renderer=None, cache=None, max_bytes=256 * 1024):
+        '''
+        Constructor
+        :param sense: SenseHat or MySenseHat
+        :param renderer: Renderer which draws the frames, default an own Renderer
+        :param cache: TextFrameCache (e.g. shared), default an own cache with max_bytes
+        '''
+        self.__sense = sense
+        self.__renderer = renderer if renderer is not None else Renderer(sense)
+        self.__cache = cache if cache is not None else TextFrameCache(sense._text_dict, max_bytes)
+
+    def get_cache(self):
+        return self.__cache
+
+    cache = property(get_cache)
+
+    def get_renderer(self):
+        return self.__renderer
+
+    renderer = property(get_renderer)
+
+    def message_animation(self, text_string, text_colour=(255, 255, 255), back_colour=(0, 0, 0)):
+        '''
+        Generator of the frames, for Renderer.submit_animation(). Rendering (or the cache lookup) happens in the render thread.
+        '''
+        yield from iter_frames(self.__cache.get_frames(text_string, text_colour, back_colour))
+
+    def submit_message(self, text_string, scroll_speed=.1, text_colour=(255, 255, 255), back_colour=(0, 0, 0), timeout=None):
+        '''
+        Queues the scrolling text in the Renderer, cancel() stops it.
+        :param timeout: seconds to wait for a place in a full queue (queue.Full), 0: don't wait
+        :return: Future (done when the text has been shown, cancelled/False if cancelled)
+        '''
+        return self.__renderer.submit_animation(self.message_animation(text_string, text_colour, back_colour),
+                                                frame_time=scroll_speed, timeout=timeout, cancel_key=MESSAGE_KEY)
+
+    def show_message(self, text_string, scroll_speed=.1, text_colour=(255, 255, 255), back_colour=(0, 0, 0), blocking=True):
+        '''
+        Same parameters as SenseHat.show_message().
+        :param blocking: True: returns when the text has been scrolled through, False: returns at once
+        :return: Future (done when the text has been shown, cancelled/False if cancelled)
+        '''
+        future = self.submit_message(text_string, scroll_speed, text_colour, back_colour)
+        if blocking:
+            future.result()
+        return future
+
+    def cancel(self):
+        '''
+        Stops the scrolling text in the middle and drops the waiting ones. Other jobs of the Renderer are not touched.
+        :return: number of cancelled texts
+        '''
+        return self.__renderer.cancel(MESSAGE_KEY)
+
+
+# Tests and Benchmark
+# ===================
+def _test_font():
+    font = {}
+    for code in range(32, 127):
+        glyph = [[255, 255, 255] if (code >> (i % 7)) & 1 and 8 <= i < 32 else [0, 0, 0] for i in range(40)]
+        font[chr(code)] = glyph
+    font[' '] = [[0, 0, 0]] * 40
+    return font
+
+
+def _reference_show_message_frames(text_dict, text_string, text_colour, back_colour):
+    # SenseHat.show_message() (sense_hat 2.6.0) without set_pixels()/sleep: the frames drawn with rotation - 90
+    def trim_whitespace(char):
+        psum = lambda x: sum(sum(x, []))
+        if psum(char) > 0:
+            is_empty = True
+            while is_empty:
+                row = char[0:8]
+                is_empty = psum(row) == 0
+                if is_empty:
+                    del char[0:8]
+            is_empty = True
+            while is_empty:
+                row = char[-8:]
+                is_empty = psum(row) == 0
+                if is_empty:
+                    del char[-8:]
+        return char
+    dummy_colour = [None, None, None]
+    scroll_pixels = [dummy_colour] * 64
+    for s in text_string:
+        char = list(text_dict[s]) if len(s) == 1 and s in text_dict else list(text_dict['?'])
+        scroll_pixels.extend(trim_whitespace(char))
+        scroll_pixels.extend([dummy_colour] * 8)
+    scroll_pixels.extend([dummy_colour] * 64)
+    coloured_pixels = [text_colour if pixel == [255, 255, 255] else back_colour for pixel in scroll_pixels]
+    return [coloured_pixels[i * 8:i * 8 + 64] for i in range(len(coloured_pixels) // 8 - 8)]
+
+
+def Test_TextScroller(do_test=True):
+    if do_test:
+        print('Test_TextScroller()....', end='')
+        from Class_FramebufferDevice import PIX_MAPS
+        font = _test_font()
+        text, text_colour, back_colour = 'Hi 1.2!', [0, 0, 248], [8, 0, 0]
+        frames = render_scroll_frames(font, text + 'ü', text_colour, back_colour)  # unknown character --> '?'
+        reference = _reference_show_message_frames(font, text + 'ü', text_colour, back_colour)
+        assert len(frames) == len(reference) * FRAME_BYTES
+        for rotation in (0, 90, 180, 270):
+            # same physical LEDs: reference frame with rotation - 90, packed frame with rotation
+            for frame, expected in zip(iter_frames(frames), reference):
+                physical = [None] * 64
+                for index, pixel in enumerate(expected):
+                    physical[PIX_MAPS[(rotation - 90) % 360][index]] = pack_rgb565(pixel)
+                packed = [bytes(frame[i * 2:i * 2 + 2]) for i in range(64)]
+                for index in range(64):
+                    assert physical[PIX_MAPS[rotation][index]] == packed[index]
+
+        cache = TextFrameCache(font, max_bytes=len(frames) * 2)
+        first = cache.get_frames(text + 'ü', text_colour, back_colour)
+        assert cache.get_frames(text + 'ü', text_colour, back_colour) is first
+        cache.get_frames('other text', text_colour, back_colour)
+        cache.get_frames('third text', text_colour, back_colour)
+        statistics = cache.statistics
+        assert statistics['hits'] == 1 and statistics['bytes'] <= statistics['max_bytes'] and statistics['entries'] < 3
+        print('... done')
+
+
+def Benchmark_TextScroller(do_test=True, count=200):
+    if do_test:
+        print('Benchmark_TextScroller()....')
+        font = _test_font()
+        cache = TextFrameCache(font)
+        text = 'IP: 192.168.86.138  18-10-26 12:00'
+        show_message = lambda: [b''.join(pack_rgb565(pixel) for pixel in frame)
+                                for frame in _reference_show_message_frames(font, text, [0, 0, 255], [0, 0, 0])]
+        for name, function in (('show_message() + pack', show_message),
+                               ('render_scroll_frames ', lambda: render_scroll_frames(font, text, [0, 0, 255], [0, 0, 0])),
+                               ('TextFrameCache       ', lambda: cache.get_frames(text, [0, 0, 255], [0, 0, 0]))):
+            start = time.perf_counter()
+            for _ in range(count):
+                function()
+            print(f'     {name}: {(time.perf_counter() - start) / count * 1000:8.3f} ms per message')
+        print(f'     {cache.statistics}')
+        print('... done')
+
+
+if __name__ == '__main__':
+    Test_TextScroller(True)
+    Benchmark_TextScroller(True)
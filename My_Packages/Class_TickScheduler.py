@@ -0,0 +1,479 @@
+#!/usr/bin/python3
+
+# ------------------------------------------------------------------
+# Name  : Class_TickScheduler.py
+# Source: https://raw.githubusercontent.com/walter-rothlin/RaspberryPi4PiPlates/refs/heads/main/My_Packages/Class_TickScheduler.py
+#
+# Description: Ticker for master clocks (e.g. Bahnhof_MutterUhr.py): calls a function on every wall-clock interval
+#              boundary (e.g. every minute at :00)
+#
+#                  scheduler = TickScheduler(switchGPIO, interval_seconds=60)
+#                  print(scheduler.statistics['jitter_ms'])
+#
+#              The waiting is done on the monotonic clock (time.monotonic_ns), which is neither slewed by NTP nor
+#              set by the user. The wall-clock is only used to find the boundaries: wall = monotonic + offset, the
+#              offset is measured again on every wake up. A small change of the offset (NTP slew) just moves the
+#              next deadline, a big change (clock set, NTP step after boot) is counted as clock step:
+#                  - forward:  the ticks which fell into the gap are counted as missed, not fired at once
+#                              (caught up with catch_up_missed, or handed to missed_func, e.g. to reduce them mod 12h)
+#                  - backward: the next tick stays the one after the last fired tick, the clock holds
+#              Every tick records its distance to the boundary (jitter) in a histogram.
+#
+#              Catch-up: correction pulses (e.g. to set the slave clock) are queued with catch_up(count) and sent by
+#              the same thread, not faster than pulse_interval (what the slave clock can follow). Regular ticks which
+#              fall due meanwhile are merged into the queue, so there are never two pulses closer than pulse_interval:
+#
+#                  scheduler = TickScheduler(meine_aktion, 60, pulse_func=switchGPIO, pulse_interval=1.0)
+#                  scheduler.catch_up(42)            # returns immediately
+#                  print(scheduler.catch_up_status)  # progress and ETA
+#
+# Autor: Walter Rothlin
+#
+# History:
+# 18-Oct-2026   Walter Rothlin      Initial Version
+# 18-Oct-2026   Walter Rothlin      Catch-up: correction pulses on the ticker thread, merged with the regular ticks
+# 18-Oct-2026   Walter Rothlin      SystemClock.now()/sleep(), so programs can use the clock of the scheduler (VirtualClock)
+# 18-Oct-2026   Walter Rothlin      Test_TickScheduler on a VirtualClock (deterministic, was flaky with real sleeps)
+# 18-Oct-2026   Walter Rothlin      missed_func: the program decides what to do with missed ticks, Test_catch_up on a VirtualClock
+# ------------------------------------------------------------------
+
+import threading
+import time
+from datetime import datetime, timedelta
+from Class_FlaskMetrics import Histogram
+
+NS_PER_SECOND = 1_000_000_000
+
+# upper bounds of the jitter histogram in seconds (absolute distance to the boundary)
+JITTER_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.5, 1.0)
+
+
+class SystemClock:
+    '''
+    The real clocks. Everything the TickScheduler needs from the time, so it can be replaced
+    (tests, simulation: Class_VirtualClock).
+    '''
+    def monotonic_ns(self):
+        return time.monotonic_ns()
+
+    def time_ns(self):
+        return time.time_ns()
+
+    def wait(self, event, timeout):
+        '''
+        :return: True if the event was set, False after the timeout
+        '''
+        return event.wait(timeout)
+
+    def now(self):
+        return datetime.now()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class TickScheduler:
+    '''
+    Calls func(*args, **kwargs) in an own thread on every interval boundary of the wall-clock.
+    '''
+
+    # Initializer and setter/Getter and Properties
+    # ============================================
+    def __init__(self, func, interval_seconds=60, args=(), kwargs=None, pulse_func=None, pulse_interval=1.0, catch_up_missed=True,
+                 missed_func=None, clock=None, step_threshold=0.5, max_wait=10.0, start=True):
+        '''
+        Constructor
+        :param func: function called on every tick
+        :param interval_seconds: distance of the ticks, the boundaries are multiples of it since the epoch
+        :param pulse_func: function called for every catch-up pulse (without arguments), default func
+        :param pulse_interval: shortest time in seconds between two pulses (ticks or catch-up pulses)
+        :param catch_up_missed: ticks missed by a forward clock step are caught up (otherwise only counted)
+        :param missed_func: function(missed) called on the ticker thread with the number of ticks missed by a forward
+                            clock step, before the next tick (e.g. with catch_up_missed=False: catch_up() less pulses)
+        :param clock: SystemClock (default) or a replacement with monotonic_ns(), time_ns() and wait(event, timeout)
+        :param step_threshold: seconds the wall-clock has to jump to count as clock step (smaller changes: slew)
+        :param max_wait: longest single wait in seconds, a clock step is detected at the latest after this time
+        :param start: start the thread
+        '''
+        self.__func = func
+        self.__interval_ns = int(interval_seconds * NS_PER_SECOND)
+        self.__args = args
+        self.__kwargs = kwargs or {}
+        self.__pulse_func = pulse_func
+        self.__pulse_interval_ns = int(pulse_interval * NS_PER_SECOND)
+        self.__catch_up_missed = catch_up_missed
+        self.__missed_func = missed_func
+        self.__clock = clock or SystemClock()
+        self.__step_threshold_ns = int(step_threshold * NS_PER_SECOND)
+        self.__max_wait = max_wait
+        self.__stop_event = threading.Event()
+        self.__wake_event = threading.Event()  # stop() or catch_up()
+        self.__lock = threading.Lock()
+        self.__offset_ns = None   # wall-clock - monotonic clock
+        self.__target_ns = None   # wall-clock time of the next tick
+        self.__last_tick_ns = None
+        self.__last_pulse_ns = None  # monotonic time of the last pulse (tick or catch-up)
+        self.__last_catch_up_ns = None  # monotonic time of the last catch-up pulse
+        self.__pending_pulses = 0    # catch-up pulses to send
+        self.__pending_ticks = 0     # regular ticks merged into the catch-up
+        self.__catch_up_total = 0
+        self.__catch_up_done = 0
+        self.__ticks = 0
+        self.__merged_ticks = 0
+        self.__pulses = 0
+        self.__missed_ticks = 0
+        self.__clock_steps = 0
+        self.__errors = 0
+        self.__histogram = Histogram(JITTER_BUCKETS)
+        self.__jitter_last = None
+        self.__jitter_min = None
+        self.__jitter_max = None
+        self.__thread = threading.Thread(target=self.run, name='TickScheduler', daemon=True)
+        if start:
+            self.__thread.start()
+
+    def get_interval_seconds(self):
+        return self.__interval_ns / NS_PER_SECOND
+
+    interval_seconds = property(get_interval_seconds)
+
+    def get_stop_event(self):
+        return self.__stop_event
+
+    stop_event = property(get_stop_event)
+
+    def get_next_tick(self):
+        '''
+        :return: datetime (local time) of the next tick, None before the start
+        '''
+        target_ns = self.__target_ns
+        return None if target_ns is None else datetime.fromtimestamp(target_ns / NS_PER_SECOND)
+
+    next_tick = property(get_next_tick)
+
+    def get_last_tick(self):
+        last_tick_ns = self.__last_tick_ns
+        return None if last_tick_ns is None else datetime.fromtimestamp(last_tick_ns / NS_PER_SECOND)
+
+    last_tick = property(get_last_tick)
+
+    def get_statistics(self):
+        '''
+        :return: dict with counters and the jitter in ms (signed: positive = late),
+                 histogram: cumulative counts of |jitter| <= le (ms), as in the Prometheus format
+        '''
+        to_ms = lambda value_ns: None if value_ns is None else round(value_ns / 1_000_000, 3)
+        with self.__lock:
+            histogram = self.__histogram
+            return {'ticks': self.__ticks,
+                    'merged_ticks': self.__merged_ticks,
+                    'catch_up_pulses': self.__pulses,
+                    'missed_ticks': self.__missed_ticks,
+                    'clock_steps': self.__clock_steps,
+                    'errors': self.__errors,
+                    'jitter_ms': {'last': to_ms(self.__jitter_last),
+                                  'min': to_ms(self.__jitter_min),
+                                  'max': to_ms(self.__jitter_max),
+                                  'mean_abs': round(histogram.sum / histogram.count * 1000, 3) if histogram.count else None,
+                                  'histogram': {('+Inf' if le == '+Inf' else f'{le * 1000:g}'): count
+                                                for le, count in histogram.cumulative()}}}
+
+    statistics = property(get_statistics)
+
+    def get_catch_up_status(self):
+        '''
+        :return: dict with the progress of the catch-up, the ETA counts the regular ticks which will be merged
+        '''
+        with self.__lock:
+            pending = self.__pending_pulses + self.__pending_ticks
+            total = self.__catch_up_total
+            done = self.__catch_up_done
+        pulse_seconds = self.__pulse_interval_ns / NS_PER_SECOND
+        if pulse_seconds < self.interval_seconds:
+            eta_seconds = pending * pulse_seconds / (1 - pulse_seconds / self.interval_seconds)
+            eta = datetime.fromtimestamp(self.__clock.time_ns() / NS_PER_SECOND) + timedelta(seconds=eta_seconds)
+        else:
+            eta_seconds = eta = None  # slower than the ticks: never finishes
+        return {'active': pending > 0,
+                'pending': pending,
+                'done': done,
+                'total': total,
+                'progress_percent': round(100 * done / total, 1) if total else 100.0,
+                'eta_seconds': None if eta_seconds is None else round(eta_seconds, 1),
+                'eta': None if eta is None else eta.strftime('%Y-%m-%d %H:%M:%S')}
+
+    catch_up_status = property(get_catch_up_status)
+
+    # Business Methods
+    # ================
+    def run(self):
+        '''
+        The tick loop, runs in the own thread (start=True) or in the caller (start=False).
+        '''
+        self.__offset_ns = self.__clock.time_ns() - self.__clock.monotonic_ns()
+        wall_ns = self.__clock.monotonic_ns() + self.__offset_ns
+        self.__target_ns = (wall_ns // self.__interval_ns + 1) * self.__interval_ns
+
+        while True:
+            if self.__wait_for_next():
+                return
+            monotonic_ns = self.__clock.monotonic_ns()
+            late_ns = monotonic_ns + self.__offset_ns - self.__target_ns
+            if late_ns >= 0:
+                self.__tick(late_ns, monotonic_ns)
+            else:
+                self.__pulse(monotonic_ns)
+
+    def catch_up(self, count):
+        '''
+        Queues count correction pulses, sent by the ticker thread with pulse_interval. Returns immediately.
+        '''
+        if count <= 0:
+            return
+        with self.__lock:
+            if self.__pending_pulses + self.__pending_ticks == 0:  # a new catch-up
+                self.__catch_up_total = 0
+                self.__catch_up_done = 0
+            self.__pending_pulses += count
+            self.__catch_up_total += count
+        self.__wake_event.set()
+
+    def cancel_catch_up(self):
+        '''
+        Drops the correction pulses not sent yet (merged regular ticks are still sent).
+        :return: number of dropped pulses
+        '''
+        with self.__lock:
+            dropped = self.__pending_pulses
+            self.__pending_pulses = 0
+            self.__catch_up_total -= dropped
+        return dropped
+
+    def stop(self, timeout=None):
+        self.__stop_event.set()
+        self.__wake_event.set()
+        if self.__thread.is_alive() and self.__thread is not threading.current_thread():
+            self.__thread.join(timeout)
+
+    def reset_statistics(self):
+        with self.__lock:
+            self.__ticks = 0
+            self.__missed_ticks = 0
+            self.__clock_steps = 0
+            self.__errors = 0
+            self.__merged_ticks = 0
+            self.__pulses = 0
+            self.__histogram = Histogram(JITTER_BUCKETS)
+            self.__jitter_last = self.__jitter_min = self.__jitter_max = None
+
+    # Internals
+    # =========
+    def __measure_offset(self):
+        '''
+        Measures wall-clock - monotonic clock and detects clock steps.
+        '''
+        offset_ns = self.__clock.time_ns() - self.__clock.monotonic_ns()
+        step_ns = offset_ns - self.__offset_ns
+        if abs(step_ns) > self.__step_threshold_ns:
+            with self.__lock:
+                self.__clock_steps += 1
+            print(f'TickScheduler: Uhrzeit um {step_ns / NS_PER_SECOND:+.3f}s verstellt')
+        self.__offset_ns = offset_ns
+
+    def __wait_for_next(self):
+        '''
+        Waits on the monotonic clock until the wall-clock reaches the next tick or the next catch-up pulse is due.
+        :return: True if stopped
+        '''
+        while True:
+            self.__wake_event.clear()
+            if self.__stop_event.is_set():
+                return True
+            self.__measure_offset()
+            monotonic_ns = self.__clock.monotonic_ns()
+            remaining_ns = self.__target_ns - (monotonic_ns + self.__offset_ns)
+            if self.__pending_pulses + self.__pending_ticks > 0:
+                pulse_ns = 0 if self.__last_pulse_ns is None else self.__last_pulse_ns + self.__pulse_interval_ns - monotonic_ns
+                remaining_ns = min(remaining_ns, pulse_ns)
+            if remaining_ns <= 0:
+                return False
+            self.__clock.wait(self.__wake_event, min(remaining_ns / NS_PER_SECOND, self.__max_wait))
+
+    def __tick(self, late_ns, monotonic_ns):
+        '''
+        A regular tick is due: fired, or merged into the catch-up (pulses pending or the last pulse too recent).
+        '''
+        if late_ns >= self.__interval_ns:
+            # forward clock step or the process was stopped: the lost ticks are not fired at once
+            missed = late_ns // self.__interval_ns
+            self.__target_ns += missed * self.__interval_ns
+            late_ns -= missed * self.__interval_ns
+            with self.__lock:
+                self.__missed_ticks += missed
+                if self.__catch_up_missed:
+                    if self.__pending_pulses + self.__pending_ticks == 0:
+                        self.__catch_up_total = self.__catch_up_done = 0
+                    self.__pending_ticks += missed
+                    self.__catch_up_total += missed
+            print(f'TickScheduler: {missed} Ticks verpasst')
+            if self.__missed_func is not None:
+                self.__call(self.__missed_func, missed)
+
+        with self.__lock:
+            self.__ticks += 1
+            merge = (self.__pending_pulses + self.__pending_ticks > 0 or
+                     (self.__last_catch_up_ns is not None and monotonic_ns - self.__last_catch_up_ns < self.__pulse_interval_ns))
+            if merge:
+                self.__pending_ticks += 1
+                self.__merged_ticks += 1
+                self.__catch_up_total += 1
+        if not merge:
+            self.__record(late_ns)
+            self.__last_pulse_ns = monotonic_ns
+            self.__call(self.__func, *self.__args, **self.__kwargs)
+        self.__target_ns += self.__interval_ns
+
+    def __pulse(self, monotonic_ns):
+        '''
+        Sends one pulse of the catch-up, first the merged regular ticks.
+        '''
+        with self.__lock:
+            if self.__pending_ticks > 0:
+                self.__pending_ticks -= 1
+                regular = True
+            elif self.__pending_pulses > 0:
+                self.__pending_pulses -= 1
+                self.__pulses += 1
+                regular = False
+            else:
+                return
+            self.__catch_up_done += 1
+        self.__last_pulse_ns = self.__last_catch_up_ns = monotonic_ns
+        if regular or self.__pulse_func is None:
+            self.__call(self.__func, *self.__args, **self.__kwargs)
+        else:
+            self.__call(self.__pulse_func)
+
+    def __call(self, function, *args, **kwargs):
+        try:
+            function(*args, **kwargs)
+        except Exception as exception:
+            with self.__lock:
+                self.__errors += 1
+            print(f'Fehler beim Aufruf der User-Function: {exception}')
+
+    def __record(self, late_ns):
+        with self.__lock:
+            self.__last_tick_ns = self.__target_ns
+            self.__histogram.observe(abs(late_ns) / NS_PER_SECOND)
+            self.__jitter_last = late_ns
+            self.__jitter_min = late_ns if self.__jitter_min is None else min(self.__jitter_min, late_ns)
+            self.__jitter_max = late_ns if self.__jitter_max is None else max(self.__jitter_max, late_ns)
+
+
+# Tests and Benchmark
+# ===================
+def Test_TickScheduler(do_test=True):
+    '''
+    Ticks, forward and backward clock steps on a VirtualClock: deterministic, no real sleeping.
+    '''
+    if do_test:
+        print('Test_TickScheduler()....', end='')
+        from Class_VirtualClock import VirtualClock, SimulationEnd
+        start = datetime(2026, 11, 2, 8, 0, 0, 500000)
+        clock = VirtualClock(start=start, until=start + timedelta(minutes=1))
+        ticks = []  # (wall-clock, monotonic clock)
+        scheduler = TickScheduler(lambda: ticks.append((clock.time_ns(), clock.monotonic_ns())), interval_seconds=1,
+                                  catch_up_missed=False, clock=clock, start=False)
+        checks = []
+        clock.call_at(start + timedelta(seconds=4.1), lambda: (checks.append(len(ticks)), clock.step(10)))  # forward
+        clock.call_at(start + timedelta(seconds=8.1), lambda: (checks.append(scheduler.statistics), clock.step(-3)))  # backward
+        clock.call_at(start + timedelta(seconds=20), scheduler.stop)
+        try:
+            scheduler.run()
+        except SimulationEnd:
+            assert False, 'scheduler.stop() ends run()'
+
+        wall_seconds = [(wall - ticks[0][0]) // NS_PER_SECOND + 1 for wall, _ in ticks]
+        assert all(wall % NS_PER_SECOND == 0 for wall, _ in ticks)  # exactly on hh:mm:ss.000
+        # ticks 1..4, forward at 04.1 --> 14.1: 5..14 lost (not caught up), backward at 18.1 --> 15.1: holds until 19
+        assert checks[0] == 4 and checks[1]['clock_steps'] == 1 and checks[1]['missed_ticks'] == 10, checks
+        assert wall_seconds == [1, 2, 3, 4] + list(range(15, 28)), wall_seconds
+        assert ticks[8][1] - ticks[7][1] == 4 * NS_PER_SECOND  # 18 --> 19: one more second on the monotonic clock
+        statistics = scheduler.statistics
+        assert statistics['ticks'] == len(ticks) == 17 and statistics['clock_steps'] == 2 and statistics['missed_ticks'] == 10
+        assert statistics['jitter_ms']['max'] == 0.0 and statistics['jitter_ms']['histogram']['+Inf'] == len(ticks)
+        assert clock.now() == start + timedelta(seconds=27)  # stopped at 20s monotonic
+        print('... done')
+
+
+def Test_catch_up(do_test=True):
+    '''
+    Catch-up pulses, merged ticks, missed ticks and cancel on a VirtualClock: deterministic, no real sleeping.
+    '''
+    if do_test:
+        print('Test_catch_up()....', end='')
+        from Class_VirtualClock import VirtualClock
+        start = datetime(2026, 11, 2, 8, 0, 0, 500000)
+        clock = VirtualClock(start=start, until=start + timedelta(hours=1))
+        pulses = []  # (monotonic time, 'tick' or 'pulse')
+        missed = []
+        scheduler = TickScheduler(lambda: pulses.append((clock.monotonic_ns(), 'tick')), interval_seconds=60,
+                                  pulse_func=lambda: pulses.append((clock.monotonic_ns(), 'pulse')), pulse_interval=1.0,
+                                  missed_func=missed.append, clock=clock, start=False)
+        checks = {}
+
+        def catch_up():
+            scheduler.catch_up(100)  # 100s: the ticks at 08:01 and 08:02 are merged
+            checks['started'] = scheduler.catch_up_status
+
+        def done():
+            checks['done'] = (scheduler.catch_up_status, scheduler.statistics, list(pulses))
+
+        def cancel():
+            scheduler.catch_up(100)
+            clock.call_later(5.5, lambda: checks.update(cancelled=scheduler.cancel_catch_up(), after=scheduler.catch_up_status))
+
+        clock.call_at(start + timedelta(seconds=30), catch_up)
+        clock.call_at(start + timedelta(minutes=3), done)
+        clock.call_at(start + timedelta(minutes=5, seconds=30), clock.step, 600)  # forward: 9 ticks missed, caught up
+        clock.call_at(start + timedelta(minutes=26), cancel)
+        clock.call_at(start + timedelta(minutes=28), scheduler.stop)
+        scheduler.run()
+
+        status = checks['started']
+        assert status['active'] and status['total'] == 100 and status['eta_seconds'] == 101.7, status
+        status, statistics, sent = checks['done']
+        assert not status['active'] and status['progress_percent'] == 100.0 and status['done'] == status['total'] == 102, status
+        kinds = [kind for _, kind in sent]  # the merged ticks at 08:01 and 08:02 are sent in the pulse sequence
+        assert kinds == ['pulse'] * 30 + ['tick'] + ['pulse'] * 59 + ['tick'] + ['pulse'] * 11 + ['tick'], kinds
+        assert statistics['merged_ticks'] == 2 and statistics['ticks'] == 3, statistics
+        gaps = [second[0] - first[0] for first, second in zip(sent, sent[1:])]
+        assert min(gaps) == NS_PER_SECOND, gaps  # never two pulses closer than pulse_interval
+
+        statistics = scheduler.statistics
+        assert missed == [9] and statistics['clock_steps'] == 1 and statistics['missed_ticks'] == 9, (missed, statistics)
+        assert checks['cancelled'] == 95 and checks['after']['total'] == 5 and not checks['after']['active'], checks
+        print('... done')
+
+
+def Benchmark_TickScheduler(do_test=True, interval=0.05, seconds=3):
+    '''
+    Jitter of the ticks on this machine (e.g. on the Raspberry Pi under load).
+    '''
+    if do_test:
+        print(f'Benchmark_TickScheduler(interval={interval}s, {seconds}s)....')
+        scheduler = TickScheduler(lambda: None, interval_seconds=interval)
+        time.sleep(seconds)
+        scheduler.stop()
+        statistics = scheduler.statistics
+        print(f"     ticks: {statistics['ticks']}  missed: {statistics['missed_ticks']}  jitter [ms]: "
+              f"min {statistics['jitter_ms']['min']}  max {statistics['jitter_ms']['max']}  mean |x| {statistics['jitter_ms']['mean_abs']}")
+        print(f"     |jitter| <= ms: {statistics['jitter_ms']['histogram']}")
+        print('... done')
+
+
+if __name__ == '__main__':
+    Test_TickScheduler(True)
+    Test_catch_up(True)
+    Benchmark_TickScheduler(True)
@@ -0,0 +1,319 @@
+#!/usr/bin/python3
+
+# ------------------------------------------------------------------
+# Name  : Class_VirtualClock.py
+# Source: https://raw.githubusercontent.com/walter-rothlin/RaspberryPi4PiPlates/refs/heads/main/My_Packages/Class_VirtualClock.py
+#
+# Description: Time-warp for simulations and tests of timers (TickScheduler, Bahnhof_MutterUhr.py, Schaltuhr scheduler.py)
+#              VirtualClock has the interface of Class_TickScheduler.SystemClock (monotonic_ns, time_ns, now, sleep,
+#              wait), but sleep() and wait() do not wait: they move the virtual time forward. A day of a master clock
+#              is simulated in a fraction of a second, with exact timestamps:
+#
+#                  clock = VirtualClock(start=datetime(2026, 10, 24, 12, 0), until=datetime(2026, 10, 26, 12, 0))
+#                  gpio = FakeGPIO(clock)
+#                  scheduler = TickScheduler(lambda: gpio.output(26, not gpio.input(26)), 60, clock=clock, start=False)
+#                  try:
+#                      scheduler.run()             # in this thread, until the virtual time reaches until
+#                  except SimulationEnd:
+#                      pass
+#                  print(len(gpio.edges))
+#
+#              The local time (now()) is computed with a time zone, so DST transitions happen as on the Raspberry Pi.
+#              step() sets the wall-clock (NTP step), call_at()/call_later() inject actions (e.g. /set_time) at a
+#              virtual time. A VirtualClock is driven by one thread, the simulation runs in the caller.
+#              FakeGPIO records every edge of the outputs with its virtual timestamp.
+#
+# Autor: Walter Rothlin
+#
+# History:
+# 18-Oct-2026   Walter Rothlin      Initial Version
+# ------------------------------------------------------------------
+
+import heapq
+import itertools
+import time
+from collections import namedtuple
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+NS_PER_SECOND = 1_000_000_000
+
+
+class SimulationEnd(Exception):
+    '''
+    Raised by sleep() and wait() of a VirtualClock when the virtual time reaches until.
+    '''
+
+
+class VirtualClock:
+    '''
+    Virtual monotonic and wall-clock, moved forward by sleep() and wait() (or advance()).
+    '''
+
+    # Initializer and setter/Getter and Properties
+    # ============================================
+    def __init__(self, start=None, until=None, time_zone='Europe/Zurich'):
+        '''
+        Constructor
+        :param start: datetime of the start (naive: local time in time_zone), default now
+        :param until: datetime (naive: local time) at which SimulationEnd is raised, None: endless
+        :param time_zone: time zone of now() (IANA name)
+        '''
+        self.__time_zone = ZoneInfo(time_zone)
+        self.__time_ns = self.__to_ns(start) if start is not None else time.time_ns()
+        self.__monotonic_ns = 1_000 * NS_PER_SECOND  # like a system which runs since some time
+        self.__until_ns = None
+        self.__events = []  # heap of (monotonic_ns, sequence, function, args)
+        self.__sequence = itertools.count()
+        self.__waits = 0
+        self.set_until(until)
+
+    def set_until(self, until):
+        '''
+        :param until: datetime (naive: local time) at which SimulationEnd is raised, None: endless
+        '''
+        self.__until_ns = None if until is None else self.__to_ns(until)
+
+    def get_statistics(self):
+        return {'waits': self.__waits, 'pending_events': len(self.__events)}
+
+    statistics = property(get_statistics)
+
+    # Clock interface (as SystemClock)
+    # ================================
+    def monotonic_ns(self):
+        return self.__monotonic_ns
+
+    def time_ns(self):
+        return self.__time_ns
+
+    def now(self):
+        '''
+        :return: local time as naive datetime (like datetime.now())
+        '''
+        return datetime.fromtimestamp(self.__time_ns / NS_PER_SECOND, self.__time_zone).replace(tzinfo=None)
+
+    def sleep(self, seconds):
+        self.__waits += 1
+        self.advance(seconds)
+
+    def wait(self, event, timeout):
+        '''
+        Like event.wait(timeout): returns True as soon as the event is set (e.g. by an action of call_at()).
+        '''
+        self.__waits += 1
+        if event.is_set():
+            return True
+        self.advance(timeout, event)
+        return event.is_set()
+
+    # Business Methods
+    # ================
+    def advance(self, seconds, event=None):
+        '''
+        Moves the time forward, runs the actions which fall due in order of their time.
+        Stops early when the event is set. Raises SimulationEnd at until.
+        '''
+        target_ns = self.__monotonic_ns + max(round(seconds * NS_PER_SECOND), 0)
+        while self.__events and self.__events[0][0] <= target_ns:
+            due_ns, _, function, args = heapq.heappop(self.__events)
+            self.__move_to(due_ns)
+            function(*args)
+            if event is not None and event.is_set():
+                return
+        self.__move_to(target_ns)
+
+    def step(self, seconds):
+        '''
+        Sets the wall-clock forward (or backward): the monotonic clock does not move.
+        '''
+        self.__time_ns += round(seconds * NS_PER_SECOND)
+
+    def call_later(self, delay, function, *args):
+        heapq.heappush(self.__events, (self.__monotonic_ns + round(delay * NS_PER_SECOND), next(self.__sequence), function, args))
+
+    def call_at(self, when, function, *args):
+        '''
+        :param when: datetime (naive: local time)
+        '''
+        self.call_later((self.__to_ns(when) - self.__time_ns) / NS_PER_SECOND, function, *args)
+
+    # Internals
+    # =========
+    def __to_ns(self, when):
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=self.__time_zone)
+        return round(when.timestamp() * 1_000_000) * 1000
+
+    def __move_to(self, monotonic_ns):
+        delta_ns = monotonic_ns - self.__monotonic_ns
+        if self.__until_ns is not None and self.__time_ns + delta_ns >= self.__until_ns:
+            delta_ns = max(self.__until_ns - self.__time_ns, 0)
+            self.__monotonic_ns += delta_ns
+            self.__time_ns += delta_ns
+            raise SimulationEnd()
+        self.__monotonic_ns = monotonic_ns
+        self.__time_ns += delta_ns
+
+
+Edge = namedtuple('Edge', ('time_ns', 'channel', 'value'))
+
+
+class FakeGPIO:
+    '''
+    Stand-in for RPi.GPIO, records the edges of the outputs with the time of the clock (VirtualClock or real time).
+    output() accepts lists of channels and values, like RPi.GPIO.
+    '''
+    BCM = 11
+    BOARD = 10
+    OUT = 0
+    IN = 1
+    LOW = 0
+    HIGH = 1
+
+    def __init__(self, clock=None):
+        self.__clock = clock
+        self.__states = {}
+        self.__edges = []
+        self.__output_calls = 0
+
+    def get_edges(self):
+        '''
+        :return: list of Edge(time_ns, channel, value), only changes
+        '''
+        return list(self.__edges)
+
+    edges = property(get_edges)
+
+    def get_output_calls(self):
+        return self.__output_calls
+
+    output_calls = property(get_output_calls)
+
+    def edges_of(self, channel):
+        return [edge for edge in self.__edges if edge.channel == channel]
+
+    def setmode(self, mode):
+        pass
+
+    def setwarnings(self, flag):
+        pass
+
+    def setup(self, channel, direction, initial=None, pull_up_down=None):
+        for one_channel in channel if isinstance(channel, (list, tuple)) else (channel,):
+            self.__states.setdefault(one_channel, self.LOW if initial is None else initial)
+
+    def output(self, channel, value):
+        self.__output_calls += 1
+        channels = channel if isinstance(channel, (list, tuple)) else (channel,)
+        values = value if isinstance(value, (list, tuple)) else (value,) * len(channels)
+        if len(values) != len(channels):
+            raise RuntimeError('Number of channels != number of values')
+        now_ns = self.__clock.time_ns() if self.__clock is not None else time.time_ns()
+        for one_channel, one_value in zip(channels, values):
+            one_value = self.HIGH if one_value else self.LOW
+            if self.__states.get(one_channel) != one_value:
+                self.__edges.append(Edge(now_ns, one_channel, one_value))
+            self.__states[one_channel] = one_value
+
+    def input(self, channel):
+        return self.__states.get(channel, self.LOW)
+
+    def cleanup(self, channel=None):
+        if channel is None:
+            self.__states.clear()
+        else:
+            self.__states.pop(channel, None)
+
+
+# Tests and Benchmark
+# ===================
+def Test_VirtualClock(do_test=True):
+    if do_test:
+        print('Test_VirtualClock()....', end='')
+        import threading
+        clock = VirtualClock(start=datetime(2026, 3, 29, 1, 59), until=datetime(2026, 3, 29, 4, 0))
+        start_ns = clock.monotonic_ns()
+        clock.sleep(60)
+        assert clock.now() == datetime(2026, 3, 29, 3, 0)  # DST: 02:00 --> 03:00
+        assert clock.monotonic_ns() - start_ns == 60 * NS_PER_SECOND
+
+        fired = []
+        event = threading.Event()
+        clock.call_later(5, fired.append, 'a')
+        clock.call_later(10, lambda: (fired.append('b'), event.set()))
+        assert clock.wait(event, 30) and fired == ['a', 'b'] and clock.now() == datetime(2026, 3, 29, 3, 0, 10)
+
+        clock.step(-3600)  # wall-clock set back, the monotonic clock goes on
+        assert clock.now() == datetime(2026, 3, 29, 1, 0, 10) and clock.monotonic_ns() - start_ns == 70 * NS_PER_SECOND
+        try:
+            clock.sleep(10 * 3600)
+            assert False, 'SimulationEnd expected'
+        except SimulationEnd:
+            assert clock.now() == datetime(2026, 3, 29, 4, 0)
+
+        gpio = FakeGPIO(clock)
+        gpio.setup([5, 6], gpio.OUT)
+        gpio.output([5, 6], [gpio.HIGH, gpio.LOW])
+        gpio.output(5, gpio.HIGH)
+        gpio.output(5, False)
+        assert [(edge.channel, edge.value) for edge in gpio.edges] == [(5, 1), (5, 0)] and gpio.output_calls == 3
+        print('... done')
+
+
+def Test_TickScheduler_simulated(do_test=True, days=7):
+    '''
+    A master clock over simulated weeks: one pulse per minute, exactly on :00, alternating polarity.
+    '''
+    if do_test:
+        print(f'Test_TickScheduler_simulated(days={days})....', end='')
+        from Class_TickScheduler import TickScheduler
+        from datetime import timedelta
+        start = datetime(2026, 11, 2, 0, 0, 30)  # no DST transition in these weeks
+        clock = VirtualClock(start=start, until=start + timedelta(days=days))
+        gpio = FakeGPIO(clock)
+        gpio.setup(26, gpio.OUT)
+        scheduler = TickScheduler(lambda: gpio.output(26, not gpio.input(26)), 60, clock=clock, start=False)
+        clock.call_at(start + timedelta(days=1, seconds=10), clock.step, 300)    # NTP step: 5 minutes forward
+        clock.call_at(start + timedelta(days=2, seconds=10), clock.step, -120)   # 2 minutes back
+        try:
+            scheduler.run()
+        except SimulationEnd:
+            pass
+        edges = gpio.edges
+        statistics = scheduler.statistics
+        assert len(edges) == days * 24 * 60, len(edges)  # one pulse per minute of the wall-clock, also over the steps
+        assert all(edge.value != previous.value for previous, edge in zip(edges, edges[1:]))
+        on_time = [edge for edge in edges if edge.time_ns % (60 * NS_PER_SECOND) == 0]
+        assert len(on_time) == len(edges) - 5, len(on_time)  # 4 missed ticks and the one due at the step are caught up
+        assert statistics['clock_steps'] == 2 and statistics['missed_ticks'] == 4 and statistics['merged_ticks'] == 1
+        assert statistics['jitter_ms']['max'] == 0.0, statistics
+        print('... done')
+
+
+def Benchmark_VirtualClock(do_test=True, days=28):
+    '''
+    Simulated days per second (TickScheduler with a minute interval).
+    '''
+    if do_test:
+        print(f'Benchmark_VirtualClock(days={days})....')
+        from Class_TickScheduler import TickScheduler
+        from datetime import timedelta
+        start = datetime(2026, 10, 1)
+        clock = VirtualClock(start=start, until=start + timedelta(days=days))
+        ticks = [0]
+        scheduler = TickScheduler(lambda: ticks.__setitem__(0, ticks[0] + 1), 60, clock=clock, start=False)
+        begin = time.perf_counter()
+        try:
+            scheduler.run()
+        except SimulationEnd:
+            pass
+        duration = time.perf_counter() - begin
+        print(f'     {ticks[0]} ticks in {duration:.2f}s: {days / duration:.1f} simulated days/s')
+        print('... done')
+
+
+if __name__ == '__main__':
+    Test_VirtualClock(True)
+    Test_TickScheduler_simulated(True)
+    Benchmark_VirtualClock(True)
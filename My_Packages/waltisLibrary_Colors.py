@@ -0,0 +1,427 @@
+#!/usr/bin/python3
+
+# ------------------------------------------------------------------
+# Name  : waltisLibrary_Colors.py
+# Source: https://raw.githubusercontent.com/walter-rothlin/RaspberryPi4PiPlates/refs/heads/main/My_Packages/waltisLibrary_Colors.py
+#
+# Description: Colour parsing for URL-Parameters and frame payloads (as convert2RGB() in Sense_Hat_Flask.py)
+#              - precompiled table of the 147 CSS3 colour names, no webcolors needed for them
+#              - results are cached (LRU) with the raw input as key: a repeated colour costs one dict lookup
+#              - convert_many() converts a whole frame (64 colours) and parses every distinct colour only once
+#              - webcolors is imported only if a name is not in the table (lazy, keeps the Flask start fast)
+#
+#                  convert2RGB('#ff00ff')               --> (255, 0, 255)
+#                  convert2RGB('lightblue')             --> (173, 216, 230)
+#                  convert_many(['red', (0, 0, 255)])   --> [(255, 0, 0), (0, 0, 255)]
+#
+# Autor: Walter Rothlin
+#
+# History:
+# 18-Oct-2026   Walter Rothlin      Initial Version (convert2RGB() from Sense_Hat_Flask.py)
+# 18-Oct-2026   Walter Rothlin      'ff 00 ff' and 'dark slate gray' again as before, test against the original convert2RGB()
+# ------------------------------------------------------------------
+
+import time
+from functools import lru_cache
+
+CACHE_SIZE = 1024
+
+CSS3_NAMES_TO_RGB = {
+    'aliceblue': (240, 248, 255),
+    'antiquewhite': (250, 235, 215),
+    'aqua': (0, 255, 255),
+    'aquamarine': (127, 255, 212),
+    'azure': (240, 255, 255),
+    'beige': (245, 245, 220),
+    'bisque': (255, 228, 196),
+    'black': (0, 0, 0),
+    'blanchedalmond': (255, 235, 205),
+    'blue': (0, 0, 255),
+    'blueviolet': (138, 43, 226),
+    'brown': (165, 42, 42),
+    'burlywood': (222, 184, 135),
+    'cadetblue': (95, 158, 160),
+    'chartreuse': (127, 255, 0),
+    'chocolate': (210, 105, 30),
+    'coral': (255, 127, 80),
+    'cornflowerblue': (100, 149, 237),
+    'cornsilk': (255, 248, 220),
+    'crimson': (220, 20, 60),
+    'cyan': (0, 255, 255),
+    'darkblue': (0, 0, 139),
+    'darkcyan': (0, 139, 139),
+    'darkgoldenrod': (184, 134, 11),
+    'darkgray': (169, 169, 169),
+    'darkgreen': (0, 100, 0),
+    'darkgrey': (169, 169, 169),
+    'darkkhaki': (189, 183, 107),
+    'darkmagenta': (139, 0, 139),
+    'darkolivegreen': (85, 107, 47),
+    'darkorange': (255, 140, 0),
+    'darkorchid': (153, 50, 204),
+    'darkred': (139, 0, 0),
+    'darksalmon': (233, 150, 122),
+    'darkseagreen': (143, 188, 143),
+    'darkslateblue': (72, 61, 139),
+    'darkslategray': (47, 79, 79),
+    'darkslategrey': (47, 79, 79),
+    'darkturquoise': (0, 206, 209),
+    'darkviolet': (148, 0, 211),
+    'deeppink': (255, 20, 147),
+    'deepskyblue': (0, 191, 255),
+    'dimgray': (105, 105, 105),
+    'dimgrey': (105, 105, 105),
+    'dodgerblue': (30, 144, 255),
+    'firebrick': (178, 34, 34),
+    'floralwhite': (255, 250, 240),
+    'forestgreen': (34, 139, 34),
+    'fuchsia': (255, 0, 255),
+    'gainsboro': (220, 220, 220),
+    'ghostwhite': (248, 248, 255),
+    'gold': (255, 215, 0),
+    'goldenrod': (218, 165, 32),
+    'gray': (128, 128, 128),
+    'green': (0, 128, 0),
+    'greenyellow': (173, 255, 47),
+    'grey': (128, 128, 128),
+    'honeydew': (240, 255, 240),
+    'hotpink': (255, 105, 180),
+    'indianred': (205, 92, 92),
+    'indigo': (75, 0, 130),
+    'ivory': (255, 255, 240),
+    'khaki': (240, 230, 140),
+    'lavender': (230, 230, 250),
+    'lavenderblush': (255, 240, 245),
+    'lawngreen': (124, 252, 0),
+    'lemonchiffon': (255, 250, 205),
+    'lightblue': (173, 216, 230),
+    'lightcoral': (240, 128, 128),
+    'lightcyan': (224, 255, 255),
+    'lightgoldenrodyellow': (250, 250, 210),
+    'lightgray': (211, 211, 211),
+    'lightgreen': (144, 238, 144),
+    'lightgrey': (211, 211, 211),
+    'lightpink': (255, 182, 193),
+    'lightsalmon': (255, 160, 122),
+    'lightseagreen': (32, 178, 170),
+    'lightskyblue': (135, 206, 250),
+    'lightslategray': (119, 136, 153),
+    'lightslategrey': (119, 136, 153),
+    'lightsteelblue': (176, 196, 222),
+    'lightyellow': (255, 255, 224),
+    'lime': (0, 255, 0),
+    'limegreen': (50, 205, 50),
+    'linen': (250, 240, 230),
+    'magenta': (255, 0, 255),
+    'maroon': (128, 0, 0),
+    'mediumaquamarine': (102, 205, 170),
+    'mediumblue': (0, 0, 205),
+    'mediumorchid': (186, 85, 211),
+    'mediumpurple': (147, 112, 219),
+    'mediumseagreen': (60, 179, 113),
+    'mediumslateblue': (123, 104, 238),
+    'mediumspringgreen': (0, 250, 154),
+    'mediumturquoise': (72, 209, 204),
+    'mediumvioletred': (199, 21, 133),
+    'midnightblue': (25, 25, 112),
+    'mintcream': (245, 255, 250),
+    'mistyrose': (255, 228, 225),
+    'moccasin': (255, 228, 181),
+    'navajowhite': (255, 222, 173),
+    'navy': (0, 0, 128),
+    'oldlace': (253, 245, 230),
+    'olive': (128, 128, 0),
+    'olivedrab': (107, 142, 35),
+    'orange': (255, 165, 0),
+    'orangered': (255, 69, 0),
+    'orchid': (218, 112, 214),
+    'palegoldenrod': (238, 232, 170),
+    'palegreen': (152, 251, 152),
+    'paleturquoise': (175, 238, 238),
+    'palevioletred': (219, 112, 147),
+    'papayawhip': (255, 239, 213),
+    'peachpuff': (255, 218, 185),
+    'peru': (205, 133, 63),
+    'pink': (255, 192, 203),
+    'plum': (221, 160, 221),
+    'powderblue': (176, 224, 230),
+    'purple': (128, 0, 128),
+    'red': (255, 0, 0),
+    'rosybrown': (188, 143, 143),
+    'royalblue': (65, 105, 225),
+    'saddlebrown': (139, 69, 19),
+    'salmon': (250, 128, 114),
+    'sandybrown': (244, 164, 96),
+    'seagreen': (46, 139, 87),
+    'seashell': (255, 245, 238),
+    'sienna': (160, 82, 45),
+    'silver': (192, 192, 192),
+    'skyblue': (135, 206, 235),
+    'slateblue': (106, 90, 205),
+    'slategray': (112, 128, 144),
+    'slategrey': (112, 128, 144),
+    'snow': (255, 250, 250),
+    'springgreen': (0, 255, 127),
+    'steelblue': (70, 130, 180),
+    'tan': (210, 180, 140),
+    'teal': (0, 128, 128),
+    'thistle': (216, 191, 216),
+    'tomato': (255, 99, 71),
+    'turquoise': (64, 224, 208),
+    'violet': (238, 130, 238),
+    'wheat': (245, 222, 179),
+    'white': (255, 255, 255),
+    'whitesmoke': (245, 245, 245),
+    'yellow': (255, 255, 0),
+    'yellowgreen': (154, 205, 50),
+}
+
+_HEX_DIGITS = frozenset('0123456789abcdef')
+_webcolors = None  # module, imported at the first name which is not in CSS3_NAMES_TO_RGB (False: not installed)
+
+
+def _clip(value):
+    return int(min(max(0, value), 255))
+
+
+def name_to_rgb(name):
+    '''
+    :param name: colour name, lower case without spaces
+    :return: (r, g, b) or None
+    '''
+    global _webcolors
+    rgb = CSS3_NAMES_TO_RGB.get(name)
+    if rgb is not None:
+        return rgb
+    if _webcolors is None:
+        try:
+            import webcolors
+            _webcolors = webcolors
+        except ImportError:
+            _webcolors = False
+    if _webcolors:
+        try:
+            rgb = _webcolors.name_to_rgb(name)
+            return (rgb.red, rgb.green, rgb.blue)
+        except ValueError:
+            pass
+    return None
+
+
+def _is_integer(text):
+    try:
+        int(text)
+        return True
+    except ValueError:
+        return False
+
+
+def _parse(value):
+    '''
+    Uncached conversion, returns None if the value is not a colour.
+    '''
+    # Bereits Tuple/List mit 3 Elementen
+    if isinstance(value, (tuple, list)):
+        if len(value) != 3:
+            return None
+        return tuple(_clip(v) for v in value)
+
+    # Einzelzahl → Grau
+    if isinstance(value, (int, float)):
+        v = _clip(int(value))
+        return (v, v, v)
+
+    if not isinstance(value, str):
+        return None
+
+    cleaned = value.strip().replace("'", "").lower()
+
+    # RGB-Komma- oder Leerzeichen-Format, nur wenn alle drei Teile Zahlen sind ('ff 00 ff' ist Hex, 'dark slate gray' ein Name)
+    cleaned_rgb = cleaned.replace("(", "").replace(")", "")
+    parts = [p.strip() for p in cleaned_rgb.split(',')] if ',' in cleaned_rgb else cleaned_rgb.split()
+    if len(parts) == 3 and all(_is_integer(p) for p in parts):
+        return tuple(_clip(int(p)) for p in parts)
+
+    # Hex-Farbe
+    cleaned = cleaned.replace(" ", "")
+    if cleaned.startswith('#'):
+        cleaned = cleaned[1:]
+    if len(cleaned) == 6 and _HEX_DIGITS.issuperset(cleaned):
+        return (int(cleaned[0:2], 16), int(cleaned[2:4], 16), int(cleaned[4:6], 16))
+
+    # CSS3-Farbname
+    return name_to_rgb(cleaned)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_cached(value):
+    try:
+        return _parse(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _cache_key(value):
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+
+def convert2RGB(value, default_value=None):
+    """
+        print(convert2RGB((255,0,128)))        # (255, 0, 128)
+        print(convert2RGB([0,128,255]))        # (0, 128, 255)
+        print(convert2RGB("255,0,128"))        # (255, 0, 128)
+        print(convert2RGB("0 128 255"))        # (0, 128, 255)
+        print(convert2RGB("#ff00ff"))          # (255, 0, 255)
+        print(convert2RGB("ff00ff"))           # (255, 0, 255)
+        print(convert2RGB("red"))              # (255, 0, 0)
+        print(convert2RGB("lightblue"))        # (173, 216, 230)
+        print(convert2RGB(100))                # (100, 100, 100)
+        print(convert2RGB("unknown", default_value=(0,0,0)))  # (0, 0, 0)
+    """
+    try:
+        rgb = _parse_cached(_cache_key(value))
+    except TypeError:  # not hashable (e.g. dict)
+        rgb = None
+    return default_value if rgb is None else rgb
+
+
+def convert_many(values, default_value=None):
+    '''
+    Converts a list of colours (e.g. the 64 pixels of a frame). Every distinct colour is parsed once.
+    :return: list of (r, g, b), default_value for the entries which are not a colour
+    '''
+    results = {}
+    converted = []
+    for value in values:
+        try:
+            key = _cache_key(value)
+            rgb = results.get(key)
+            if rgb is None and key not in results:
+                rgb = results[key] = _parse_cached(key)
+        except TypeError:
+            rgb = None
+        converted.append(default_value if rgb is None else rgb)
+    return converted
+
+
+def cache_info():
+    return _parse_cached.cache_info()
+
+
+# Tests and Benchmark
+# ===================
+def _reference_convert2RGB(value, default_value=None):
+    # convert2RGB() as it was in Sense_Hat_Flask.py (only the debug prints removed), needs webcolors
+    import webcolors
+    try:
+        # Bereits Tuple/List mit 3 Elementen
+        if isinstance(value, (tuple, list)) and len(value) == 3:
+            return tuple(int(min(max(0, v), 255)) for v in value)
+
+        # String-Verarbeitung
+        elif isinstance(value, str):
+            cleaned = value.strip().replace(" ", "").replace("'", "").lower()
+
+            # Hex-Farbe
+            if cleaned.startswith('#'):
+                cleaned = cleaned[1:]
+            if len(cleaned) == 6 and all(c in '0123456789abcdef' for c in cleaned):
+                r = int(cleaned[0:2], 16)
+                g = int(cleaned[2:4], 16)
+                b = int(cleaned[4:6], 16)
+                return (r, g, b)
+
+            # CSS3-Farbname
+            try:
+                rgb = webcolors.name_to_rgb(cleaned)
+                return (rgb.red, rgb.green, rgb.blue)
+            except ValueError:
+                pass  # kein bekannter Name, weitermachen
+
+            # RGB-Komma- oder Leerzeichen-Format
+            cleaned = cleaned.replace("(", "").replace(")", "")
+            if ',' in cleaned:
+                parts = cleaned.split(',')
+            else:
+                parts = cleaned.split()
+
+            if len(parts) != 3:
+                return default_value
+            return tuple(int(min(max(0, int(p)), 255)) for p in parts)
+
+        # Einzelzahl → Grau
+        elif isinstance(value, (int, float)):
+            v = int(min(max(0, int(value)), 255))
+            return (v, v, v)
+
+        else:
+            return default_value
+
+    except Exception:
+        return default_value
+
+
+def _webcolors_available():
+    try:
+        import webcolors
+        return True
+    except ImportError:
+        return False
+
+
+def Test_convert2RGB(do_test=True):
+    if do_test:
+        print('Test_convert2RGB()....', end='')
+        assert convert2RGB((255, 0, 128)) == (255, 0, 128)
+        assert convert2RGB([0, 128, 300]) == (0, 128, 255)
+        assert convert2RGB("255,0,128") == (255, 0, 128)
+        assert convert2RGB("(255, 0, 128)") == (255, 0, 128)
+        assert convert2RGB("0 128 255") == (0, 128, 255)
+        assert convert2RGB("#ff00ff") == (255, 0, 255)
+        assert convert2RGB("FF00FF") == (255, 0, 255)
+        assert convert2RGB("red") == (255, 0, 0)
+        assert convert2RGB(" LightBlue ") == (173, 216, 230)
+        assert convert2RGB(100) == (100, 100, 100)
+        assert convert2RGB("unknown", default_value=(0, 0, 0)) == (0, 0, 0)
+        assert convert2RGB({'r': 1}, default_value=(1, 1, 1)) == (1, 1, 1)
+        assert convert2RGB(None) is None
+        assert convert_many(['red', [0, 0, 255], 'red', 'xyz'], (0, 0, 0)) == [(255, 0, 0), (0, 0, 255), (255, 0, 0), (0, 0, 0)]
+        assert convert2RGB("ff 00 ff") == (255, 0, 255)
+        assert convert2RGB("dark slate gray") == (47, 79, 79)
+        assert convert2RGB("1, 2, x") is None
+        if _webcolors_available():
+            # gleiche Resultate wie das alte convert2RGB(), ausser "0 128 255": dort None (Leerzeichen wurden zuerst entfernt)
+            for value in ['red', '#00ff00', '#FF00FF', '1,2,3', '(255, 0, 128)', (1, 2, 3), [0, 128, 300], 7, 300.5,
+                          'navy', ' LightBlue ', 'x', 'ff 00 ff', 'dark slate gray', '1, 2, x', None, {'r': 1}]:
+                assert convert2RGB(value) == _reference_convert2RGB(value), value
+            assert _reference_convert2RGB("0 128 255") is None
+        else:
+            print(' (webcolors fehlt: kein Vergleich mit dem alten convert2RGB())', end='')
+        print('... done')
+
+
+def Benchmark_convert2RGB(do_test=True, count=20000):
+    if do_test:
+        print('Benchmark_convert2RGB()....')
+        values = ['red', '#ff00ff', '255,0,128', 'lightblue', (0, 128, 255)] * (count // 5)
+        functions = [('convert2RGB ', convert2RGB), ('convert_many', None)]
+        if _webcolors_available():
+            functions.insert(0, ('original    ', _reference_convert2RGB))  # convert2RGB() as in Sense_Hat_Flask.py
+        for name, function in functions:
+            start = time.perf_counter()
+            if function is None:
+                convert_many(values)
+            else:
+                for value in values:
+                    function(value)
+            duration = time.perf_counter() - start
+            print(f'     {name}: {len(values) / duration:10.0f} colours/s')
+        print(f'     {cache_info()}')
+        print('... done')
+
+
+if __name__ == '__main__':
+    Test_convert2RGB(True)
+    Benchmark_convert2RGB(True)
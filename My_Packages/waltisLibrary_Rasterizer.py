@@ -0,0 +1,361 @@
+#!/usr/bin/python3
+
+# ------------------------------------------------------------------
+# Name  : waltisLibrary_Rasterizer.py
+# Source: https://raw.githubusercontent.com/walter-rothlin/RaspberryPi4PiPlates/refs/heads/main/My_Packages/waltisLibrary_Rasterizer.py
+#
+# Description: Integer rasterizer for the LED-Matrix (lines, rectangles, circles, polygons)
+#              All functions are generators and yield (x, y) tuples. No floats, no clipping:
+#              use clip() to drop the points outside the 8x8 matrix.
+#
+#                  for x, y in clip(line_points(0, 0, 7, 3)):
+#                      sense.set_pixel(x, y, 255, 0, 0)
+#
+#              Lines are rounded like the former float versions (round() = round half to even), therefore
+#              draw_line() / drawLine() produce the same pixels as before (see TEST_line_points()).
+#
+# Autor: Walter Rothlin
+#
+# History:
+# 18-Oct-2026   Walter Rothlin      Initial Version (replaces the float versions of draw_line, drawLine, drawCircle)
+# 18-Oct-2026   Walter Rothlin      polygon_points(): no duplicates for repeated or collinear vertices
+# ------------------------------------------------------------------
+
+import time
+
+
+def line_points(x_start, y_start, x_end, y_end):
+    '''
+    Bresenham line from (x_start, y_start) to (x_end, y_end), start and end point included.
+    On the minor axis the exact value is rounded half to even (same as round()).
+    :return: generator of (x, y)
+    '''
+    dx = x_end - x_start
+    dy = y_end - y_start
+    if abs(dx) > abs(dy):
+        # Flache Linie: x is the major axis
+        major, major_end, minor = x_start, x_end, y_start
+        d_major, d_minor = abs(dx), dy
+        swapped = False
+    else:
+        # Steile Linie: y is the major axis
+        major, major_end, minor = y_start, y_end, x_start
+        d_major, d_minor = abs(dy), dx
+        swapped = True
+
+    if d_major == 0:
+        yield (x_start, y_start)
+        return
+
+    step = 1 if major_end > major else -1
+    remainder = 0  # exact minor value = minor + remainder / d_major, 0 <= remainder < d_major
+    for major_value in range(major, major_end + step, step):
+        twice = 2 * remainder
+        if twice > d_major or (twice == d_major and minor & 1):
+            minor_value = minor + 1
+        else:
+            minor_value = minor
+        yield (minor_value, major_value) if swapped else (major_value, minor_value)
+
+        remainder += d_minor
+        if remainder >= d_major:
+            remainder -= d_major
+            minor += 1
+        elif remainder < 0:
+            remainder += d_major
+            minor -= 1
+
+
+def rectangle_points(x_start, y_start, x_end, y_end, filled=False):
+    '''
+    Rectangle with the corners (x_start, y_start) and (x_end, y_end), every point once.
+    :return: generator of (x, y)
+    '''
+    x_min, x_max = min(x_start, x_end), max(x_start, x_end)
+    y_min, y_max = min(y_start, y_end), max(y_start, y_end)
+    if filled:
+        for y in range(y_min, y_max + 1):
+            for x in range(x_min, x_max + 1):
+                yield (x, y)
+        return
+
+    for x in range(x_min, x_max + 1):
+        yield (x, y_min)
+    if y_max != y_min:
+        for x in range(x_min, x_max + 1):
+            yield (x, y_max)
+    for y in range(y_min + 1, y_max):
+        yield (x_min, y)
+        if x_max != x_min:
+            yield (x_max, y)
+
+
+def _circle_octant(radius):
+    '''
+    Midpoint circle algorithm for the octant 0 <= x <= y.
+    :return: generator of (x, y) relative to the center
+    '''
+    x = 0
+    y = radius
+    decision = 1 - radius
+    while x <= y:
+        yield (x, y)
+        x += 1
+        if decision < 0:
+            decision += 2 * x + 1
+        else:
+            y -= 1
+            decision += 2 * (x - y) + 1
+
+
+def circle_points(x_center, y_center, radius, filled=False):
+    '''
+    Midpoint circle around (x_center, y_center), every point once.
+    :param filled: True yields the filled disk (horizontal spans from top to bottom)
+    :return: generator of (x, y)
+    '''
+    if radius < 0:
+        return
+    if radius == 0:
+        yield (x_center, y_center)
+        return
+
+    if filled:
+        half_width = [0] * (radius + 1)  # half width of the span per row distance from the center
+        for x, y in _circle_octant(radius):
+            half_width[y] = max(half_width[y], x)
+            half_width[x] = max(half_width[x], y)
+        for dy in range(-radius, radius + 1):
+            width = half_width[abs(dy)]
+            for x in range(x_center - width, x_center + width + 1):
+                yield (x, y_center + dy)
+        return
+
+    for x, y in _circle_octant(radius):
+        # the 8 symmetric points, without duplicates on the axes (x == 0) and the diagonals (x == y)
+        yield (x_center + x, y_center + y)
+        yield (x_center + x, y_center - y)
+        if x != 0:
+            yield (x_center - x, y_center + y)
+            yield (x_center - x, y_center - y)
+        if x != y:
+            yield (x_center + y, y_center + x)
+            yield (x_center - y, y_center + x)
+            if x != 0:
+                yield (x_center + y, y_center - x)
+                yield (x_center - y, y_center - x)
+
+
+def _polygon_spans(vertices):
+    '''
+    Scanline fill (even-odd rule) with the pixel centers, integer arithmetic only.
+    :return: dict row --> list of (x_from, x_to)
+    '''
+    spans = {}
+    y_min = min(y for x, y in vertices)
+    y_max = max(y for x, y in vertices)
+    edges = list(zip(vertices, vertices[1:] + vertices[:1]))
+    for row in range(y_min, y_max + 1):
+        crossings = []  # (numerator, denominator) of the x value where an edge crosses the row
+        for (x0, y0), (x1, y1) in edges:
+            if y0 == y1:
+                continue
+            if y0 > y1:
+                x0, y0, x1, y1 = x1, y1, x0, y0
+            if y0 <= row < y1:
+                crossings.append((x0 * (y1 - y0) + (row - y0) * (x1 - x0), y1 - y0))
+        crossings.sort(key=lambda c: c[0] / c[1])
+        row_spans = []
+        for (num_left, den_left), (num_right, den_right) in zip(crossings[::2], crossings[1::2]):
+            x_from = -((-num_left) // den_left)  # ceil
+            x_to = num_right // den_right        # floor
+            if x_from <= x_to:
+                row_spans.append((x_from, x_to))
+        if row_spans:
+            spans[row] = row_spans
+    return spans
+
+
+def polygon_points(vertices, filled=False):
+    '''
+    Closed polygon through the vertices [(x, y), ...]. Filled polygons contain the outline.
+    Every point is yielded once, also for repeated vertices or edges lying on each other.
+    :return: generator of (x, y)
+    '''
+    vertices = list(vertices)
+    vertices = [vertex for i, vertex in enumerate(vertices) if i == 0 or vertex != vertices[i - 1]]  # no zero-length edges
+    if len(vertices) > 1 and vertices[-1] == vertices[0]:
+        del vertices[-1]
+    if len(vertices) == 0:
+        return
+    if len(vertices) == 1:
+        yield vertices[0]
+        return
+
+    spans = {}
+    if filled:
+        spans = _polygon_spans(vertices)
+        for y, row_spans in spans.items():
+            for x_from, x_to in row_spans:
+                for x in range(x_from, x_to + 1):
+                    yield (x, y)
+
+    outline = set()  # shared end points and collinear edges going back over the same pixels
+    for (x0, y0), (x1, y1) in zip(vertices, vertices[1:] + vertices[:1]):
+        for point in line_points(x0, y0, x1, y1):
+            if point in outline:
+                continue
+            outline.add(point)
+            x, y = point
+            if any(x_from <= x <= x_to for x_from, x_to in spans.get(y, ())):
+                continue
+            yield point
+
+
+def clip(points, width=8, height=8):
+    '''
+    Drops the points outside the LED-Matrix.
+    :return: generator of (x, y)
+    '''
+    for point in points:
+        if 0 <= point[0] < width and 0 <= point[1] < height:
+            yield point
+
+
+# Tests and Benchmark
+# ===================
+def _reference_draw_line_points(x_start, y_start, x_end, y_end):
+    '''
+    Former float version of MySenseHat.draw_line() (slope/intercept), used as reference for TEST_line_points().
+    '''
+    points = []
+    if x_start == x_end:
+        if y_start > y_end:
+            y_start, y_end = y_end, y_start
+        for y in range(round(y_start), round(y_end + 1)):
+            points.append((x_start, y))
+    else:
+        if x_start > x_end:
+            x_start, x_end = x_end, x_start
+            y_start, y_end = y_end, y_start
+        a = (y_start - y_end) / (x_start - x_end)
+        c = y_start - a * x_start
+        if abs(a) >= 1:
+            if y_start > y_end:
+                y_start, y_end = y_end, y_start
+            for y in range(round(y_start), round(y_end + 1)):
+                points.append((int(round((y - c) / a)), y))
+        else:
+            for x in range(round(x_start), round(x_end + 1)):
+                points.append((x, int(round(a * x + c))))
+    return points
+
+
+def _reference_drawLine_points(x_start, y_start, x_end, y_end):
+    '''
+    Former float version of MySenseHat.drawLine() (Stefan Scheuber), used as reference for TEST_line_points().
+    '''
+    if abs(x_start - x_end) > abs(y_start - y_end):
+        gradient = (y_end - y_start) / abs(x_end - x_start)
+        step = 1 if x_start < x_end else -1
+        return [(x_start + i, int(round(y_start + gradient * abs(i)))) for i in range(0, x_end - x_start + step, step)]
+    else:
+        gradient = (x_end - x_start) / abs(y_end - y_start)
+        step = 1 if y_start < y_end else -1
+        return [(int(round(x_start + gradient * abs(i))), y_start + i) for i in range(0, y_end - y_start + step, step)]
+
+
+def _is_tie_point(x_start, y_start, x_end, y_end, point):
+    '''
+    True if the exact line passes the minor axis of this point exactly in the middle between two pixels.
+    '''
+    dx = x_end - x_start
+    dy = y_end - y_start
+    if abs(dx) > abs(dy):
+        return 2 * ((dy * (point[0] - x_start)) % abs(dx)) == abs(dx)
+    return dy != 0 and 2 * ((dx * (point[1] - y_start)) % abs(dy)) == abs(dy)
+
+
+def TEST_line_points(do_test=True, size=8):
+    '''
+    Pixel-exact regression: line_points() against the former float versions for all lines on the matrix.
+    drawLine() (gradient from the start point) has to match exactly. draw_line() (slope/intercept) may only differ
+    on pixels where the exact line is in the middle between two pixels: there the float error of the
+    intercept decided, line_points() rounds half to even.
+    '''
+    if do_test:
+        print('TEST_line_points()....', end='')
+        errors = 0
+        ties = 0
+        coordinates = range(size)
+        for x_start in coordinates:
+            for y_start in coordinates:
+                for x_end in coordinates:
+                    for y_end in coordinates:
+                        points = list(line_points(x_start, y_start, x_end, y_end))
+                        if (x_start, y_start) != (x_end, y_end) and points != _reference_drawLine_points(x_start, y_start, x_end, y_end):
+                            errors += 1
+                            print(f'\n     drawLine({x_start}, {y_start}, {x_end}, {y_end}): {points}')
+
+                        different = set(points) ^ set(_reference_draw_line_points(x_start, y_start, x_end, y_end))
+                        if different:
+                            if all(_is_tie_point(x_start, y_start, x_end, y_end, point) for point in different):
+                                ties += 1
+                            else:
+                                errors += 1
+                                print(f'\n     draw_line({x_start}, {y_start}, {x_end}, {y_end}): {points}')
+        print(f'... done ({errors} errors, {ties} lines with rounded ties)')
+        return errors
+
+
+def TEST_shapes(do_test=True):
+    if do_test:
+        print('TEST_shapes()....', end='')
+        for radius in range(0, 8):
+            points = list(circle_points(0, 0, radius))
+            assert len(points) == len(set(points)), f'circle r={radius} has duplicates'
+            filled = list(circle_points(0, 0, radius, filled=True))
+            assert len(filled) == len(set(filled)), f'filled circle r={radius} has duplicates'
+            assert set(points) <= set(filled), f'filled circle r={radius} does not contain the outline'
+
+        assert len(list(rectangle_points(1, 2, 6, 5))) == 2 * 6 + 2 * 2
+        assert len(list(rectangle_points(6, 5, 1, 2, filled=True))) == 6 * 4
+
+        square = [(0, 0), (7, 0), (7, 7), (0, 7)]
+        assert sorted(polygon_points(square, filled=True)) == sorted(rectangle_points(0, 0, 7, 7, filled=True))
+        assert sorted(polygon_points(square)) == sorted(rectangle_points(0, 0, 7, 7))
+        triangle = list(polygon_points([(0, 7), (7, 7), (3, 0)], filled=True))
+        assert len(triangle) == len(set(triangle)), 'filled triangle has duplicates'
+        for filled in (False, True):  # repeated and collinear vertices: every pixel once
+            for vertices in ([(0, 0), (7, 0), (7, 0), (0, 0)], [(0, 0), (3, 0), (7, 0), (0, 0)], [(2, 2), (2, 2)]):
+                points = list(polygon_points(vertices, filled=filled))
+                assert len(points) == len(set(points)), f'{vertices} filled={filled} has duplicates'
+        assert sorted(polygon_points([(0, 0), (7, 0), (7, 0), (0, 0)])) == sorted(line_points(0, 0, 7, 0))
+        assert list(polygon_points([(2, 2), (2, 2)])) == [(2, 2)]
+        print('... done')
+
+
+def Benchmark_points_per_second(do_test=True, duration=1.0):
+    if do_test:
+        print('Benchmark_points_per_second()....')
+        benchmarks = [
+            ('line_points     ', lambda: line_points(0, 0, 7, 3)),
+            ('rectangle_points', lambda: rectangle_points(0, 0, 7, 7, filled=True)),
+            ('circle_points   ', lambda: circle_points(3, 3, 3)),
+            ('polygon_points  ', lambda: polygon_points([(0, 7), (7, 7), (3, 0)], filled=True)),
+            ('draw_line (old) ', lambda: _reference_draw_line_points(0, 0, 7, 3)),
+        ]
+        for name, create in benchmarks:
+            count = 0
+            start = time.perf_counter()
+            while time.perf_counter() - start < duration:
+                for point in create():
+                    count += 1
+            print(f'     {name}: {count / (time.perf_counter() - start):10.0f} points/s')
+        print('... done')
+
+
+if __name__ == '__main__':
+    TEST_line_points(True)
+    TEST_shapes(True)
+    Benchmark_points_per_second(True)
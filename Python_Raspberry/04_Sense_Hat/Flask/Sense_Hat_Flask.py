@@ -15,24 +15,59 @@
 # 01-Jul-2025  Walter Rothlin     Initial Version
 # 04-Oct-2025  Walter Rothlin     Prepared for HBU MLZ 2025
 # 06-Oct-2025  Walter Rothlin     Defined and implemented all Endpoints
+# 18-Oct-2026  Walter Rothlin     draw_line with draw_speed runs in the render thread (Class_Renderer), blocking=False returns immediately
+# 18-Oct-2026  Walter Rothlin     Sensor values from a background sampler (Class_SensorSampler) with age, max_age forces a fresh read
+# 18-Oct-2026  Walter Rothlin     request_log is a ring buffer (Class_RequestLog), /request_log as JSON, template shows the newest entries
+# 18-Oct-2026  Walter Rothlin     /events: Server-Sent Events with sensor snapshots and LED-Matrix diffs (Class_EventStream)
+# 18-Oct-2026  Walter Rothlin     /set_pixels implemented: whole frame as raw bytes, base64 or JSON, answers with a JSON ack
+# 18-Oct-2026  Walter Rothlin     convert2RGB() from waltisLibrary_Colors (CSS3 table, cached, webcolors only imported when needed)
+# 18-Oct-2026  Walter Rothlin     All LED-Matrix calls run in the render thread (command queue with coalescing), blocking=False for all of them
+# 18-Oct-2026  Walter Rothlin     show_message with cached pre-rendered frames (Class_TextScroller), /stop_message
+# 18-Oct-2026  Walter Rothlin     /get_imu: filtered IMU samples from a 100 Hz stream (Class_IMUStream), started with the first request
+# 18-Oct-2026  Walter Rothlin     SENSE_HAT_BACKEND=fake: läuft ohne Sense-Hat (Class_FakeSenseHat), z.B. für Last-Tests
+# 18-Oct-2026  Walter Rothlin     blocking=False wartet nicht mehr auf einen Platz in der vollen Render-Queue (gefunden mit Sense_Hat_Flask_Benchmark.py)
+# 18-Oct-2026  Walter Rothlin     /metrics: Requests, Latenz-Histogramme pro Route und Dauer der Hardware-Aufrufe (Class_FlaskMetrics)
+# 18-Oct-2026  Walter Rothlin     /get_pixels und /get_status mit ETag (pixel_version von MySenseHat): If-None-Match --> 304, /get_pixels?since=<version>
+# 18-Oct-2026  Walter Rothlin     /stop_message bricht nur die Lauftexte ab, abgebrochene Aufträge geben ' --> cancelled' statt 500
+# 18-Oct-2026  Walter Rothlin     /get_imu startet den IMU-Thread auch bei gleichzeitigen ersten Requests nur einmal (Lock)
+# 18-Oct-2026  Walter Rothlin     ETags auch mit SenseHat ohne pixel_version (Hash der Pixel), /get_status bleibt bewusst schwach
+# 18-Oct-2026  Walter Rothlin     /events liest die LED-Matrix nicht mehr im Request-Thread, nur der MatrixWatcher liest sie
+# 18-Oct-2026  Walter Rothlin     /set_pixels?frame=: auch URL-safe base64, ein nicht URL-kodiertes '+' (kommt als Leerzeichen) geht
+# 18-Oct-2026  Walter Rothlin     SensorSampler und IMU-Thread teilen sich einen Lock für den I2C-Bus (i2c_lock)
 # ------------------------------------------------------------------
 
 from flask import *
-from sense_hat import SenseHat
+from Class_FakeSenseHat import get_sense_hat_class
 from time import sleep
-from datetime import datetime
-import webcolors
 import inspect
+import queue
+import threading
+from concurrent.futures import CancelledError
+import base64
+import binascii
+import json
+import uuid
+import zlib
+from Class_RequestLog import RequestLog
+from waltisLibrary_Colors import convert2RGB, convert_many
+
+SenseHat = get_sense_hat_class()  # SENSE_HAT_BACKEND=fake: FakeSenseHat statt Hardware
 
 # ===========================================
 # globale Variablen
 # ===========================================
 version = 'Walter Rothlin (V1.0)'
-request_log = []
+request_log = RequestLog(capacity=1000, display_size=50, spill_file=None)  # spill_file='request_log.txt': alle Einträge auf Disk
 
 MySenseHat_Classed_used = True
 if MySenseHat_Classed_used:
     from Class_My_SenseHat import *
+from Class_Renderer import Renderer, line_animation, FRAME_KEY
+from Class_TextScroller import TextScroller
+from Class_SensorSampler import SensorSampler
+from Class_EventStream import EventStream, MatrixWatcher
+from Class_IMUStream import IMUStream, SenseHatIMUSource, FILTERED_COLUMNS
+from Class_FlaskMetrics import FlaskMetrics
 
 # ===========================================
 # Common functions for URL-Parameter handling
@@ -166,97 +201,227 @@ def convert2RGB_old(value, default_value=None):
         return default_value
 
 
-def convert2RGB(value, default_value=None):
-    """
-        print(convert2RGB((255,0,128)))        # (255, 0, 128)
-        print(convert2RGB([0,128,255]))        # (0, 128, 255)
-        print(convert2RGB("255,0,128"))        # (255, 0, 128)
-        print(convert2RGB("0 128 255"))        # (0, 128, 255)
-        print(convert2RGB("#ff00ff"))          # (255, 0, 255)
-        print(convert2RGB("ff00ff"))           # (255, 0, 255)
-        print(convert2RGB("red"))              # (255, 0, 0)
-        print(convert2RGB("lightblue"))        # (173, 216, 230)
-        print(convert2RGB(100))                # (100, 100, 100)
-        print(convert2RGB("unknown", default_value=(0,0,0)))  # (0, 0, 0)
-    """
+FRAME_SIZE_RGB = 64 * 3  # 192 Bytes: r, g, b je Pixel, Zeile für Zeile
+
+
+def decode_frame_bytes(data):
+    '''
+    192 bytes (r, g, b per pixel) --> list of 64 [r, g, b]
+    '''
+    if len(data) != FRAME_SIZE_RGB:
+        raise ValueError(f'frame must have {FRAME_SIZE_RGB} bytes, got {len(data)}')
+    return [[data[i], data[i + 1], data[i + 2]] for i in range(0, FRAME_SIZE_RGB, 3)]
+
+
+def decode_frame_json(pixels):
+    '''
+    64 colours ([r, g, b], '#ff0000', 'red', ...) or a flat list with 192 values --> list of 64 [r, g, b]
+    '''
+    if isinstance(pixels, dict):
+        pixels = pixels.get('pixels')
+    if not isinstance(pixels, list):
+        raise ValueError('pixels must be a list')
+    if len(pixels) == FRAME_SIZE_RGB:
+        pixels = [pixels[i:i + 3] for i in range(0, FRAME_SIZE_RGB, 3)]
+    if len(pixels) != 64:
+        raise ValueError('pixels must have 64 colours or 192 values')
+    colours = convert_many(pixels)
+    if None in colours:
+        raise ValueError(f'pixel {colours.index(None)} is not a colour: {pixels[colours.index(None)]}')
+    return [list(colour) for colour in colours]
+
+
+def get_frame_from_request(request):
+    '''
+    Reads a whole LED-Matrix frame from the request:
+        raw body (application/octet-stream, 192 bytes), JSON body, or parameter frame=<base64> / pixels=<JSON>
+    frame= may be standard or URL-safe base64 ('-' and '_'). In a GET-URL an unencoded '+' arrives as a space,
+    so spaces are read as '+'.
+    :return: (list of 64 [r, g, b], encoding)
+    '''
+    if request.mimetype == 'application/octet-stream':
+        return decode_frame_bytes(request.get_data()), 'raw'
+    if request.is_json:
+        return decode_frame_json(request.get_json()), 'json'
+    received_parameter = request.form if request.method == 'POST' else request.args
+    if 'frame' in received_parameter:
+        try:
+            frame = received_parameter['frame'].replace(' ', '+').replace('-', '+').replace('_', '/')
+            data = base64.b64decode(frame, validate=True)
+        except binascii.Error:
+            raise ValueError('frame is not valid base64')
+        return decode_frame_bytes(data), 'base64'
+    if 'pixels' in received_parameter:
+        try:
+            pixels = json.loads(received_parameter['pixels'])
+        except json.JSONDecodeError:
+            raise ValueError('pixels is not valid JSON')
+        return decode_frame_json(pixels), 'json'
+    raise ValueError('no frame: send 192 raw bytes, JSON, frame=<base64> or pixels=<JSON>')
+
+
+def device_job(received_parameter, submit_function, *args, **kwargs):
+    '''
+    Queues a job for the render thread, the only thread which talks to the LED-Matrix.
+    Waits for it unless the URL-Parameter blocking=False is given (then it is dropped if the queue is full).
+        device_job(received_parameter, renderer.submit, sense.clear, colour, coalesce_key=FRAME_KEY)
+    :return: text for the request_log
+    '''
+    blocking = convert2Boolean(received_parameter.get('blocking'), True)
     try:
-        # Bereits Tuple/List mit 3 Elementen
-        if isinstance(value, (tuple, list)) and len(value) == 3:
-            return tuple(int(min(max(0, v), 255)) for v in value)
+        future = submit_function(*args, timeout=None if blocking else 0, **kwargs)
+    except queue.Full:
+        return ' --> Renderer busy, request dropped'
+    if blocking:
+        try:
+            future.result()
+        except CancelledError:
+            return ' --> cancelled'  # z.B. /stop_message während der Lauftext wartet
+        return ''
+    return ' --> queued'
+
+
+def get_etag(*parts):
+    '''
+    ETag aus der Server-ID und z.B. der pixel_version: ETags eines früheren Server-Laufs passen nie.
+    '''
+    return '-'.join([server_id] + [str(part) for part in parts])
 
-        # String-Verarbeitung
-        elif isinstance(value, str):
-            cleaned = value.strip().replace(" ", "").replace("'", "").lower()
 
-            # Hex-Farbe
-            if cleaned.startswith('#'):
-                cleaned = cleaned[1:]
-            if len(cleaned) == 6 and all(c in '0123456789abcdef' for c in cleaned):
-                r = int(cleaned[0:2], 16)
-                g = int(cleaned[2:4], 16)
-                b = int(cleaned[4:6], 16)
-                return (r, g, b)
+def not_modified(etag, weak=False):
+    '''
+    :return: Response 304 Not Modified, falls der Client diese Version schon hat (If-None-Match), sonst None
+    '''
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag, weak)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return None
 
-            # CSS3-Farbname
-            try:
-                rgb = webcolors.name_to_rgb(cleaned)
-                return (rgb.red, rgb.green, rgb.blue)
-            except ValueError:
-                pass  # kein bekannter Name, weitermachen
 
-            # RGB-Komma- oder Leerzeichen-Format
-            cleaned = cleaned.replace("(", "").replace(")", "")
-            print(f'--> cleaned:{cleaned}')
-            if ',' in cleaned:
-                parts = cleaned.split(',')
-            else:
-                parts = cleaned.split()
+def get_pixel_snapshot():
+    '''
+    :return: (version, pixels): pixel_version von MySenseHat, sonst ein Hash der Pixel (z.B. SenseHat ohne MySenseHat)
+    '''
+    if hasattr(sense, 'get_versioned_pixels'):
+        return sense.get_versioned_pixels()
+    pixels = sense.get_pixels()
+    return f'h{zlib.crc32(json.dumps(pixels).encode()):08x}', pixels
 
-            print(f'--> parts:{parts}')
-            if len(parts) != 3:
-                return default_value
-            return tuple(int(min(max(0, int(p)), 255)) for p in parts)
 
-        # Einzelzahl → Grau
-        elif isinstance(value, (int, float)):
-            v = int(min(max(0, int(value)), 255))
-            return (v, v, v)
+def with_etag(response, etag, weak=False):
+    response.set_etag(etag, weak)
+    response.headers['Cache-Control'] = 'no-cache'  # Browser fragen jedes Mal nach (mit If-None-Match)
+    return response
 
-        else:
-            return default_value
 
-    except Exception:
-        return default_value
+def get_sensor_snapshot(request):
+    '''
+    Latest sensor values of the sampler. The sensors are read only if the snapshot is older than max_age (seconds).
+    '''
+    received_parameter, arguments = get_http_parameter(request, 'get_sensor_snapshot')
+    max_age = convert2Float(received_parameter.get('max_age'), None, min=0)
+    return sensor_sampler.get_snapshot(max_age)
 
 
 # ===========================================
 # Application and Endpoints
 # ===========================================
 app = Flask(__name__)
+server_id = uuid.uuid4().hex[:8]  # Teil der ETags
 if MySenseHat_Classed_used:
     sense = MySenseHat()
 else:
     sense = SenseHat()
 
 sense.clear()  # LED-Matrix löschen
+metrics = FlaskMetrics(app, prefix='sense_hat')  # /metrics im Prometheus-Format
+metrics.instrument(sense, [name for name in ('set_pixels', 'set_pixel', 'get_pixels', 'get_pixel', 'clear', 'set_rotation',
+                                             'flip_h', 'flip_v', 'show_letter', 'write_rgb565',
+                                             'get_temperature', 'get_humidity', 'get_pressure') if hasattr(sense, name)])
+renderer = Renderer(sense, fps=25)  # Animationen laufen im Render-Thread, nicht im Request
+text_scroller = TextScroller(sense, renderer, max_bytes=512 * 1024)  # Lauftexte werden nur einmal gerendert
+i2c_lock = threading.Lock()  # Sensoren und IMU hängen am gleichen I2C-Bus: immer nur ein Thread liest
+sensor_sampler = SensorSampler(sense, interval=2.0, bus_lock=i2c_lock)  # Sensoren werden im Hintergrund gelesen, nicht pro Request
+
+
+# ===========================================
+# Server-Sent Events (Sensoren und LED-Matrix)
+# ===========================================
+def sensor_event_data(snapshot):
+    return {'temperature': round(snapshot.temperature, 2),
+            'humidity': round(snapshot.humidity, 2),
+            'pressure': round(snapshot.pressure, 2),
+            'read_at': snapshot.read_at.strftime('%d-%m-%y %H:%M:%S')}
+
+
+def publish_sensor_snapshot(snapshot):
+    global last_sensor_event
+    data = sensor_event_data(snapshot)
+    values = (data['temperature'], data['humidity'], data['pressure'])
+    if values != last_sensor_event:  # nur Änderungen senden
+        last_sensor_event = values
+        event_stream.publish('sensors', data)
+
+
+def initial_events():
+    '''
+    Full state for a new (or too late reconnected) client: all pixels and the latest sensor values.
+    Die LED-Matrix wird hier nicht gelesen (Request-Thread): ohne Frame im MatrixWatcher schickt dessen nächster
+    Durchgang (der Client ist schon gezählt) ohnehin alle Pixel als 'matrix'-Event.
+    '''
+    events = []
+    frame = matrix_watcher.frame
+    if frame is not None:
+        events.append(('matrix', {'pixels': [[index] + list(pixel) for index, pixel in enumerate(frame)], 'full': True}))
+    events.append(('sensors', sensor_event_data(sensor_sampler.get_snapshot())))
+    return events
+
+
+last_sensor_event = None
+event_stream = EventStream(capacity=256, initial_events=initial_events)
+matrix_watcher = MatrixWatcher(sense, event_stream, interval=0.05)
+sensor_sampler.add_listener(publish_sensor_snapshot)
+
+
+@app.route('/events')
+def events():
+    last_event_id = convert2Integer(request.headers.get('Last-Event-ID', request.args.get('last_event_id')), None)
+    request_log.append(f'events(last_event_id={last_event_id})')
+    return Response(stream_with_context(event_stream.stream(last_event_id)),
+                    mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 # ====================
 # Overall-Status
 # ====================
 @app.route('/get_status', methods=['GET'])
 def get_status():
-    request_log.append(f"{datetime.now().strftime('%d-%m-%y %H:%M:%S')}: get_status()")
-    pixel_status = sense.get_pixels()
-    humidity = sense.get_humidity()
-    temperature = sense.get_temperature()
-    pressure = sense.get_pressure()
+    # Bewusst ein schwaches ETag: 'Age' ändert den Body bei jedem Request, ein starkes ETag verlangt gleiche Bytes.
+    # Gleich sind die LED-Matrix und die Sensor-Messung, 'Age' wäre nur neuer.
+    snapshot = get_sensor_snapshot(request)
+    if hasattr(sense, 'pixel_version'):  # ohne pixel_version muss die LED-Matrix für das ETag gelesen werden
+        response = not_modified(get_etag(sense.pixel_version, snapshot.timestamp), weak=True)
+        if response is not None:
+            request_log.append('get_status() --> 304')
+            return response
+
+    pixel_version, pixel_status = get_pixel_snapshot()
+    response = not_modified(get_etag(pixel_version, snapshot.timestamp), weak=True)
+    if response is not None:
+        request_log.append('get_status() --> 304')
+        return response
+    request_log.append('get_status()')
 
     # print(pixel_status)
-    return {'LED_Matrix': pixel_status,
-            'Temperature': {'value': temperature, 'unit': '°C'},
-            'Humidity': {'value': humidity, 'unit': '%'},
-            'Pressure': {'value': pressure, 'unit': 'mBar'},
-            }
+    response = jsonify({'LED_Matrix': pixel_status,
+                        'Temperature': {'value': snapshot.temperature, 'unit': '°C'},
+                        'Humidity': {'value': snapshot.humidity, 'unit': '%'},
+                        'Pressure': {'value': snapshot.pressure, 'unit': 'mBar'},
+                        'Age': {'value': round(snapshot.age, 3), 'unit': 's'},
+                        })
+    return with_etag(response, get_etag(pixel_version, snapshot.timestamp), weak=True)
 
 
 # ====================
@@ -272,9 +437,9 @@ def set_rotation():
         r = 0
 
     print(f'10) set_rotation({r}, {redraw})')
-    sense.set_rotation(r=r, redraw=redraw)
+    arguments += device_job(received_parameter, renderer.submit, sense.set_rotation, r=r, redraw=redraw, coalesce_key='rotation')
 
-    request_log.append(f"{datetime.now().strftime('%d-%m-%y %H:%M:%S')}: {arguments}")
+    request_log.append(arguments)
     return render_template('index.html', version=version, request_log=request_log)
     # return f'set_rotation() not implemented yet!<br/><br/><a href="/">Back</a>'
 
@@ -286,9 +451,9 @@ def flip_h():
     redraw = convert2Boolean(received_parameter.get('redraw'), True)
 
     print(f'20) flip_h({redraw})')
-    sense.flip_h(redraw=redraw)
+    arguments += device_job(received_parameter, renderer.submit, sense.flip_h, redraw=redraw)
 
-    request_log.append(f"{datetime.now().strftime('%d-%m-%y %H:%M:%S')}: {arguments}")
+    request_log.append(arguments)
     return render_template('index.html', version=version, request_log=request_log)
     # return f'flip_h() not implemented yet!<br/><br/><a href="/">Back</a>'
 
@@ -300,23 +465,67 @@ def flip_v():
     redraw = convert2Boolean(received_parameter.get('redraw'), True)
 
     print(f'30) flip_v({redraw})')
-    sense.flip_v(redraw=redraw)
+    arguments += device_job(received_parameter, renderer.submit, sense.flip_v, redraw=redraw)
 
-    request_log.append(f"{datetime.now().strftime('%d-%m-%y %H:%M:%S')}: {arguments}")
+    request_log.append(arguments)
     return render_template('index.html', version=version, request_log=request_log)
     # return f'flip_v() not implemented yet!<br/><br/><a href="/">Back</a>'
 
 
 @app.route('/set_pixels', methods=['GET', 'POST'])
 def set_pixels():
-    return f'set_pixels() not implemented yet!<br/><br/><a href="/">Back</a>'
+    try:
+        frame, encoding = get_frame_from_request(request)
+    except (ValueError, TypeError) as exception:
+        request_log.append(f'set_pixels() --> {exception}')
+        return {'ok': False, 'error': str(exception)}, 400
+
+    # blocking kann in der URL, im Formular oder im JSON-Body mit dem Bild stehen
+    received_parameter = dict(request.args)
+    received_parameter.update(get_http_parameter(request, inspect.currentframe().f_code.co_name)[0])
+    if request.is_json and isinstance(request.get_json(silent=True), dict):
+        received_parameter.update(request.get_json())
+    queued = device_job(received_parameter, renderer.submit_frame, frame)  # ganzes Bild mit einem set_pixels()
+    request_log.append(f'set_pixels({encoding}){queued}')
+    if queued.endswith('dropped'):
+        return {'ok': False, 'error': 'Renderer busy'}, 503
+    return {'ok': True, 'pixels': len(frame), 'encoding': encoding}
 
 
 @app.route('/get_pixels', methods=['GET', 'POST'])
 def get_pixels():
-    request_log.append(f"{datetime.now().strftime('%d-%m-%y %H:%M:%S')}: get_pixels()")
-    pixel_status = sense.get_pixels()
-    return pixel_status
+    '''
+    Alle 64 Pixel als JSON-Liste, mit since=<version> nur die seither geänderten:
+    {"version": 17, "full": false, "pixels": [[index, r, g, b], ...]}
+    Die aktuelle Version steht im Header X-Pixel-Version, If-None-Match mit dem ETag ergibt 304 ohne die LED-Matrix zu lesen.
+    Ohne pixel_version (SenseHat statt MySenseHat) ist die Version ein Hash der Pixel und since liefert immer alle Pixel.
+    '''
+    if hasattr(sense, 'pixel_version'):
+        response = not_modified(get_etag(sense.pixel_version))
+        if response is not None:
+            request_log.append('get_pixels() --> 304')
+            return response
+
+    received_parameter, arguments = get_http_parameter(request, inspect.currentframe().f_code.co_name)
+    since = convert2Integer(received_parameter.get('since'), None)
+    if since is not None and hasattr(sense, 'get_changed_pixels'):
+        pixel_version, changed, full = sense.get_changed_pixels(since)
+        response = jsonify({'version': pixel_version, 'full': full, 'pixels': changed})
+    else:
+        pixel_version, pixel_status = get_pixel_snapshot()
+        if not hasattr(sense, 'pixel_version'):
+            not_modified_response = not_modified(get_etag(pixel_version))
+            if not_modified_response is not None:
+                request_log.append('get_pixels() --> 304')
+                return not_modified_response
+        if since is None:
+            response = jsonify(pixel_status)
+        else:
+            response = jsonify({'version': pixel_version, 'full': True,
+                                'pixels': [[index] + list(pixel) for index, pixel in enumerate(pixel_status)]})
+    request_log.append(arguments)
+    response.headers['X-Pixel-Version'] = str(pixel_version)
+    return with_etag(response, get_etag(pixel_version))
     # return f'get_pixels() not implemented yet!<br/><br/><a href="/">Back</a>'
 
 
@@ -333,12 +542,12 @@ def set_pixel():
 
     if pixel is not None:
         print(f'60) set_pixel({x}, {y}, pixel={pixel})')
-        sense.set_pixel(x, y, pixel)
+        arguments += device_job(received_parameter, renderer.submit, sense.set_pixel, x, y, pixel)
     else:
         print(f'60) set_pixel({x}, {y}, {r}, {g}, {b})')
-        sense.set_pixel(x, y, r, g, b)
+        arguments += device_job(received_parameter, renderer.submit, sense.set_pixel, x, y, r, g, b)
 
-    request_log.append(f"{datetime.now().strftime('%d-%m-%y %H:%M:%S')}: {arguments}")
+    request_log.append(arguments)
     return render_template('index.html', version=version, request_log=request_log)
     # return f'set_pixel() not implemented yet!<br/><br/><a href="/">Back</a>'
 
@@ -363,9 +572,9 @@ def clear():
     colour = convert2RGB(received_parameter.get('colour'), (0, 0, 0))
 
     print(f'40) clear({colour})')
-    sense.clear(colour)
+    arguments += device_job(received_parameter, renderer.submit, sense.clear, colour, coalesce_key=FRAME_KEY)
 
-    request_log.append(f"{datetime.now().strftime('%d-%m-%y %H:%M:%S')}: {arguments}")
+    request_log.append(arguments)
     return render_template('index.html', version=version, request_log=request_log)
     # return f'clear() not implemented yet!<br/><br/><a href="/">Back</a>'
 
@@ -380,13 +589,20 @@ def show_message():
     back_colour = convert2RGB(received_parameter.get('back_colour'), (0, 0, 0))
 
     print(f'1) show_message({text_string}, {scroll_speed}, {text_colour}, {back_colour})')
-    sense.show_message(text_string=text_string, scroll_speed=scroll_speed, text_colour=text_colour, back_colour=back_colour)
+    arguments += device_job(received_parameter, text_scroller.submit_message, text_string, scroll_speed, text_colour, back_colour)
 
-    request_log.append(f"{datetime.now().strftime('%d-%m-%y %H:%M:%S')}: {arguments}")
+    request_log.append(arguments)
     return render_template('index.html', version=version, request_log=request_log)
     # return f'show_message() not implemented yet!<br/><br/><a href="/">Back</a>'
 
 
+@app.route('/stop_message', methods=['GET', 'POST'])
+def stop_message():
+    request_log.append('stop_message()')
+    text_scroller.cancel()  # bricht den laufenden Text ab und verwirft die wartenden, andere Aufträge laufen weiter
+    return render_template('index.html', version=version, request_log=request_log)
+
+
 @app.route('/show_letter', methods=['GET', 'POST'])
 def show_letter():
     received_parameter, arguments = get_http_parameter(request, inspect.currentframe().f_code.co_name)
@@ -396,9 +612,10 @@ def show_letter():
     back_colour = convert2RGB(received_parameter.get('back_colour'), (0, 0, 0))
 
     print(f'2) show_letter({s}, {text_colour}, {back_colour})')
-    sense.show_letter(s=s, text_colour=text_colour, back_colour=back_colour)
+    arguments += device_job(received_parameter, renderer.submit, sense.show_letter, s=s,
+                            text_colour=text_colour, back_colour=back_colour, coalesce_key=FRAME_KEY)
 
-    request_log.append(f"{datetime.now().strftime('%d-%m-%y %H:%M:%S')}: {arguments}")
+    request_log.append(arguments)
     return render_template('index.html', version=version, request_log=request_log)
     # return f'show_letter() not implemented yet!<br/><br/><a href="/">Back</a>'
 
@@ -408,41 +625,51 @@ def show_letter():
 # =====================
 @app.route('/get_temperature', methods=['GET', 'POST'])
 def get_temperature():
-    request_log.append(f"{datetime.now().strftime('%d-%m-%y %H:%M:%S')}: get_temperature()")
-    return {'value': sense.get_temperature(),
-            'units': '°C'}
+    request_log.append('get_temperature()')
+    snapshot = get_sensor_snapshot(request)
+    return {'value': snapshot.temperature,
+            'units': '°C',
+            'age': round(snapshot.age, 3)}
     # return f'get_temperature() not implemented yet!<br/><br/><a href="/">Back</a>'
 
 
 @app.route('/get_pressure')
 def get_pressure():
-    request_log.append(f"{datetime.now().strftime('%d-%m-%y %H:%M:%S')}: get_pressure()")
-    return {'value': sense.get_pressure(),
-            'units': 'mBar'}
+    request_log.append('get_pressure()')
+    snapshot = get_sensor_snapshot(request)
+    return {'value': snapshot.pressure,
+            'units': 'mBar',
+            'age': round(snapshot.age, 3)}
     # return f'get_pressure() not implemented yet!<br/><br/><a href="/">Back</a>'
 
 
 @app.route('/get_humidity')
 def get_humidity():
-    request_log.append(f"{datetime.now().strftime('%d-%m-%y %H:%M:%S')}: get_humidity()")
-    return {'value': sense.get_humidity(),
-            'units': '%'}
+    request_log.append('get_humidity()')
+    snapshot = get_sensor_snapshot(request)
+    return {'value': snapshot.humidity,
+            'units': '%',
+            'age': round(snapshot.age, 3)}
     # return f'get_humidity() not implemented yet!<br/><br/><a href="/">Back</a>'
 
 
 @app.route('/get_meteo_sensor_values')
 def get_meteo_sensor_values():
-    request_log.append(f"{datetime.now().strftime('%d-%m-%y %H:%M:%S')}: get_meteo_sensor_values()")
+    request_log.append('get_meteo_sensor_values()')
+    snapshot = get_sensor_snapshot(request)
     weather_data = {
         'Temperatur': {
-            'value': sense.get_temperature(),
+            'value': snapshot.temperature,
             'units': 'mBar'},
         'Luftdruck': {
-            'value': sense.get_pressure(),
+            'value': snapshot.pressure,
             'units': 'mBar'},
         'Feuchtigkeit': {
-            'value': sense.get_humidity(),
+            'value': snapshot.humidity,
             'units': '%'},
+        'Alter': {
+            'value': round(snapshot.age, 3),
+            'units': 's'},
     }
     return weather_data
     # return f'get_meteo_sensor_values() not implemented yet!<br/><br/><a href="/">Back</a>'
@@ -450,18 +677,49 @@ def get_meteo_sensor_values():
 
 @app.route('/get_weather')
 def get_weather():
-    request_log.append(f"{datetime.now().strftime('%d-%m-%y %H:%M:%S')}: get_weather()")
+    request_log.append('get_weather()')
+    snapshot = get_sensor_snapshot(request)
     return f'''
     <h1>Wetter</h1>
-    Temperatur:&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp; {sense.get_temperature():0.2f}°C<br/>
-    Luftdruck:&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp; {sense.get_pressure():0.2f}mBar<br/>
-    Rel. Feuchtigkeit:&nbsp; {sense.get_humidity():0.2f}%<br/>
+    Temperatur:&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp; {snapshot.temperature:0.2f}°C<br/>
+    Luftdruck:&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp; {snapshot.pressure:0.2f}mBar<br/>
+    Rel. Feuchtigkeit:&nbsp; {snapshot.humidity:0.2f}%<br/>
+    <small>gemessen {snapshot.read_at.strftime('%H:%M:%S')} (vor {snapshot.age:0.1f}s)</small><br/>
 
     <br/><br/><a href="/">Back</a>
     '''
     # return f'get_weather() not implemented yet!<br/><br/><a href="/">Back</a>'
 
 
+imu_stream = None  # wird erst beim ersten /get_imu gestartet (Thread mit 100 Hz)
+imu_stream_lock = threading.Lock()  # gleichzeitige erste Requests starten nur einen Thread
+
+
+@app.route('/get_imu', methods=['GET', 'POST'])
+def get_imu():
+    global imu_stream
+    received_parameter, arguments = get_http_parameter(request, inspect.currentframe().f_code.co_name)
+    request_log.append(arguments)
+    if imu_stream is None:
+        with imu_stream_lock:
+            if imu_stream is None:
+                imu_stream = IMUStream(SenseHatIMUSource(sense, bus_lock=i2c_lock), rate=100, capacity=4096, block_size=10)
+    window = convert2Integer(received_parameter.get('window'), 1, min=1, max=imu_stream.filtered.capacity)
+    samples = imu_stream.filtered.window(window)  # View auf den Ring-Buffer, keine Kopie
+    return {'columns': FILTERED_COLUMNS,
+            'samples': [[round(value, 4) for value in sample] for sample in samples.tolist()],
+            'statistics': imu_stream.statistics}
+
+
+@app.route('/request_log', methods=['GET'])
+def get_request_log():
+    received_parameter, arguments = get_http_parameter(request, inspect.currentframe().f_code.co_name)
+    offset = convert2Integer(received_parameter.get('offset'), 0, min=0)
+    limit = convert2Integer(received_parameter.get('limit'), 50, min=1, max=request_log.capacity)
+    since_id = convert2Integer(received_parameter.get('since_id'), None)
+    return request_log.page(offset, limit, since_id)
+
+
 @app.route('/')
 def index():
     return render_template('index.html', version=version, request_log=request_log)
@@ -482,19 +740,19 @@ def draw_line():
     y_start = convert2Integer(received_parameter.get('y_start'), -1)
     x_end = convert2Integer(received_parameter.get('x_end'), -1)
     y_end = convert2Integer(received_parameter.get('y_end'), -1)
-    r = convert2Integer(received_parameter.get('r'), -1)
-    g = convert2Integer(received_parameter.get('g'), -1)
-    b = convert2Integer(received_parameter.get('b'), -1)
-    draw_speed = convert2Float(received_parameter.get('draw_speed'), 0)
-    pixel = None
-    if pixel is not None:
-        print(f'100) draw_line({x}, {y}, pixel={pixel})')
-        sense.draw_line(x, y, pixel)
+    r = convert2Integer(received_parameter.get('r'), 255, min=0, max=255)
+    g = convert2Integer(received_parameter.get('g'), 255, min=0, max=255)
+    b = convert2Integer(received_parameter.get('b'), 255, min=0, max=255)
+    draw_speed = convert2Float(received_parameter.get('draw_speed'), 0, min=0)
+
+    print(f'100) draw_line({x_start}, {y_start}, {x_end}, {y_end}, {r}, {g}, {b}, {draw_speed})')
+    if draw_speed > 0:
+        arguments += device_job(received_parameter, renderer.submit_animation,
+                                line_animation(sense, x_start, y_start, x_end, y_end, (r, g, b)), frame_time=draw_speed)
     else:
-        print(f'100) draw_line({x_start}, {y_start}, {x_end}, {y_end}, {r}, {g}, {b})')
-        sense.draw_line(x_start, y_start, x_end, y_end, r, g, b, 0.1)
+        arguments += device_job(received_parameter, renderer.submit, sense.draw_line, x_start, y_start, x_end, y_end, r, g, b)
 
-    request_log.append(f"{datetime.now().strftime('%d-%m-%y %H:%M:%S')}: {arguments}")
+    request_log.append(arguments)
     return render_template('index.html', version=version, request_log=request_log)
     # return f'draw_line() not implemented yet!<br/><br/><a href="/">Back</a>'
 
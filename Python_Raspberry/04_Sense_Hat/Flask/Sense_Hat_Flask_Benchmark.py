@@ -0,0 +1,297 @@
+#!/usr/bin/python3
+
+# ------------------------------------------------------------------
+# Name  : Sense_Hat_Flask_Benchmark.py
+# https://raw.githubusercontent.com/walter-rothlin/RaspberryPi4PiPlates/refs/heads/main/Python_Raspberry/04_Sense_Hat/Flask/Sense_Hat_Flask_Benchmark.py
+#
+# Description: Last-Test und Latenz-Benchmark für die REST-Services von Sense_Hat_Flask.py
+#              Alle Endpoints, die in templates/index.html dokumentiert sind, werden mit steigender Parallelität
+#              aufgerufen, einmal über den Flask test_client (ohne Netzwerk) und einmal über einen lokalen
+#              Socket-Server (werkzeug, threaded). Pro Endpoint: Durchsatz und Latenz p50/p95/p99.
+#              Die Resultate werden als JSON gespeichert und können mit einem früheren Lauf verglichen werden:
+#
+#                  python3 Sense_Hat_Flask_Benchmark.py --output benchmark_V1.json
+#                  python3 Sense_Hat_Flask_Benchmark.py --output benchmark_V2.json --compare benchmark_V1.json
+#                  SENSE_HAT_BACKEND=fake python3 Sense_Hat_Flask_Benchmark.py       (ohne Sense-Hat, Class_FakeSenseHat)
+#
+# Autor: Walter Rothlin
+#
+# History:
+# 18-Oct-2026  Walter Rothlin     Initial Version
+# 18-Oct-2026  Walter Rothlin     Ausgaben der App und werkzeug-Access-Logs während des Laufs unterdrückt, nur die Resultate
+# ------------------------------------------------------------------
+
+import argparse
+import contextlib
+import html
+import json
+import logging
+import os
+import platform
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', 'index.html')
+SKIPPED = ('/events',)  # Server-Sent Events: Stream ohne Ende
+
+
+# ===========================================
+# Endpoints
+# ===========================================
+def documented_endpoints(template=TEMPLATE):
+    '''
+    Alle lokalen Links aus index.html (ohne Duplikate, in der Reihenfolge der Seite).
+    Animationen (draw_speed, show_message) werden mit blocking=False aufgerufen: gemessen wird der Request, nicht die Animation.
+    '''
+    with open(template, encoding='utf-8') as file:
+        links = re.findall(r'href="(/[^"]*)"', file.read())
+    endpoints = []
+    for link in links:
+        url = html.unescape(link)
+        if url.split('?')[0] in SKIPPED:
+            continue
+        if ('draw_speed=' in url or url.startswith('/show_message')) and 'blocking=' not in url:
+            url += '&blocking=False'
+        url = urllib.parse.quote(url, safe='/?&=%:,+')
+        if url not in endpoints:
+            endpoints.append(url)
+    return endpoints
+
+
+# ===========================================
+# Clients
+# ===========================================
+def test_client_sender(app):
+    '''
+    :return: function(url) --> status code, über den Flask test_client (ein Client pro Thread)
+    '''
+    local = threading.local()
+
+    def send(url):
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        response = local.client.get(url)
+        response.close()
+        return response.status_code
+    return send
+
+
+class SocketServer:
+    '''
+    Die App in einem lokalen werkzeug-Server (threaded, freier Port) in einem Daemon-Thread.
+    '''
+    def __init__(self, app, host='127.0.0.1', port=0):
+        from werkzeug.serving import make_server
+        self.__server = make_server(host, port, app, threaded=True)
+        self.__thread = threading.Thread(target=self.__server.serve_forever, name='SocketServer', daemon=True)
+        self.__thread.start()
+
+    def get_base_url(self):
+        return f'http://{self.__server.host}:{self.__server.port}'
+
+    base_url = property(get_base_url)
+
+    def sender(self):
+        base_url = self.base_url
+
+        def send(url):
+            try:
+                with urllib.request.urlopen(base_url + url, timeout=30) as response:
+                    response.read()
+                    return response.status
+            except urllib.error.HTTPError as error:
+                return error.code
+        return send
+
+    def stop(self):
+        self.__server.shutdown()
+        self.__thread.join()
+
+
+# ===========================================
+# Messung
+# ===========================================
+def percentile(sorted_values, q):
+    '''
+    Nearest-Rank Perzentil einer sortierten Liste (q in Prozent).
+    '''
+    if not sorted_values:
+        return None
+    rank = max(int(-(-q * len(sorted_values) // 100)), 1)  # ceil(q/100 * n)
+    return sorted_values[rank - 1]
+
+
+def run_load(send, url, concurrency=1, requests=100):
+    '''
+    requests Aufrufe von url mit concurrency parallelen Clients.
+    :return: dict mit Durchsatz (Requests/s) und Latenzen in ms
+    '''
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def worker(count):
+        own = []
+        own_errors = 0
+        for _ in range(count):
+            start = time.perf_counter()
+            try:
+                status = send(url)
+            except Exception:
+                status = None
+            own.append(time.perf_counter() - start)
+            if status is None or status >= 500:
+                own_errors += 1
+        with lock:
+            latencies.extend(own)
+            errors[0] += own_errors
+
+    counts = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, counts))
+    duration = time.perf_counter() - start
+    latencies.sort()
+    to_ms = lambda value: None if value is None else round(value * 1000, 3)
+    return {'requests': len(latencies),
+            'errors': errors[0],
+            'duration': round(duration, 4),
+            'throughput': round(len(latencies) / duration, 1) if duration else None,
+            'p50': to_ms(percentile(latencies, 50)),
+            'p95': to_ms(percentile(latencies, 95)),
+            'p99': to_ms(percentile(latencies, 99)),
+            'max': to_ms(latencies[-1] if latencies else None)}
+
+
+def run_benchmark(app, endpoints, modes=('test_client', 'socket'), concurrency_levels=(1, 4, 16), requests=100, verbal=True,
+                  file=None):
+    '''
+    :param file: Ausgabe der Resultate (verbal), default sys.stdout
+    :return: list of dict (endpoint, mode, concurrency + Resultat von run_load())
+    '''
+    results = []
+    server = SocketServer(app) if 'socket' in modes else None
+    try:
+        for mode in modes:
+            send = test_client_sender(app) if mode == 'test_client' else server.sender()
+            for url in endpoints:
+                send(url)  # Warm-up (Caches, Lazy-Start von Threads)
+                for concurrency in concurrency_levels:
+                    result = {'endpoint': url, 'mode': mode, 'concurrency': concurrency}
+                    result.update(run_load(send, url, concurrency, requests))
+                    results.append(result)
+                    if verbal:
+                        print(format_result(result), file=file)
+    finally:
+        if server is not None:
+            server.stop()
+    return results
+
+
+def format_result(result):
+    return (f"{result['mode']:11s} c={result['concurrency']:<3d} {result['throughput']:9.1f} req/s  "
+            f"p50 {result['p50']:8.2f}  p95 {result['p95']:8.2f}  p99 {result['p99']:8.2f} ms  "
+            f"err {result['errors']:<4d} {result['endpoint'][:70]}")
+
+
+# ===========================================
+# Resultate (JSON) und Vergleich
+# ===========================================
+def create_report(results, version=None):
+    return {'version': version,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'host': platform.node(),
+            'machine': platform.machine(),
+            'python': platform.python_version(),
+            'backend': os.environ.get('SENSE_HAT_BACKEND', 'hardware'),
+            'results': results}
+
+
+def compare_reports(old_report, new_report, threshold=0.2):
+    '''
+    Vergleicht zwei Reports (gleicher Endpoint, Modus und Parallelität).
+    :param threshold: relative Verschlechterung ab der ein Eintrag als Regression gilt (0.2 = 20%)
+    :return: list of dict (endpoint, mode, concurrency, throughput_ratio, p95_ratio, regression)
+    '''
+    old_results = {(result['endpoint'], result['mode'], result['concurrency']): result for result in old_report['results']}
+    comparison = []
+    for result in new_report['results']:
+        old = old_results.get((result['endpoint'], result['mode'], result['concurrency']))
+        if old is None:
+            continue
+        throughput_ratio = result['throughput'] / old['throughput'] if old['throughput'] else None
+        p95_ratio = result['p95'] / old['p95'] if old['p95'] else None
+        regression = ((throughput_ratio is not None and throughput_ratio < 1 - threshold) or
+                      (p95_ratio is not None and p95_ratio > 1 + threshold))
+        comparison.append({'endpoint': result['endpoint'], 'mode': result['mode'], 'concurrency': result['concurrency'],
+                           'throughput_ratio': None if throughput_ratio is None else round(throughput_ratio, 3),
+                           'p95_ratio': None if p95_ratio is None else round(p95_ratio, 3),
+                           'regression': regression})
+    return comparison
+
+
+# ===========================================
+# Tests
+# ===========================================
+def Test_Benchmark(do_test=True):
+    if do_test:
+        print('Test_Benchmark()....', end='')
+        assert percentile(list(range(1, 101)), 50) == 50 and percentile(list(range(1, 101)), 99) == 99
+        assert percentile([7], 95) == 7 and percentile([], 50) is None
+
+        calls = []
+        result = run_load(lambda url: calls.append(url) or (500 if len(calls) == 3 else 200), '/x', concurrency=4, requests=10)
+        assert result['requests'] == 10 and len(calls) == 10 and result['errors'] == 1
+
+        endpoints = documented_endpoints()
+        assert '/get_status' in endpoints and '/events' not in endpoints
+        assert all('blocking=' in url for url in endpoints if url.startswith('/show_message'))
+
+        old = create_report([{'endpoint': '/a', 'mode': 'socket', 'concurrency': 1, 'throughput': 100.0, 'p95': 10.0}])
+        new = create_report([{'endpoint': '/a', 'mode': 'socket', 'concurrency': 1, 'throughput': 70.0, 'p95': 10.5}])
+        assert compare_reports(old, new)[0]['regression'] and not compare_reports(old, old)[0]['regression']
+        print('... done')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Last-Test und Latenz-Benchmark für Sense_Hat_Flask.py')
+    parser.add_argument('--modes', default='test_client,socket', help='test_client und/oder socket')
+    parser.add_argument('--concurrency', default='1,4,16', help='Anzahl paralleler Clients, z.B. 1,4,16')
+    parser.add_argument('--requests', type=int, default=100, help='Requests pro Endpoint und Parallelität')
+    parser.add_argument('--filter', default=None, help='nur Endpoints die auf diese Regex passen, z.B. set_pixel|get_status')
+    parser.add_argument('--output', default=None, help='Resultate als JSON in diese Datei')
+    parser.add_argument('--compare', default=None, help='früherer JSON-Report zum Vergleich')
+    parser.add_argument('--test', action='store_true', help='nur die Selbst-Tests ausführen')
+    arguments = parser.parse_args()
+
+    Test_Benchmark(True)
+    if not arguments.test:
+        # die App schreibt pro Request auf stdout und werkzeug loggt jeden Request: nur die Resultate ausgeben
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        console = sys.stdout
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            import Sense_Hat_Flask
+
+            endpoints = [url for url in documented_endpoints() if arguments.filter is None or re.search(arguments.filter, url)]
+            results = run_benchmark(Sense_Hat_Flask.app, endpoints,
+                                    modes=arguments.modes.split(','),
+                                    concurrency_levels=[int(value) for value in arguments.concurrency.split(',')],
+                                    requests=arguments.requests, file=console)
+        report = create_report(results, Sense_Hat_Flask.version)
+        if arguments.output:
+            with open(arguments.output, 'w') as file:
+                json.dump(report, file, indent=2)
+            print(f'Resultate: {arguments.output}')
+        if arguments.compare:
+            with open(arguments.compare) as file:
+                for entry in compare_reports(json.load(file), report):
+                    marker = 'REGRESSION' if entry['regression'] else ''
+                    print(f"{entry['mode']:11s} c={entry['concurrency']:<3d} throughput x{entry['throughput_ratio']}  "
+                          f"p95 x{entry['p95_ratio']}  {marker:10s} {entry['endpoint'][:70]}")
@@ -6,6 +6,9 @@
 #   Programm zur auswahl von Temperatur, Luftdruck, Luftfeuchtigkeit, LED-Ansteuern
 #   08.07.2025
 #   Erweiterung des Programm mit Schönsheitsanpassungen
+#   18.10.2026 (Walter Rothlin)
+#   Bewusst ohne /events (Server-Sent Events): eigener Flask-Server direkt auf dem Sense-Hat, kein Client von
+#   Sense_Hat_Flask und ohne Polling. Jede Seite liest beim Aufruf einen Wert, eine Live-Anzeige gibt es nicht.
 #*************************
 
 
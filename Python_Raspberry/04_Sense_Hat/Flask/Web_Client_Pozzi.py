@@ -11,9 +11,10 @@
 #
 # History:  
 # 08-Jul-2025   Beni Pozzi      Initial Version
+# 18-Oct-2026   Walter Rothlin  /events: leitet die Server-Sent Events von Sense_Hat_Flask weiter, die Seite pollt /status nicht mehr
 # ------------------------------------------------------------------
 
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, request, Response
 import requests
 
 app = Flask(__name__, template_folder='data')
@@ -80,5 +81,28 @@ def status():
         # Rückgabe einer schwarzen Matrix als Fallback
         return jsonify([[0,0,0]]*64)
 
+@app.route('/events')
+def events():
+    # Eine offene Verbindung zu Sense_Hat_Flask statt Polling: der Stream wird unverändert an den Browser weitergegeben.
+    # Die Last-Event-ID des Browsers geht mit, nach einem Verbindungsabbruch kommen nur die verpassten Events.
+    headers = {}
+    if request.headers.get('Last-Event-ID'):
+        headers['Last-Event-ID'] = request.headers['Last-Event-ID']
+    try:
+        upstream = requests.get(f"http://{ip}:{port}/events", headers=headers, stream=True, timeout=(2, None))
+    except Exception as e:
+        print("Fehler beim Verbinden mit /events:", e)
+        return Response("retry: 5000\n\n", mimetype='text/event-stream')  # Browser versucht es in 5s wieder
+
+    def relay():
+        try:
+            for chunk in upstream.iter_content(chunk_size=None):
+                yield chunk
+        finally:
+            upstream.close()
+
+    return Response(relay(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=8080, debug=True)
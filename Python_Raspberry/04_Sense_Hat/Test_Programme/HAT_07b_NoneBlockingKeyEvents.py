@@ -10,44 +10,61 @@
 #
 # History:  
 # 02-Jul-2019	Walter Rothlin		Initial Version
+# 18-Oct-2026	Walter Rothlin		Joystick mit asyncio (Class_JoystickStream) statt get_events() Polling
 # ------------------------------------------------------------------
 
 from sense_hat import *
-from time      import sleep
+import asyncio
+from Class_JoystickStream import JoystickStream
 
 
 sense = SenseHat()
 x = 0
 y = 0
 direction = "right"
-while (True):
-    for event in sense.stick.get_events():
-       direction = event.direction
-    if (direction == "left"):
-        x = x - 1
-        if (x < 0):
-            x = 0
-    if (direction == "right"):
-        x = x + 1
-        if (x > 7):
-            x = 7
-    if (direction == "up"):
-        y = y - 1
-        if (y < 0):
-            y = 0
-    if (direction == "down"):
-        y = y + 1
-        if (y > 7):
-            y = 7
-
-    sense.clear()
-    sense.set_pixel(x,y,255,0,0)
-    sleep(0.3)
-
-
-
-
-
-#    print("Check for Event....")
-#    for event in sense.stick.get_events():
-#        print("The joystick was {} {}".format(event.action, event.direction))
+
+
+async def steuern(joystick):
+    # Richtung vom Joy-Stick übernehmen (gedrückt oder gehalten)
+    global direction
+    async for event in joystick.subscribe(actions=("pressed", "held")):
+        direction = event.direction
+
+
+async def protokollieren(joystick):
+    # zweiter Subscriber: zeigt alle Events an
+    async for event in joystick.subscribe():
+        print("The joystick was {} {}".format(event.action, event.direction))
+
+
+async def bewegen():
+    global x, y
+    while (True):
+        if (direction == "left"):
+            x = x - 1
+            if (x < 0):
+                x = 0
+        if (direction == "right"):
+            x = x + 1
+            if (x > 7):
+                x = 7
+        if (direction == "up"):
+            y = y - 1
+            if (y < 0):
+                y = 0
+        if (direction == "down"):
+            y = y + 1
+            if (y > 7):
+                y = 7
+
+        sense.clear()
+        sense.set_pixel(x,y,255,0,0)
+        await asyncio.sleep(0.3)
+
+
+async def main():
+    async with JoystickStream(sense.stick) as joystick:
+        await asyncio.gather(steuern(joystick), protokollieren(joystick), bewegen())
+
+
+asyncio.run(main())
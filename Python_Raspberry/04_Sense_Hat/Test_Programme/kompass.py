@@ -11,9 +11,12 @@
 #
 # History:  
 # 17-Apr-2018	Walter Rothlin		Initial Version
+# 18-Oct-2026	Walter Rothlin		Heading from the IMUStream (100 Hz, filtered, tilt compensated)
 # ------------------------------------------------------------------
 
+from time import sleep
 from sense_hat import SenseHat 
+from Class_IMUStream import IMUStream, SenseHatIMUSource
 
  
 # To get good results with the magnetometer you must first calibrate it using 
@@ -35,16 +38,21 @@ prev_y = 0
 dirStrOld = ""
  
 led_degree_ratio = len(led_loop) / 360.0 
+imu_stream = IMUStream(SenseHatIMUSource(sense), rate=100, block_size=10)
  
  
 while True: 
-    dir = sense.get_compass()
+    sleep(0.1)  # the stream filters a block of 10 samples every 0.1 s
+    latest = imu_stream.filtered.latest()
+    if latest is None:
+        continue
+    dir = latest['heading']
     dirStr = "{dir:4.0f}".format(dir=dir)
     if (dirStr != dirStrOld):
         print(dirStr)
     dirStrOld = dirStr
     dir_inverted = 360 - dir  # So LED appears to follow North 
-    led_index = int(led_degree_ratio * dir_inverted) 
+    led_index = int(led_degree_ratio * dir_inverted) % len(led_loop) 
     offset = led_loop[led_index] 
  
  
@@ -14,6 +14,10 @@
 # History:
 # 18-Jun-2024   Walter Rothlin      Initial Version
 # 08-Jul-2025   Walter Rothlin      Fixed issues
+# 18-Oct-2026   Walter Rothlin      Question mark and Sanduhr from a precompiled SpriteAtlas (cached in ~/.cache)
+# 18-Oct-2026   Walter Rothlin      Messages with pre-rendered, cached frames (TextScroller)
+# 18-Oct-2026   Walter Rothlin      Sprites without disk cache: two 8x8 bitmaps compile faster than a pickle loads,
+#                                   changes below are always used and no user-writable file is unpickled at boot
 # ------------------------------------------------------------------
 from time      import sleep
 from datetime  import *
@@ -21,6 +25,8 @@ from sense_hat import SenseHat
 import os
 import sys
 from clone_repo import *
+from Class_SpriteAtlas import *
+from Class_TextScroller import TextScroller
 
 red      = [255,   0,   0]
 green    = [  0, 255,   0]
@@ -33,39 +39,36 @@ white    = [255, 255, 255]
 grey     = [100, 100, 100]
 
 
+def get_sprite_atlas():
+    atlas = SpriteAtlas()  # nur im Speicher, die RGB565-Frames werden beim ersten blit() gepackt
+    atlas.add_sprite('question_mark', [
+        '___XX___',
+        '__X__X__',
+        '_____X__',
+        '____X___',
+        '___X____',
+        '___X____',
+        '________',
+        '___X____'], palette=(black, yellow))
+
+    atlas.add_sprite('sanduhr', [
+        '_X____X_',
+        '__X__X__',
+        '___XX___',
+        '___XX___',
+        '___XX___',
+        '___XX___',
+        '__X__X__',
+        '_X____X_'], palette=(black, green))
+    return atlas
+
+
 def draw_question_mark(fg_color=yellow, bg_color=black):
-    X = fg_color
-    _ = bg_color
-
-    question_mark = [
-    _, _, _, X, X, _, _, _,
-    _, _, X, _, _, X, _, _,
-    _, _, _, _, _, X, _, _,
-    _, _, _, _, X, _, _, _,
-    _, _, _, X, _, _, _, _,
-    _, _, _, X, _, _, _, _,
-    _, _, _, _, _, _, _, _,
-    _, _, _, X, _, _, _, _
-    ]
-
-    sense.set_pixels(question_mark)
+    sprites.blit(sense, 'question_mark', palette=(bg_color, fg_color))
+
 
 def draw_sanduhr(fg_color=green, bg_color=black):
-    x = fg_color
-    _ = bg_color
-
-    sanduhr = [
-    _, x, _, _, _, _, x, _,
-    _, _, x, _, _, x, _, _,
-    _, _, _, x, x, _, _, _,
-    _, _, _, x, x, _, _, _,
-    _, _, _, x, x, _, _, _,
-    _, _, _, x, x, _, _, _,
-    _, _, x, _, _, x, _, _,
-    _, x, _, _, _, _, x, _
-    ]
-
-    sense.set_pixels(sanduhr)
+    sprites.blit(sense, 'sanduhr', palette=(bg_color, fg_color))
 
 def get_ip_addresses():
     output = os.popen('/bin/hostname -I').read().strip()
@@ -98,7 +101,7 @@ def get_date_time_str(with_date=True, with_time=True):
     
 
 def get_yes_no(promt):
-    sense.show_message(str(promt), scroll_speed=0.08, text_colour=[255, 255, 0])
+    scroller.show_message(str(promt), scroll_speed=0.08, text_colour=[255, 255, 0])
     event = sense.stick.wait_for_event(emptybuffer=True)
     if event.action == "pressed":
         if event.direction == "middle":
@@ -110,10 +113,12 @@ def get_yes_no(promt):
 # Hauptprogramm
 # =============
 sense = SenseHat()
+sprites = get_sprite_atlas()
+scroller = TextScroller(sense)
 
 
 sense.clear()
-sense.show_message("V1.0 Connecting to WiFi....", text_colour=red)
+scroller.show_message("V1.0 Connecting to WiFi....", text_colour=red)
 
 
 do_loop = True
@@ -124,21 +129,21 @@ while do_loop:
     if event.action == "pressed":
     
         if event.direction == "middle":
-            sense.show_message(get_ips_str(), text_colour=blue)
+            scroller.show_message(get_ips_str(), text_colour=blue)
             do_loop = False
-            sense.show_message("Bye!", scroll_speed=0.08, text_colour=[0, 255, 0])
+            scroller.show_message("Bye!", scroll_speed=0.08, text_colour=[0, 255, 0])
 
         elif event.direction == "left":
-            sense.show_message(get_date_time_str(), scroll_speed=0.08, text_colour=[0, 255, 0])
+            scroller.show_message(get_date_time_str(), scroll_speed=0.08, text_colour=[0, 255, 0])
             
         elif event.direction == "right":
             if get_yes_no("Update RPi from Git?"):
-                sense.show_message("YES", scroll_speed=0.08, text_colour=[0, 255, 0])
+                scroller.show_message("YES", scroll_speed=0.08, text_colour=[0, 255, 0])
                 draw_sanduhr()
                 clone_them()
                 sense.clear()
             else:
-                sense.show_message("NO", scroll_speed=0.08, text_colour=[255, 0, 0])
+                scroller.show_message("NO", scroll_speed=0.08, text_colour=[255, 0, 0])
                     
             
         elif event.direction == "up":
@@ -146,13 +151,13 @@ while do_loop:
             pressure = sense.get_pressure()
             humidity = sense.get_humidity()
 
-            sense.show_message(f"Temperatur: {temperatur:0.1f}C  Luftdruck: {pressure:0.0f}mBar  Rel. Feuchte: {humidity:0.0f}%", scroll_speed=0.08, text_colour=[0, 255, 0])
+            scroller.show_message(f"Temperatur: {temperatur:0.1f}C  Luftdruck: {pressure:0.0f}mBar  Rel. Feuchte: {humidity:0.0f}%", scroll_speed=0.08, text_colour=[0, 255, 0])
             
         elif event.direction == "down":
-            sense.show_message(get_ips_str(), text_colour=blue)
+            scroller.show_message(get_ips_str(), text_colour=blue)
             
 
 
                 
-sense.show_message('Tschüss!!!!', text_colour=blue)
+scroller.show_message('Tschüss!!!!', text_colour=blue)
 sense.clear()  
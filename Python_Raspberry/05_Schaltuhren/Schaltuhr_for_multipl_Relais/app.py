@@ -16,9 +16,22 @@ except Exception:
         def cleanup(self): pass
     GPIO = _FakeGPIO()
 
+# Optional: /metrics (Prometheus) mit Class_FlaskMetrics aus My_Packages, falls im Python-Pfad
+try:
+    from Class_FlaskMetrics import FlaskMetrics
+except ImportError:
+    FlaskMetrics = None
+
+import scheduler
 from scheduler import start_scheduler, update_schedule, set_relay_state
 
 app = Flask(__name__, template_folder='templates', static_folder='static')
+
+if FlaskMetrics is not None:
+    metrics = FlaskMetrics(app, prefix='schaltuhr')
+    metrics.instrument(scheduler, ('set_relay_state',))  # auch die Aufrufe aus dem Scheduler-Thread
+    set_relay_state = scheduler.set_relay_state
+
 CONFIG_FILE = "config.json"
 
 # Load or create config
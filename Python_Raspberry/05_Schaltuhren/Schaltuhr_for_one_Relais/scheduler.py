@@ -17,6 +17,16 @@ except Exception:
         def cleanup(self): pass
     GPIO = _FakeGPIO()
 
+# Zeit nur über clock: SystemClock aus My_Packages (falls im Python-Pfad), in Simulationen eine VirtualClock
+try:
+    from Class_TickScheduler import SystemClock
+    clock = SystemClock()
+except ImportError:
+    class _SystemClock:
+        def now(self): return datetime.now()
+        def sleep(self, seconds): time.sleep(seconds)
+    clock = _SystemClock()
+
 RELAY_PIN = 17
 CONFIG_FILE = "config.json"
 schedules = []
@@ -49,7 +59,7 @@ def start_scheduler():
     logging.info("Scheduler started with schedules: %s", schedules)
     last_min = None
     while True:
-        now = datetime.now()
+        now = clock.now()
         current_hm = now.strftime("%H:%M")
         weekday = now.weekday()  # 0=Mon .. 6=Sun
         # only act when minute changes to avoid repeated toggles in same minute
@@ -67,4 +77,4 @@ def start_scheduler():
                             logging.info("Scheduled OFF - %s", entry)
                 except Exception as e:
                     logging.exception("Error processing schedule entry: %s", e)
-        time.sleep(5)
+        clock.sleep(5)
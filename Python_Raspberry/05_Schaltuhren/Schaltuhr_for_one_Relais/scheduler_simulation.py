@@ -0,0 +1,106 @@
+#!/usr/bin/python3
+
+# ------------------------------------------------------------------
+# Name  : scheduler_simulation.py
+#
+# Description: Simulation des Scheduler-Loops (scheduler.py) mit VirtualClock und FakeGPIO aus My_Packages:
+#              zwei Wochen Schaltzeiten und die Zeitumstellungen laufen in Sekunden, jede Flanke des Relais
+#              wird mit der virtuellen Zeit geprüft.
+#
+#                  PYTHONPATH=../../../My_Packages python3 scheduler_simulation.py
+#
+# Autor: Walter Rothlin
+#
+# History:
+# 18-Oct-2026   Walter Rothlin      Initial Version
+# ------------------------------------------------------------------
+
+import json
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from Class_VirtualClock import VirtualClock, FakeGPIO, SimulationEnd, NS_PER_SECOND
+import scheduler
+
+TIME_ZONE = ZoneInfo('Europe/Zurich')
+SCHEDULES = [
+    {"start": "07:00", "end": "08:00", "weekdays": [0, 1, 2, 3, 4], "name": "Morgens (Mo-Fr)"},
+    {"start": "19:00", "end": "22:00", "weekdays": [4, 5, 6], "name": "Abend (Fr-Sa-So)"},
+    {"start": "02:30", "end": "03:30", "weekdays": [6], "name": "Nacht (So)"},
+]
+
+
+def simulate(start, until, schedules=SCHEDULES):
+    '''
+    Lässt start_scheduler() von start bis until laufen (lokale Zeit, Europe/Zurich).
+    :return: list of (datetime, on) der Flanken des Relais
+    '''
+    directory = tempfile.mkdtemp(prefix='schaltuhr_')
+    config_file = os.path.join(directory, 'config.json')
+    with open(config_file, 'w') as f:
+        json.dump({"schedules": schedules, "state": False}, f)
+
+    clock = VirtualClock(start=start, until=until)
+    gpio = FakeGPIO(clock)
+    gpio.setup(scheduler.RELAY_PIN, gpio.OUT)
+    scheduler.clock = clock
+    scheduler.GPIO = gpio
+    scheduler.CONFIG_FILE = config_file
+    try:
+        scheduler.start_scheduler()
+    except SimulationEnd:
+        pass
+    finally:
+        os.remove(config_file)
+        os.rmdir(directory)
+
+    return [(datetime.fromtimestamp(edge.time_ns / NS_PER_SECOND, TIME_ZONE).replace(tzinfo=None), edge.value == gpio.HIGH)
+            for edge in gpio.edges_of(scheduler.RELAY_PIN)]
+
+
+def Test_two_weeks(do_test=True):
+    if do_test:
+        print('Test_two_weeks()....', end='')
+        start = datetime(2026, 11, 2)  # Montag
+        edges = simulate(start, start + timedelta(weeks=2))
+        on = [when for when, state in edges if state]
+        off = [when for when, state in edges if not state]
+        assert len(on) == 2 * (5 + 3 + 1) and len(off) == len(on), edges
+        assert all(when.second < 5 for when, state in edges)  # spätestens 5s nach der Schaltzeit
+        assert [when.strftime('%a %H:%M') for when in on[:3]] == ['Mon 07:00', 'Tue 07:00', 'Wed 07:00']
+        print('... done')
+
+
+def Test_DST(do_test=True):
+    '''
+    Sommerzeit: 02:30 gibt es am 29.3.2026 nicht, das Relais wird erst um 03:30 geschaltet (aus).
+    Winterzeit: 02:30 gibt es am 25.10.2026 zweimal, das Relais wird zweimal eingeschaltet (nur eine Flanke).
+    '''
+    if do_test:
+        print('Test_DST()....', end='')
+        edges = simulate(datetime(2026, 3, 29, 0, 0), datetime(2026, 3, 29, 6, 0))
+        assert edges == [], edges
+        edges = simulate(datetime(2026, 10, 25, 0, 0), datetime(2026, 10, 25, 6, 0))
+        assert [(when.strftime('%H:%M'), state) for when, state in edges] == [('02:30', True), ('03:30', False)], edges
+        print('... done')
+
+
+def Benchmark_scheduler(do_test=True, weeks=4):
+    if do_test:
+        print(f'Benchmark_scheduler(weeks={weeks})....')
+        start = datetime(2026, 11, 2)
+        begin = time.perf_counter()
+        edges = simulate(start, start + timedelta(weeks=weeks))
+        duration = time.perf_counter() - begin
+        print(f'     {len(edges)} Flanken in {duration:.2f}s: {weeks * 7 / duration:.1f} simulierte Tage/s')
+        print('... done')
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.WARNING)
+    Test_two_weeks(True)
+    Test_DST(True)
+    Benchmark_scheduler(True)
@@ -11,6 +11,10 @@
 #    mkdir -p /home/pi/logs
 #    crontab -e
 #    @reboot /usr/bin/python3 /home/pi/bin/Bahnhof_Mutter_Uhr.py >> /home/pi/logs/mutter_uhr.log 2>&1 &
+#
+# Module aus My_Packages (Class_FlaskMetrics, Class_TickScheduler, Class_ClockFanout, Class_PulseJournal, Class_VirtualClock):
+#    Läuft das Programm aus dem Repository (auch über einen Link in ~/bin), wird My_Packages selbst in sys.path eingetragen.
+#    Für eine Kopie in ~/bin legt setup_links_and_cron.sh Links auf die Module in ~/bin an.
 
 #
 # Autor: Walter Rothlin
@@ -21,20 +25,58 @@
 # 28-Aug-2025   Walter Rothlin      Added nice Frontend
 # 29-Aug-2025   Walter Rothlin      Startable via crontab, Uhr richten
 # 26-Sep-2025   Walter Rothlin      Added Lampe on/off Relais
+# 18-Oct-2026   Walter Rothlin      /metrics: Requests, Latenz-Histogramme und Dauer der GPIO-Aufrufe (Class_FlaskMetrics)
+# 18-Oct-2026   Walter Rothlin      Ticks von Class_TickScheduler (monotone Uhr, erkennt Zeitsprünge), Jitter-Histogramm in /status_JSON
+# 18-Oct-2026   Walter Rothlin      /set_time blockiert nicht mehr: Korrektur-Pulse im Ticker-Thread (catch_up), Fortschritt und ETA in /status_JSON
+# 18-Oct-2026   Walter Rothlin      Journal der Pulse (Class_PulseJournal): nach Neustart wird die Nebenuhr automatisch nachgestellt
+# 18-Oct-2026   Walter Rothlin      Zeit nur noch über clock (SystemClock oder VirtualClock für Simulationen), FakeGPIO ohne RPi.GPIO,
+#                                   Sommer-/Winterzeit: 60 Pulse nachholen bzw. 60 Ticks aussetzen
+# 18-Oct-2026   Walter Rothlin      Mehrere Nebenuhren (CLOCK_LINES, Class_ClockFanout): Polarität, Anzeige und Journal je Linie,
+#                                   ein GPIO-Aufruf pro Puls für alle Linien, /lines_JSON meldet nachgehende Linien
+# 18-Oct-2026   Walter Rothlin      Neustart mit Uhrzeit vor dem letzten Puls im Journal (NTP noch nicht synchronisiert):
+#                                   die Nebenuhren warten statt fast 12 Stunden nachzustellen
+# 18-Oct-2026   Walter Rothlin      /set_time übernimmt jede Anzeige, eine vorgehende Nebenuhr wartet (MAX_AHEAD_MINUTES),
+#                                   bei zu grosser Differenz wird das laufende Nachstellen abgebrochen
+# 18-Oct-2026   Walter Rothlin      Findet My_Packages auch beim Start über crontab (sys.path, Links in setup_links_and_cron.sh)
+# 18-Oct-2026   Walter Rothlin      Zeitsprung vorwärts: die verpassten Minuten modulo 12 Stunden nachstellen, nicht jede einzeln
 # ------------------------------------------------------------------
-import RPi.GPIO as GPIO
-import time
-import threading
-from datetime import datetime
+import os
+import sys
+MY_PACKAGES_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..', '..', 'My_Packages'))
+if os.path.isdir(MY_PACKAGES_DIR) and MY_PACKAGES_DIR not in sys.path:
+    sys.path.append(MY_PACKAGES_DIR)  # crontab startet ohne PYTHONPATH
+
+try:
+    import RPi.GPIO as GPIO
+except ImportError:
+    from Class_VirtualClock import FakeGPIO  # ohne Raspberry Pi: zeichnet die Flanken auf (Bahnhof_MutterUhr_Simulation.py)
+    GPIO = FakeGPIO()
+from datetime import datetime, timezone
 from flask import Flask, request, jsonify, render_template, redirect, url_for
 import socket
+from Class_FlaskMetrics import FlaskMetrics
+from Class_TickScheduler import TickScheduler, SystemClock
+from Class_ClockFanout import FanoutDriver, format_minute, MINUTES_PER_DIAL
 
 # === Globale Variablen ===
 GPIO_PIN_Min_Clock = 26  # Pin-Definition for Min-Clock Relais (BCM-Nummerierung)
 GPIO_PIN_Lampe_On_Off = 19  # Pin-Definition for Lampe on/off     (BCM-Nummerierung)
-current_state = False  # Anfangszustand
+PULSE_INTERVAL_SECONDS = 1.0  # schnellste Pulsfolge, der die Nebenuhr folgen kann (Uhr richten)
+MAX_CATCH_UP_MINUTES = 100  # /set_time: grössere Differenzen werden nicht nachgestellt
+MAX_AHEAD_MINUTES = 60  # eine Nebenuhr, die höchstens so viel vorgeht, wartet auf die Zeit (statt fast 12 Stunden nachzustellen)
+JOURNAL_FILE = '/home/pi/logs/mutter_uhr.journal'  # Polarität und angezeigte Minute nach jedem Puls
+CLOCK_LINES = [  # Nebenuhren: je Linie ein Relais (BCM-Nummerierung) und ein Journal (None: ohne)
+    {"name": "Nebenuhr", "pin": GPIO_PIN_Min_Clock, "journal": JOURNAL_FILE},
+    # {"name": "Perron 1", "pin": 20, "journal": '/home/pi/logs/mutter_uhr_perron_1.journal'},
+]
+fanout = None  # FanoutDriver der Nebenuhren, siehe open_lines()
 tick_controler = None
 aktion_aktiv = True
+clock = SystemClock()  # alle Zeitabfragen und Wartezeiten, in Simulationen eine VirtualClock
+last_utc_offset = None  # Minuten, ändert bei Sommer-/Winterzeit
+hold_ticks = 0  # so viele Ticks aussetzen (Umstellung auf Winterzeit)
+waiting_for_time_sync = False  # Uhrzeit vor dem letzten Puls im Journal: die Nebenuhren warten, siehe resync_slave_clock()
+metrics = FlaskMetrics(prefix='mutter_uhr')  # /metrics im Prometheus-Format, init_app() weiter unten
 
 last_timer_config = {
     "func": None,
@@ -44,13 +86,14 @@ last_timer_config = {
 }
 
 
+@metrics.timed('switch_gpio')
 def switchGPIO():
-    global current_state
-    current_state = not current_state
-    if current_state:
-        GPIO.output(GPIO_PIN_Min_Clock, GPIO.LOW)
-    else:
-        GPIO.output(GPIO_PIN_Min_Clock, GPIO.HIGH)
+    fanout.tick()  # eine Minute weiter: ein Puls auf allen Linien, ein GPIO-Aufruf
+
+
+@metrics.timed('pulse_lagging_lines')
+def pulse_lagging_lines():
+    fanout.step()  # Uhr richten: ein Puls nur auf den nachgehenden Linien
 
 
 def tickArgs(count=10, delay=1):
@@ -58,7 +101,7 @@ def tickArgs(count=10, delay=1):
     for x in range(count):
         print('.', end='', flush=True)
         switchGPIO()
-        time.sleep(delay)
+        clock.sleep(delay)
     print()
     return "done"
 
@@ -66,9 +109,7 @@ def tickArgs(count=10, delay=1):
 def TEST_01():
     print('TEST_01 running....')
     GPIO.setmode(GPIO.BCM)
-    GPIO.setup(GPIO_PIN_Min_Clock, GPIO.OUT)
-    print(f'Set GPIO_PIN_Min_Clock:{GPIO_PIN_Min_Clock} to HIGH (Off)')
-    GPIO.output(GPIO_PIN_Min_Clock, GPIO.HIGH)
+    open_lines(CLOCK_LINES)
     do_loop = True
     while do_loop:
         antwort = input('Weiter (s=stopp):')
@@ -77,7 +118,7 @@ def TEST_01():
         else:
             switchGPIO()
 
-    time.sleep(5)
+    clock.sleep(5)
 
     tickArgs(count=5, delay=1)
 
@@ -85,70 +126,104 @@ def TEST_01():
     GPIO.output(GPIO_PIN_Min_Clock, GPIO.LOW)
 
 
-# === Timer-Klasse ===
-class timer_controler:
-    def __init__(self, func, interval_seconds=60, *args, **kwargs):
-        self.func = func
-        self.interval_seconds = interval_seconds
-        self.args = args
-        self.kwargs = kwargs
-        self.stop_event = threading.Event()
-        self.thread = threading.Thread(target=self.run, daemon=True)
-        self.thread.start()
-        self.next_tick = None
-
-    def run(self):
-        now = datetime.now()
-        epoch_seconds = int(now.timestamp())
-        next_epoch = ((epoch_seconds // self.interval_seconds) + 1) * self.interval_seconds
-        self.next_tick = datetime.fromtimestamp(next_epoch)
-
-        delay = (self.next_tick - datetime.now()).total_seconds()
-        if delay > 0:
-            print(f"Warte {delay:.3f}s bis zum ersten Tick bei {self.next_tick.strftime('%Y-%m-%d %H:%M:%S')}")
-            if self.stop_event.wait(timeout=delay):
-                print("Timer wurde vor dem ersten Tick gestoppt.")
-                return
-
-        while not self.stop_event.is_set():
-            now = datetime.now()
-            print(f"{now.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]}: Tick! ", end='')
-
-            try:
-                self.func(*self.args, **self.kwargs)
-            except Exception as e:
-                print(f"Fehler beim Aufruf der User-Function: {e}")
-
-            now = datetime.now()
-            epoch_seconds = int(now.timestamp())
-            next_epoch = ((epoch_seconds // self.interval_seconds) + 1) * self.interval_seconds
-            self.next_tick = datetime.fromtimestamp(next_epoch)
-
-            delay = (self.next_tick - datetime.now()).total_seconds()
-            if delay < 0:
-                delay = 0
-
-            if self.stop_event.wait(timeout=delay):
-                print("Timer wurde gestoppt.")
-                break
-
-    def stop(self):
-        self.stop_event.set()
-        self.thread.join()
+# === Beispiel einer User-Funktion ===
+def get_utc_offset_minutes():
+    utc_now = datetime.fromtimestamp(clock.time_ns() / 1e9, timezone.utc).replace(tzinfo=None)
+    return round((clock.now() - utc_now).total_seconds() / 60)
 
 
-# === Beispiel einer User-Funktion ===
 def meine_aktion(name, wert=0):
-    global aktion_aktiv
+    global aktion_aktiv, last_utc_offset, hold_ticks
     if not aktion_aktiv:
         print(f">> Tick für {name} übersprungen (Status: suspendiert)")
         return
+    if waiting_for_time_sync:
+        fanout.advance(1)  # die Soll-Zeit läuft mit der Uhrzeit weiter, die Nebenuhren stehen
+        # der NTP-Schritt hat die Soll-Zeit schon weitergestellt (ticks_missed), dann wird nachgestellt
+        if journal_ahead_seconds() > 0:
+            print(f">> Tick für {name} ausgesetzt (warte auf Zeit-Synchronisation)")
+        else:
+            resync_slave_clock()
+        return
+
+    # Sommerzeit: die Nebenuhr muss 60 Minuten vorwärts, Winterzeit: sie wartet 60 Minuten
+    utc_offset = get_utc_offset_minutes()
+    if last_utc_offset is not None and utc_offset != last_utc_offset:
+        change = utc_offset - last_utc_offset
+        print(f">> Zeitumstellung um {change} Minuten")
+        if change > 0:
+            fanout.advance(change)
+            request_catch_up()
+        else:
+            hold_ticks += -change
+    last_utc_offset = utc_offset
+    if hold_ticks > 0:
+        hold_ticks -= 1
+        print(f">> Tick für {name} ausgesetzt (Zeitumstellung, noch {hold_ticks})")
+        return
 
     print(f">> Tick für {name} ...", end='')
     switchGPIO()
     print(f"   ...ausgeführt!\n")
 
 
+def open_lines(lines):
+    '''
+    Die Nebenuhren: Polarität und Anzeige aus dem Journal jeder Linie, ohne Journal wird angenommen, dass sie richtig geht.
+    '''
+    global fanout
+    now = clock.now()
+    fanout = FanoutDriver(GPIO, target_minute=(now.hour % 12) * 60 + now.minute, clock=clock, max_ahead=MAX_AHEAD_MINUTES)
+    for line in lines:
+        clock_line = fanout.add_line(line["name"], line["pin"], journal_path=line.get("journal"))
+        print(f'{clock_line.name} (GPIO {clock_line.pin}): zeigt {format_minute(clock_line.displayed_minute)}, Polarität {clock_line.polarity}')
+
+
+def request_catch_up():
+    '''
+    Der Ticker-Thread sendet so viele Pulse, wie die am meisten nachgehende Linie braucht (im Takt PULSE_INTERVAL_SECONDS).
+    '''
+    tick_controler.cancel_catch_up()
+    tick_controler.catch_up(fanout.pending)
+
+
+def ticks_missed(missed):
+    '''
+    Zeitsprung vorwärts (NTP nach dem Booten, Uhrzeit gestellt) oder Prozess angehalten: die Soll-Zeit springt um die
+    verpassten Minuten. Das Zifferblatt zeigt 12 Stunden, also werden nur missed % 720 Pulse gesendet
+    (24 Stunden: 0 Pulse statt 1440).
+    '''
+    fanout.advance(missed % MINUTES_PER_DIAL)
+    if not waiting_for_time_sync:  # beim Warten stellt resync_slave_clock() nach
+        request_catch_up()
+
+
+def journal_ahead_seconds():
+    '''
+    :return: Sekunden, die der letzte Puls in einem Journal nach der aktuellen Uhrzeit liegt, 0: Uhrzeit plausibel
+    '''
+    now_ns = clock.time_ns()
+    return max([(line.journal.last.timestamp_ns - now_ns) / 1e9 for line in fanout.lines
+                if line.journal is not None and line.journal.last is not None] + [0])
+
+
+def resync_slave_clock():
+    '''
+    Nach dem Start: die Minuten seit dem letzten Puls im Journal jeder Linie nachholen (im Ticker-Thread).
+    Liegt die Uhrzeit vor dem letzten Puls (Raspberry Pi ohne RTC, @reboot vor NTP), zeigen die Nebenuhren mehr als
+    die Uhrzeit: statt fast 12 Stunden nachzustellen, warten sie, bis die Uhrzeit den letzten Puls erreicht hat.
+    '''
+    global waiting_for_time_sync
+    ahead_seconds = journal_ahead_seconds()
+    waiting_for_time_sync = ahead_seconds > 0
+    if waiting_for_time_sync:
+        print(f"Uhrzeit {ahead_seconds:.0f}s vor dem letzten Puls im Journal (NTP noch nicht synchronisiert?): Nebenuhren warten")
+        return
+    for name in fanout.lagging:
+        print(f"{name}: {fanout.line(name).lag(fanout.target_minute)} Minuten nachstellen")
+    request_catch_up()
+
+
 def get_ip():
     s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     try:
@@ -168,6 +243,7 @@ clock_started = True
 clock_suspended = True
 
 
+@metrics.timed('set_lampen_relais')
 def set_lampen_relais(state: bool):
     global lampen_status
     lampen_status = state
@@ -177,19 +253,39 @@ def set_lampen_relais(state: bool):
 
 # === Flask Webserver ===
 app = Flask(__name__, template_folder="/home/pi/Waltis_Repo_Clone/RaspberryPi4PiPlates/Python_Raspberry/Bahnhofuhr/Python_On_RaspberryPi/templates")
+metrics.init_app(app)
 
 
 @app.route("/")
 def index():
-    now = datetime.now()
+    now = clock.now()
     print(f'lampe_an={lampen_status}, clock_started={clock_started}, clock_suspended={clock_suspended}')
     return render_template("index.html",
                            lampe_an=lampen_status,
                            clock_started=clock_started,
                            aktion_aktiv=aktion_aktiv,
+                           lines=fanout.status if fanout else [],
                            server_time=now.strftime("%d.%B %Y %H:%M:%S"))
 
 
+def create_tick_controler(start=True):
+    '''
+    start=False: der Tick-Loop läuft erst mit tick_controler.run() im aufrufenden Thread (Simulation mit VirtualClock)
+    '''
+    return TickScheduler(
+        last_timer_config["func"],
+        last_timer_config["interval_seconds"],
+        args=last_timer_config["args"],
+        kwargs=last_timer_config["kwargs"],
+        pulse_func=pulse_lagging_lines,
+        pulse_interval=PULSE_INTERVAL_SECONDS,
+        catch_up_missed=False,  # nicht jeden verpassten Tick einzeln, siehe ticks_missed()
+        missed_func=ticks_missed,
+        clock=clock,
+        start=start
+    )
+
+
 @app.route('/start_timer', methods=['POST'])
 def start_timer(direct_called=False):
     global lampen_status
@@ -204,12 +300,7 @@ def start_timer(direct_called=False):
         else:
             return redirect(url_for("index"))
 
-    tick_controler = timer_controler(
-        last_timer_config["func"],
-        last_timer_config["interval_seconds"],
-        *last_timer_config["args"],
-        **last_timer_config["kwargs"]
-    )
+    tick_controler = create_tick_controler()
 
     if direct_called:
         return {"status": "already running", "message": "Timer läuft bereits."}
@@ -258,24 +349,48 @@ def status_JSON():
 
     aktion_status = "aktiv" if aktion_aktiv else "suspendiert"
     return {
-        "01_current_time": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "01_current_time": clock.now().strftime('%Y-%m-%d %H:%M:%S'),
         "02_next_tick": next_tick,
         "03_timer_status": status,
         "04_aktion_status": aktion_status,
         "05_interval_seconds": interval,
+        "06_ticks": tick_controler.statistics if tick_controler else None,  # Jitter in ms gegenüber hh:mm:00.000
+        "07_catch_up": tick_controler.catch_up_status if tick_controler else None,  # Uhr richten: Fortschritt und ETA
+        "08_displayed_time": {line["name"]: line["displayed_time"] for line in fanout.status} if fanout else "N/A",
+        "09_lagging_lines": fanout.lagging if fanout else [],  # Details in /lines_JSON
+    }
+
+
+@app.route('/lines_JSON', methods=['GET'])
+def lines_JSON():
+    '''
+    Status jeder Linie: Anzeige, Rückstand (lag_minutes) und Pulse, nachgehende Linien in "02_lagging_lines".
+    '''
+    if fanout is None:
+        return {"01_target_time": "N/A", "02_lagging_lines": [], "03_catch_up": None, "04_lines": [], "05_statistics": None}
+    return {
+        "01_target_time": format_minute(fanout.target_minute),  # was alle Nebenuhren zeigen sollen
+        "02_lagging_lines": fanout.lagging,
+        "03_catch_up": tick_controler.catch_up_status if tick_controler else None,
+        "04_lines": fanout.status,
+        "05_statistics": fanout.statistics,
     }
 
 
 @app.route("/set_time", methods=["POST"])
 def set_time():
     display_time = request.form.get("user_time")
-    if display_time:
+    line_name = request.form.get("line")  # eine Linie richten, leer: alle Linien
+    names = [line_name] if line_name else None
+    if line_name and line_name not in [line.name for line in fanout.lines]:
+        print(f"Linie {line_name} unbekannt: Uhr wird nicht gerichtet!")
+    elif display_time:
         display_hour, display_minutes = display_time.split(':')
         display_hour = int(display_hour) % 12
         display_total_minutes = display_hour * 60 + int(display_minutes)
         print(f"Angezeigte Zeit: {display_time}   {display_hour}::{display_minutes}  --> {display_total_minutes}")
 
-        now = datetime.now()
+        now = clock.now()
         ist_time = f"{now.strftime('%H:%M')}"
         ist_hour, ist_minutes = ist_time.split(':')
         ist_hour = int(ist_hour) % 12
@@ -284,14 +399,24 @@ def set_time():
 
         count_of_forward_ticks = (ist_total_minutes - display_total_minutes) % (12 * 60)  # innerhalb von 12h
         print(f"{count_of_forward_ticks} Minuten vorwärts stellen")
-        if count_of_forward_ticks > 100:
-            count_of_forward_ticks = 0
+        too_big = count_of_forward_ticks > MAX_CATCH_UP_MINUTES
+        if count_of_forward_ticks > 12 * 60 - MAX_AHEAD_MINUTES:
+            ret_str = f"Uhr geht {12 * 60 - count_of_forward_ticks} Minuten vor und wartet!"
+        elif too_big:
             ret_str = f"Zeitdifferenz zu gross!!! Suspend Ticks!"
         else:
             ret_str = f"Uhr {count_of_forward_ticks} Minuten vorgestellt!"
 
-        # z. B. an deine Timer-/GPIO-Logik weiterleiten
-        tickArgs(count=count_of_forward_ticks, delay=1)
+        # Die Pulse sendet der Ticker-Thread (im Takt PULSE_INTERVAL_SECONDS) nur auf den nachgehenden Linien,
+        # Minuten-Ticks dazwischen werden eingereiht. Eine vorgehende Linie erhält keine Pulse, bis die Zeit sie erreicht.
+        if tick_controler and not tick_controler.stop_event.is_set():
+            fanout.set_displayed(display_total_minutes, names)  # die Anzeige ist jetzt bekannt, auch eine korrigierte
+            if too_big:
+                tick_controler.cancel_catch_up()  # kein Nachstellen aus dem alten Stand
+            else:
+                request_catch_up()
+        else:
+            print("Timer gestoppt: Uhr wird nicht gerichtet!")
     # return ret_str
     return redirect(url_for("index"))
 
@@ -319,19 +444,18 @@ if __name__ == '__main__':
 
     # Initialisiere Standard-Konfiguration
     GPIO.setmode(GPIO.BCM)
-    GPIO.setup(GPIO_PIN_Min_Clock, GPIO.OUT)
-    print(f'Set GPIO_PIN_Min_Clock:{GPIO_PIN_Min_Clock} to HIGH (Off)')
-    GPIO.output(GPIO_PIN_Min_Clock, GPIO.HIGH)
+    open_lines(CLOCK_LINES)  # Relais der Nebenuhren mit der Polarität aus dem Journal
 
     GPIO.setup(GPIO_PIN_Lampe_On_Off, GPIO.OUT)
     set_lampen_relais(True)
     last_timer_config["func"] = meine_aktion
     start_timer(direct_called=True)
+    resync_slave_clock()
 
     try:
         host_ip = get_ip()
         print(f"Starte Flask auf {host_ip}:5001")
-        time.sleep(3)
+        clock.sleep(3)
         set_lampen_relais(False)
         # app.run(debug=True, host=host_ip, port=5001, use_reloader=False)
         app.run(host="0.0.0.0", port=5001, debug=False, use_reloader=False)
@@ -339,4 +463,5 @@ if __name__ == '__main__':
         print("Beendet durch Nutzer, stoppe Timer...")
         if tick_controler:
             tick_controler.stop()
+        fanout.close()
         print("Timer beendet.")
@@ -0,0 +1,298 @@
+#!/usr/bin/python3
+
+# ------------------------------------------------------------------
+# Name  : Bahnhof_MutterUhr_Simulation.py
+# Source: https://raw.githubusercontent.com/walter-rothlin/RaspberryPi4PiPlates/master/Python_Raspberry/Bahnhofuhr/Python_On_RaspberryPi/Bahnhof_MutterUhr_Simulation.py
+#
+# Description: Simulation der Mutteruhr (Bahnhof_MutterUhr.py) mit einer VirtualClock (Class_VirtualClock):
+#              Wochen, Sommer-/Winterzeit, Uhr richten (/set_time) und Neustart mit Journal laufen in Sekunden.
+#              Die Pulse werden vom FakeGPIO mit der virtuellen Zeit aufgezeichnet und geprüft:
+#                  - jeder Minuten-Puls genau auf hh:mm:00.000
+#                  - nie zwei Pulse näher als PULSE_INTERVAL_SECONDS, Polarität immer abwechselnd
+#                  - am Ende zeigen alle Nebenuhren die lokale Zeit
+#                  - mehrere Linien: ein GPIO-Aufruf pro Puls, nur die nachgehende Linie wird gerichtet
+#
+#                  python3 Bahnhof_MutterUhr_Simulation.py
+#
+# Autor: Walter Rothlin
+#
+# History:
+# 18-Oct-2026   Walter Rothlin      Initial Version
+# 18-Oct-2026   Walter Rothlin      Mehrere Nebenuhren (CLOCK_LINES), Test_lines
+# 18-Oct-2026   Walter Rothlin      Test_restart_before_time_sync: Neustart mit Uhrzeit vor dem Journal
+# 18-Oct-2026   Walter Rothlin      Test_set_time_corrected: falsch gerichtet, danach die richtige (vorgehende) Anzeige
+# 18-Oct-2026   Walter Rothlin      Test_clock_step: Zeitsprung um 24 Stunden bzw. fast 12 Stunden ohne Nachstellen
+# ------------------------------------------------------------------
+
+import contextlib
+import io
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from Class_VirtualClock import VirtualClock, FakeGPIO, SimulationEnd, NS_PER_SECOND
+import Bahnhof_MutterUhr as uhr
+
+MINUTE_NS = 60 * NS_PER_SECOND
+
+
+# ===========================================
+# Simulation
+# ===========================================
+def simulate(start, until, journal_path=None, actions=(), lines=None, verbal=False):
+    '''
+    Lässt die Mutteruhr von start bis until laufen (lokale Zeit, Europe/Zurich).
+    :param journal_path: Journal wie auf dem Raspberry Pi (Neustart), None: die Nebenuhr zeigt beim Start die richtige Zeit
+    :param lines: Nebenuhren wie CLOCK_LINES, default eine Linie mit journal_path
+    :param actions: list of (datetime, function, args), z.B. ein Request auf /set_time
+    :return: FakeGPIO mit den Flanken
+    '''
+    clock = VirtualClock(start=start, until=until)
+    uhr.clock = clock
+    uhr.aktion_aktiv = True
+    uhr.last_utc_offset = None
+    uhr.hold_ticks = 0
+    uhr.waiting_for_time_sync = False
+    if lines is None:
+        lines = [{"name": "Nebenuhr", "pin": uhr.GPIO_PIN_Min_Clock, "journal": journal_path}]
+    with contextlib.nullcontext() if verbal else contextlib.redirect_stdout(io.StringIO()):
+        gpio = FakeGPIO(clock)
+        uhr.GPIO = gpio
+        uhr.open_lines(lines)
+        uhr.last_timer_config["func"] = uhr.meine_aktion
+        uhr.tick_controler = uhr.create_tick_controler(start=False)
+        for when, function, args in actions:
+            clock.call_at(when, function, *args)
+
+        uhr.resync_slave_clock()
+        try:
+            uhr.tick_controler.run()
+        except SimulationEnd:
+            pass
+    uhr.fanout.close()
+    return gpio
+
+
+def displayed_is_local_time():
+    now = uhr.clock.now()
+    return all(line.displayed_minute == (now.hour % 12) * 60 + now.minute for line in uhr.fanout.lines)
+
+
+def check_pulses(edges, pulse_interval=uhr.PULSE_INTERVAL_SECONDS):
+    '''
+    :return: Anzahl Pulse, die nicht auf hh:mm:00.000 liegen (Nachstellen)
+    '''
+    assert all(edge.value != previous.value for previous, edge in zip(edges, edges[1:])), 'Polarität nicht abwechselnd'
+    gaps = [edge.time_ns - previous.time_ns for previous, edge in zip(edges, edges[1:])]
+    assert not gaps or min(gaps) >= pulse_interval * NS_PER_SECOND, f'Pulse zu nahe: {min(gaps)}ns'
+    return len([edge for edge in edges if edge.time_ns % MINUTE_NS != 0])
+
+
+# ===========================================
+# Tests
+# ===========================================
+def Test_weeks(do_test=True, weeks=2):
+    if do_test:
+        print(f'Test_weeks(weeks={weeks})....', end='')
+        start = datetime(2026, 11, 2, 6, 30, 20)
+        gpio = simulate(start, start + timedelta(weeks=weeks))
+        edges = gpio.edges
+        assert len(edges) == weeks * 7 * 24 * 60 and check_pulses(edges) == 0, len(edges)
+        assert displayed_is_local_time() and uhr.tick_controler.statistics['jitter_ms']['max'] == 0.0
+        print('... done')
+
+
+def Test_summer_time(do_test=True):
+    if do_test:
+        print('Test_summer_time()....', end='')
+        start = datetime(2026, 3, 28, 12, 0)
+        gpio = simulate(start, start + timedelta(days=1, seconds=30))  # 23 Stunden
+        edges = gpio.edges
+        # um 03:00 60 Minuten im Sekundentakt nachstellen, der Tick um 03:01 wird eingereiht
+        assert len(edges) == 23 * 60 + 60 and check_pulses(edges) == 60, len(edges)
+        caught_up = [edge for edge in edges if edge.time_ns % MINUTE_NS != 0]
+        assert caught_up[-1].time_ns - caught_up[0].time_ns == 60 * NS_PER_SECOND
+        assert displayed_is_local_time()
+        print('... done')
+
+
+def Test_winter_time(do_test=True):
+    if do_test:
+        print('Test_winter_time()....', end='')
+        start = datetime(2026, 10, 24, 12, 0)
+        gpio = simulate(start, start + timedelta(days=1, seconds=30))  # 25 Stunden
+        edges = gpio.edges
+        assert len(edges) == 25 * 60 - 60 and check_pulses(edges) == 0, len(edges)
+        # die Nebenuhr bleibt eine Stunde auf 02:59 stehen: zwischen 02:59 (Sommerzeit) und 03:00 (Winterzeit) kein Puls
+        gaps = [edge.time_ns - previous.time_ns for previous, edge in zip(edges, edges[1:])]
+        assert max(gaps) == 61 * MINUTE_NS and gaps.count(MINUTE_NS) == len(gaps) - 1
+        assert displayed_is_local_time()
+        print('... done')
+
+
+def Test_set_time(do_test=True):
+    if do_test:
+        print('Test_set_time()....', end='')
+        start = datetime(2026, 11, 3, 9, 58)
+        client = uhr.app.test_client()
+        responses = []
+        set_time = lambda: responses.append(client.post('/set_time', data={'user_time': '09:15'}).status_code)
+        gpio = simulate(start, start + timedelta(hours=1, seconds=30), actions=[(datetime(2026, 11, 3, 10, 0, 30), set_time, ())])
+        edges = gpio.edges
+        assert responses == [302]
+        assert len(edges) == 60 + 45, len(edges)  # 45 Minuten nachgestellt, der Tick um 10:01 wird eingereiht
+        check_pulses(edges)
+        assert all(edge.time_ns % MINUTE_NS == 0 for edge in edges[-56:])  # ab 10:02 wieder im Minutentakt
+        assert uhr.tick_controler.catch_up_status['progress_percent'] == 100.0
+        assert displayed_is_local_time()
+        print('... done')
+
+
+def Test_restart(do_test=True):
+    if do_test:
+        print('Test_restart()....', end='')
+        directory = tempfile.mkdtemp(prefix='mutter_uhr_')
+        path = os.path.join(directory, 'mutter_uhr.journal')
+        start = datetime(2026, 11, 4, 8, 0)
+        before = simulate(start, start + timedelta(hours=2, seconds=30), journal_path=path).edges
+        # Stromausfall von 10:00 bis 13:30, danach Neustart: 210 Minuten nachstellen
+        after = simulate(datetime(2026, 11, 4, 13, 30, 5), datetime(2026, 11, 4, 14, 0, 30), journal_path=path).edges
+        assert len(before) == 120 and len(after) == 210 + 30, len(after)
+        assert after[0].value != before[-1].value  # Polarität aus dem Journal
+        check_pulses(after)
+        assert all(edge.time_ns % MINUTE_NS == 0 for edge in after[-27:])  # ab 13:34 wieder im Minutentakt
+        assert displayed_is_local_time()
+        os.remove(path)
+        os.rmdir(directory)
+        print('... done')
+
+
+def Test_restart_before_time_sync(do_test=True):
+    '''
+    Neustart um 10:20 (letzter Puls 10:00), die Uhrzeit des Raspberry Pi ist 30 Minuten zurück (09:50, noch kein NTP):
+    die Nebenuhr wartet, nach dem NTP-Schritt werden die 20 Minuten nachgestellt.
+    Ohne NTP (Neustart 10:35, letzter Puls 10:40) steht sie bis die Uhrzeit 10:40 erreicht.
+    '''
+    if do_test:
+        print('Test_restart_before_time_sync()....', end='')
+        directory = tempfile.mkdtemp(prefix='mutter_uhr_')
+        path = os.path.join(directory, 'mutter_uhr.journal')
+        start = datetime(2026, 11, 4, 8, 0)
+        simulate(start, start + timedelta(hours=2, seconds=30), journal_path=path)
+        ntp_step = datetime(2026, 11, 4, 9, 52, 10)
+        after = simulate(datetime(2026, 11, 4, 9, 50, 5), datetime(2026, 11, 4, 10, 40, 30), journal_path=path,
+                         actions=[(ntp_step, lambda: uhr.clock.step(30 * 60), ())]).edges
+        synced = (ntp_step + timedelta(minutes=30)).replace(tzinfo=ZoneInfo('Europe/Zurich'))
+        assert after[0].time_ns > synced.timestamp() * NS_PER_SECOND  # wartet auf NTP, dann 20 Minuten nachstellen
+        assert len(after) == 40, len(after)  # 10:00 --> 10:40
+        check_pulses(after)
+        assert displayed_is_local_time()
+
+        # ohne NTP: die Nebenuhr steht bis 10:40 (Uhrzeit des Raspberry Pi) und läuft dann im Minutentakt
+        after = simulate(datetime(2026, 11, 4, 10, 35, 5), datetime(2026, 11, 4, 10, 50, 30), journal_path=path).edges
+        assert len(after) == 10 and check_pulses(after) == 0, len(after)  # 10:41 .. 10:50
+        assert displayed_is_local_time()
+        os.remove(path)
+        os.rmdir(directory)
+        print('... done')
+
+
+def Test_lines(do_test=True):
+    '''
+    Vier Nebenuhren, Perron 2 wird um 08:00:30 auf 07:50 gerichtet: nur diese Linie erhält die 10 Korrektur-Pulse.
+    '''
+    if do_test:
+        print('Test_lines()....', end='')
+        lines = [{"name": name, "pin": pin} for name, pin in (("Halle", 26), ("Perron 1", 20), ("Perron 2", 21), ("Perron 3", 16))]
+        start = datetime(2026, 11, 5, 7, 58)
+        client = uhr.app.test_client()
+        reports = []
+        set_time = lambda: client.post('/set_time', data={'user_time': '07:50', 'line': 'Perron 2'})
+        report = lambda: reports.append(client.get('/lines_JSON').get_json())
+        actions = [(datetime(2026, 11, 5, 8, 0, 30), set_time, ()),
+                   (datetime(2026, 11, 5, 8, 0, 35, 500000), report, ()),  # 6 von 10 Pulsen gesendet
+                   (datetime(2026, 11, 5, 8, 2), report, ())]
+        gpio = simulate(start, datetime(2026, 11, 5, 8, 30, 30), actions=actions, lines=lines)
+        ticks = 32  # 07:59 .. 08:30
+        assert [len(gpio.edges_of(line["pin"])) for line in lines] == [ticks, ticks, ticks + 10, ticks]
+        assert gpio.output_calls == ticks + 10 == len({edge.time_ns for edge in gpio.edges})  # ein Aufruf pro Puls
+        check_pulses(gpio.edges_of(21))
+        assert reports[0]["02_lagging_lines"] == ["Perron 2"], reports[0]
+        assert [line["lag_minutes"] for line in reports[0]["04_lines"]] == [0, 0, 4, 0] and reports[1]["02_lagging_lines"] == []
+        assert displayed_is_local_time()
+        print('... done')
+
+
+def Test_set_time_corrected(do_test=True):
+    '''
+    Perron 2 wird um 08:00:30 aus Versehen auf 07:50 gerichtet (zeigt aber 08:00). Nach 3 Pulsen zeigt sie 08:03, das wird
+    um 08:00:32.5 eingegeben: das Nachstellen wird abgebrochen, Perron 2 wartet bis 08:03 und geht am Ende richtig.
+    '''
+    if do_test:
+        print('Test_set_time_corrected()....', end='')
+        lines = [{"name": name, "pin": pin} for name, pin in (("Halle", 26), ("Perron 2", 21))]
+        start = datetime(2026, 11, 5, 7, 58)
+        client = uhr.app.test_client()
+        reports = []
+        set_time = lambda user_time: client.post('/set_time', data={'user_time': user_time, 'line': 'Perron 2'})
+        report = lambda: reports.append(client.get('/lines_JSON').get_json())
+        actions = [(datetime(2026, 11, 5, 8, 0, 30), set_time, ('07:50',)),
+                   (datetime(2026, 11, 5, 8, 0, 32, 500000), set_time, ('08:03',)),
+                   (datetime(2026, 11, 5, 8, 0, 40), report, ())]
+        gpio = simulate(start, datetime(2026, 11, 5, 8, 30, 30), actions=actions, lines=lines)
+        ticks = 32  # 07:59 .. 08:30
+        assert len(gpio.edges_of(26)) == ticks
+        assert len(gpio.edges_of(21)) == ticks + 3 - 3, len(gpio.edges_of(21))  # 3 Pulse zu viel, 3 Ticks ausgesetzt
+        check_pulses(gpio.edges_of(21))
+        perron_2 = reports[0]["04_lines"][1]
+        assert reports[0]["02_lagging_lines"] == [] and perron_2["ahead_minutes"] == 3 and perron_2["lag_minutes"] == 0
+        assert uhr.tick_controler.catch_up_status['pending'] == 0
+        assert displayed_is_local_time()
+        print('... done')
+
+
+def Test_clock_step(do_test=True):
+    '''
+    Zeitsprung vorwärts um 08:10:30 (Uhrzeit gestellt, NTP): nachgestellt werden die verpassten Minuten modulo 12 Stunden.
+    24 Stunden: kein Korrektur-Puls (statt 1440), 11:50 Stunden: die Nebenuhr geht 10 Minuten vor und wartet (statt 710 Pulse).
+    '''
+    if do_test:
+        print('Test_clock_step()....', end='')
+        start = datetime(2026, 11, 6, 8, 0)
+        step = datetime(2026, 11, 6, 8, 10, 30)
+        # 08:01 .. 08:10, nach dem Sprung bis 30 Minuten danach: 08:11 .. 08:40 bzw. (10 Minuten warten) 20:11 .. 20:30
+        for hours, pulses in ((24, 10 + 30), (11 + 50 / 60, 10 + 20)):
+            edges = simulate(start, step + timedelta(hours=hours, minutes=30),  # until: Uhrzeit nach dem Sprung
+                             actions=[(step, lambda: uhr.clock.step(hours * 3600), ())]).edges
+            assert len(edges) == pulses and check_pulses(edges) == 0, (hours, len(edges))
+            assert displayed_is_local_time()
+        assert uhr.tick_controler.statistics['missed_ticks'] == 709 and uhr.clock.now().hour == 20
+        print('... done')
+
+
+def Benchmark_simulation(do_test=True, weeks=4):
+    if do_test:
+        print(f'Benchmark_simulation(weeks={weeks})....')
+        start = datetime(2026, 10, 5)
+        for count in (1, 16):
+            lines = [{"name": f"Linie {index}", "pin": index} for index in range(count)]
+            begin = time.perf_counter()
+            gpio = simulate(start, start + timedelta(weeks=weeks), lines=lines)
+            duration = time.perf_counter() - begin
+            print(f'     Linien={count:<3d} {len(gpio.edges)} Pulse in {duration:.2f}s: {weeks * 7 / duration:.1f} simulierte Tage/s, '
+                  f'{gpio.output_calls} GPIO-Aufrufe')
+        print('... done')
+
+
+if __name__ == '__main__':
+    Test_weeks(True)
+    Test_summer_time(True)
+    Test_winter_time(True)
+    Test_set_time(True)
+    Test_restart(True)
+    Test_restart_before_time_sync(True)
+    Test_lines(True)
+    Test_set_time_corrected(True)
+    Test_clock_step(True)
+    Benchmark_simulation(True)
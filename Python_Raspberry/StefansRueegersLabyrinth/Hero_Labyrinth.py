@@ -5,13 +5,19 @@
 # ---------------------------------------------------------------------
 # 17.09.2022    0.1     game engine, writing maps, reading joystick
 # 18.09.2022    0.2     game logic, excel level editor, code clean up
+# 18.10.2026    0.3     map is written as one frame with set_pixels()
+# 18.10.2026    0.4     MySenseHat (My_Packages) if available: only the changed pixels are written
 
 from sense_hat import SenseHat
 from time import sleep, time
 from math import sin, pi
 from copy import deepcopy
 
-sh = SenseHat()
+try:
+    from Class_MySenseHat import MySenseHat  # My_Packages: writes only the changed pixels of a frame
+    sh = MySenseHat(default_bg_color=(0, 0, 0))
+except ImportError:
+    sh = SenseHat()
 
 red     = (128,   0,   0)
 green   = (  0, 128,   0)
@@ -132,6 +138,7 @@ levels = [level1, level2, level3, level4, level5]
 level = 0
 
 def print_map_to_display(xstart, ystart):
+    frame = []
     for dy in range(8):
         map_ypos = ystart + dy - 3
         for dx in range(8):
@@ -141,9 +148,10 @@ def print_map_to_display(xstart, ystart):
             else:
                 map_pos_content = empty
             if (dx == 3 and dy ==3):
-                sh.set_pixel(dx, dy, color_dict[hero]) # mark hero's position
+                frame.append(color_dict[hero]) # mark hero's position
             else:
-                sh.set_pixel(dx, dy, color_dict[map_pos_content]) # write map content
+                frame.append(color_dict[map_pos_content]) # write map content
+    sh.set_pixels(frame) # one write for the whole frame (with MySenseHat only the changed pixels)
 
 def flash_display(color, time=1, repeat=1):
     r, g, b = color
@@ -6,9 +6,11 @@ BIN_DIR="$HOME_DIR/bin"
 TARGET_REPO="../Waltis_Repo_Clone/RaspberryPi4PiPlates/Python_Raspberry/04_Sense_Hat"
 CLONE_REPO_SRC="$TARGET_REPO/clone_repo.py"
 SHOWIP_SRC="$TARGET_REPO/showIP.py"
+SPRITE_ATLAS_SRC="../Waltis_Repo_Clone/RaspberryPi4PiPlates/My_Packages/Class_SpriteAtlas.py"
 
 CLONE_REPO_LINK="$BIN_DIR/clone_repo.py"
 SHOWIP_LINK="$BIN_DIR/showIP.py"
+SPRITE_ATLAS_LINK="$BIN_DIR/Class_SpriteAtlas.py"
 
 # 1. ~/bin erstellen falls nicht vorhanden
 mkdir -p "$BIN_DIR"
@@ -29,6 +31,34 @@ else
     echo "ℹ️ Link $SHOWIP_LINK existiert bereits. Überspringe."
 fi
 
+if [ ! -L "$SPRITE_ATLAS_LINK" ]; then
+    ln -s "$SPRITE_ATLAS_SRC" "$SPRITE_ATLAS_LINK"
+    echo "🔗 Link erstellt: $SPRITE_ATLAS_LINK -> $SPRITE_ATLAS_SRC"
+else
+    echo "ℹ️ Link $SPRITE_ATLAS_LINK existiert bereits. Überspringe."
+fi
+
+# Module, die showIP.py für die Lauftexte braucht (TextScroller)
+MY_PACKAGES_SRC="../Waltis_Repo_Clone/RaspberryPi4PiPlates/My_Packages"
+for MODULE in Class_TextScroller.py Class_Renderer.py Class_FramebufferDevice.py waltisLibrary_Rasterizer.py; do
+    if [ ! -L "$BIN_DIR/$MODULE" ]; then
+        ln -s "$MY_PACKAGES_SRC/$MODULE" "$BIN_DIR/$MODULE"
+        echo "🔗 Link erstellt: $BIN_DIR/$MODULE -> $MY_PACKAGES_SRC/$MODULE"
+    else
+        echo "ℹ️ Link $BIN_DIR/$MODULE existiert bereits. Überspringe."
+    fi
+done
+
+# Module, die Bahnhof_Mutter_Uhr.py braucht (als Kopie in ~/bin, aus dem Repository findet es My_Packages selbst)
+for MODULE in Class_FlaskMetrics.py Class_TickScheduler.py Class_ClockFanout.py Class_PulseJournal.py Class_VirtualClock.py; do
+    if [ ! -L "$BIN_DIR/$MODULE" ]; then
+        ln -s "$MY_PACKAGES_SRC/$MODULE" "$BIN_DIR/$MODULE"
+        echo "🔗 Link erstellt: $BIN_DIR/$MODULE -> $MY_PACKAGES_SRC/$MODULE"
+    else
+        echo "ℹ️ Link $BIN_DIR/$MODULE existiert bereits. Überspringe."
+    fi
+done
+
 # 3. Crontab-Eintrag vorbereiten
 CRON_ENTRY="@reboot /usr/bin/python3 $SHOWIP_LINK > /dev/null 2>&1 &"
 
@@ -14,6 +14,7 @@
 # 28-May-2019   Walter Rothlin      Added Primzahlen functions
 # 07-Jun-2019   Walter Rothlin      Merged with littlePythonLib.py
 # 09-Dec_2024   Walter Rothlin      Move it to RPi
+# 18-Oct-2026   Walter Rothlin      drawLine, drawRectangle, drawCircle use waltisLibrary_Rasterizer (integer only)
 # ------------------------------------------------------------------
 import math
 import os
@@ -24,6 +25,7 @@ import datetime
 from sense_hat     import SenseHat
 from waltisLibrary import *
 from time          import sleep
+from waltisLibrary_Rasterizer import line_points, rectangle_points, circle_points, clip
 
 
 
@@ -37,43 +39,10 @@ def setPixel(aSense,x,y,r=255,g=255,b=255):
         aSense.set_pixel(round(x),round(y),r,g,b)
 
 def drawLine(aSense,x1=0,y1=0,x2=7,y2=7,r=255,g=255,b=255,drawSpeed=0):
-    x1 = round(x1)
-    y1 = round(y1)
-    x2 = round(x2)
-    y2 = round(y2)
-
-    if (x1 == x2):
-        if (y1 > y2):
-            temp = y1
-            y1 = y2
-            y2 = temp
-        for y in range(y1,y2+1):
-            setPixel(aSense,x1,y,r,g,b)
+    for x, y in clip(line_points(round(x1),round(y1),round(x2),round(y2))):
+        aSense.set_pixel(x,y,r,g,b)
+        if (drawSpeed > 0):
             sleep(drawSpeed)
-    else:
-        if (x1 > x2):
-            temp = x1
-            x1 = x2
-            x2 = temp
-            temp = y1
-            y1 = y2
-            y2 = temp
-        a = (y1-y2)/(x1-x2)
-        c = y1 - a*x1
-        if ((a > 1) or (a < -1)):
-            if (y1 > y2):
-                temp = y1
-                y1 = y2
-                y2 = temp
-            for y in range(y1,y2+1):
-                x = (y - c)/a
-                setPixel(aSense,x,y,r,g,b)
-                sleep(drawSpeed)
-        else:
-            for x in range(x1,x2+1):
-                y = a*x + c
-                setPixel(aSense,x,y,r,g,b)
-                sleep(drawSpeed)
 
 def TEST_drawLine(aSense):
     print("Start TEST_drawLine")
@@ -110,21 +79,11 @@ def TEST_drawLine(aSense):
 
 
 def drawRectangle(aSense,x1,y1,x2,y2,borderRed=255, borderGreen=255,borderBlue=255, fillRed=0, fillGreen=0, fillBlue=255, doFill=False):
-    drawLine(aSense,x1,y1,x2,y1,borderRed,borderGreen,borderBlue)
-    drawLine(aSense,x1,y2,x2,y2,borderRed,borderGreen,borderBlue)
-    drawLine(aSense,x2,y1,x2,y2,borderRed,borderGreen,borderBlue)
-    drawLine(aSense,x1,y1,x1,y2,borderRed,borderGreen,borderBlue)
-    if (doFill):
-        if (x1 > x2):
-            xTemp = x2
-            x2 = x1
-            x1 = xTemp
-        if (y1 > y2):
-            yTemp = y2
-            y2 = y1
-            y1 = yTemp
-        for ix in range(x1+1,x2):
-            drawLine(aSense,ix,y1+1,ix,y2-1,fillRed,fillGreen,fillBlue)
+    for x, y in clip(rectangle_points(x1,y1,x2,y2)):
+        aSense.set_pixel(x,y,borderRed,borderGreen,borderBlue)
+    if (doFill and abs(x2-x1) > 1 and abs(y2-y1) > 1):
+        for x, y in clip(rectangle_points(min(x1,x2)+1,min(y1,y2)+1,max(x1,x2)-1,max(y1,y2)-1,filled=True)):
+            aSense.set_pixel(x,y,fillRed,fillGreen,fillBlue)
 
 def TEST_drawRectangle(aSense):
     print("Start TEST_drawRectangle")
@@ -143,27 +102,16 @@ def TEST_drawRectangle(aSense):
 # Sense-HAT grafic functions
 # ==========================
 def drawCircle(aSense, xCenter, yCenter, radius, redBorder=255, greenBorder=255, blueBorder=255, redFill=0, greenFill=0, blueFill=255, doFill=False, resolution=10):
+    # resolution is not used anymore: the midpoint algorithm sets every pixel of the circle exactly once
+    border = list(clip(circle_points(xCenter, yCenter, radius)))
     if (doFill == True):
-       for countDown in range(radius, 0, -1):
-           print("countDown: ",countDown)
-           for alpha in range(0,360,resolution):
-               bogenmass=grad2Rad(alpha)
-               # print("alpha:",alpha," Bogenmass:",bogenmass," x:",xCenter," y:",yCenter)
-               xDist=countDown*math.cos(bogenmass)
-               xPixel=xCenter+xDist
-               yDist=countDown*math.sin(bogenmass)
-               yPixel=yCenter+yDist
-               aSense.set_pixel(int(xPixel), int(yPixel), redFill, greenFill, blueFill)
-               sleep(0.05)
-
-    for alpha in range(0,360,resolution):
-        bogenmass=grad2Rad(alpha)
-        # print("alpha:",alpha," Bogenmass:",bogenmass)
-        xDist=radius*math.cos(bogenmass)
-        xPixel=xCenter+xDist
-        yDist=radius*math.sin(bogenmass)
-        yPixel=yCenter+yDist
-        aSense.set_pixel(int(xPixel), int(yPixel), redBorder, greenBorder, blueBorder)
+        for x, y in clip(circle_points(xCenter, yCenter, radius, filled=True)):
+            if (x, y) not in border:
+                aSense.set_pixel(x, y, redFill, greenFill, blueFill)
+                sleep(0.05)
+
+    for x, y in border:
+        aSense.set_pixel(x, y, redBorder, greenBorder, blueBorder)
         sleep(0.05)
 
 def TEST_drawCircle(aSense):